@@ -3,54 +3,496 @@ Base application module.
 
 Contain routing and some additional methods.
 """
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import json
+from time import perf_counter
+from types import SimpleNamespace
 
-from flask import Flask, render_template, request, Response
+from api.formats import iter_binary, iter_csv, iter_hex, iter_msgpack, \
+    iter_ndjson
+from api.metrics import generate_metrics, Metrics, \
+    MetricsFibonacciNumbersRepo
+from flask import Blueprint, current_app, Flask, render_template, request, \
+    Response, url_for
 from instance.settings import app_config
-from repositories.redis import FibonacciNumbersRepo
-from shared.use_case import ResponseFailure, ResponseSuccess
-from use_cases.fibonacci_numbers import GetFibonacciSequenceRequest, \
-    GetFibonacciSequenceUseCase
+from itsdangerous import BadData, URLSafeSerializer
+from prometheus_client import CONTENT_TYPE_LATEST
+from repositories import create_repo
+from shared.admission import AdmissionControl
+from shared.flights import RangeFlights
+from shared.use_case import Request, ResponseFailure, ResponseSuccess
+from use_cases.fibonacci_numbers import GetFibonacciBatchRequest, \
+    GetFibonacciBatchUseCase, GetFibonacciDigitsRequest, \
+    GetFibonacciDigitsUseCase, GetFibonacciNumberRequest, \
+    GetFibonacciNumberUseCase, GetFibonacciSequenceModuloUseCase, \
+    GetFibonacciSequenceRequest, GetFibonacciSequenceUseCase
 
+blueprint = Blueprint('fibonacci', __name__)
+# Max size of numbers in cursor, greater numbers are got from repo.
+CURSOR_MAX_NUMBER_BITS = 8192
 STATUS_CODES = {
     ResponseSuccess.SUCCESS: 200,
     ResponseFailure.RESOURCE_ERROR: 404,
     ResponseFailure.PARAMETERS_ERROR: 400,
-    ResponseFailure.SYSTEM_ERROR: 500
+    ResponseFailure.SYSTEM_ERROR: 500,
+    # Request is valid, but exceeds configured limits, so it won't be
+    # served on retry unlike 503.
+    ResponseFailure.LIMIT_ERROR: 422,
+    ResponseFailure.OVERLOAD_ERROR: 503
 }
+# Wire formats of sequence: name, media type and serializer of numbers,
+# json is first, so it is selected by wildcard and missing Accept header.
+SEQUENCE_FORMATS = (
+    ('json', 'application/json', None),
+    ('ndjson', 'application/x-ndjson', iter_ndjson),
+    ('csv', 'text/csv', iter_csv),
+    ('msgpack', 'application/msgpack', iter_msgpack),
+    ('hex', 'text/x-fibonacci-hex', iter_hex),
+    ('binary', 'application/octet-stream', iter_binary)
+)
+# Formats with numbers in decimal, conversion to decimal is quadratic.
+DECIMAL_FORMATS = ('json', 'ndjson', 'csv')
 
 
-def _create_request_from_request_args(request_args: dict):
+def _create_request_from_request_args(request_args: dict, secret=None,
+                                      max_limit: int = 10000,
+                                      table_max_modulus: int = 100000,
+                                      decimal: bool = True):
     params = {
         'start': request_args.get('from'),
-        'end': request_args.get('to')
+        'end': request_args.get('to'),
+        'modulus': request_args.get('mod'),
+        'limit': request_args.get('limit'),
+        'max_limit': max_limit,
+        'table_max_modulus': table_max_modulus,
+        'decimal': decimal
     }
+    if 'cursor' in request_args:
+        try:
+            cursor = _cursor_serializer(secret).loads(request_args['cursor'])
+            params.update(start=cursor['start'], end=cursor['end'],
+                          modulus=cursor.get('mod'))
+            if secret:
+                params['previous'] = [
+                    int(number, 16) for number in cursor.get('previous', ())]
+        except (BadData, KeyError, TypeError, ValueError):
+            invalid_request = Request()
+            invalid_request.add_error('cursor', 'is invalid')
+            return invalid_request
     return GetFibonacciSequenceRequest(**params)
 
 
-def create_app(config_name):
+def _cursor_serializer(secret=None):
+    """
+    Get serializer of cursors of sequence pages.
+
+    :param secret: secret key, None - cursors are signed by public key,
+    so numbers of cursors aren't trusted
+    :return: serializer object
+    """
+    return URLSafeSerializer(secret or 'fibonacci', salt='fibonacci-cursor')
+
+
+def _next_cursor(use_case_request, numbers: list, secret=None):
+    """
+    Get cursor of page after numbers.
+
+    Cursor contains range after page and two last numbers of page,
+    so next page continues sequence without repo and calculation of pair.
+
+    :param use_case_request: valid request object of page
+    :param numbers: list of numbers of page
+    :param secret: secret key, None - cursor without numbers
+    :return: cursor string, None - page is last
+    """
+    start = use_case_request.start + len(numbers)
+    if start > use_case_request.end:
+        return None
+    cursor = {'start': start, 'end': use_case_request.end}
+    if use_case_request.modulus is not None:
+        cursor['mod'] = use_case_request.modulus
+    previous = (use_case_request.previous + tuple(numbers[-2:]))[-2:]
+    if secret and use_case_request.modulus is None and all(
+            number.bit_length() <= CURSOR_MAX_NUMBER_BITS
+            for number in previous):
+        cursor['previous'] = ['{:x}'.format(number) for number in previous]
+    return _cursor_serializer(secret).dumps(cursor)
+
+
+def _select_format(format_name, accept_mimetypes):
+    """
+    Select wire format of sequence by parameter or accept header.
+
+    :param format_name: value of format parameter, None - format
+    by accept header
+    :param accept_mimetypes: accept object of request
+    :return: format tuple of SEQUENCE_FORMATS, None - format is unknown
+    """
+    if format_name is not None:
+        return next((sequence_format for sequence_format in SEQUENCE_FORMATS
+                     if sequence_format[0] == format_name), None)
+    media_type = accept_mimetypes.best_match(
+        [media_type for _, media_type, _ in SEQUENCE_FORMATS],
+        default=SEQUENCE_FORMATS[0][1])
+    return next(sequence_format for sequence_format in SEQUENCE_FORMATS
+                if sequence_format[1] == media_type)
+
+
+def _sequence_etag(use_case_request, format_name='json'):
+    """
+    Get strong etag of fibonacci sequence.
+
+    Sequence of range never changes, so etag depends only on range
+    of page, modulus and format.
+
+    :param use_case_request: valid request object
+    :param format_name: name of wire format
+    :return: etag without quotes
+    """
+    etag = 'fibonacci-{}-{}'.format(use_case_request.start,
+                                    use_case_request.page_end)
+    if use_case_request.modulus is not None:
+        etag += '-mod-{}'.format(use_case_request.modulus)
+    if use_case_request.limit is not None:
+        # Page has link to next page of range.
+        etag += '-of-{}'.format(use_case_request.end)
+    if format_name != 'json':
+        etag += '-{}'.format(format_name)
+    return etag
+
+
+def _set_cache_headers(response, etag: str, max_age: int):
+    """
+    Set etag and cache control headers of immutable response.
+
+    :param response: response object
+    :param etag: etag without quotes
+    :param max_age: max age of response in seconds
+    :return: response object
+    """
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = \
+        'public, max-age={}, immutable'.format(max_age)
+    return response
+
+
+def _failure_response(response, metrics=None):
+    """
+    Create http response of failed response object.
+
+    :param response: failed response object
+    :param metrics: recorder of response type, None - without metrics
+    :return: response object
+    """
+    if metrics is not None:
+        metrics.count_response(response.type)
+    http_response = Response(json.dumps(response.value).strip('"'),
+                             status=STATUS_CODES[response.type])
+    if response.type == ResponseFailure.OVERLOAD_ERROR:
+        http_response.headers['Retry-After'] = '1'
+    return http_response
+
+
+def _iter_json_array(values, chunk_size: int, metrics=None):
+    """
+    Serialize iterable of numbers to json array by chunks.
+
+    :param values: iterable of numbers
+    :param chunk_size: count of numbers in one chunk
+    :param metrics: recorder of serialization duration and size,
+    None - without metrics
+    :return: iterator of json array parts
+    """
+    values = iter(values)
+    yield '['
+    separator = ''
+    chunk = list(islice(values, chunk_size))
+    while chunk:
+        started = perf_counter()
+        part = separator + ', '.join(map(str, chunk))
+        if metrics is not None:
+            metrics.observe_stage('serialize', perf_counter() - started)
+            metrics.count_serialized(len(part))
+        yield part
+        separator = ', '
+        chunk = list(islice(values, chunk_size))
+    yield ']'
+
+
+def _services():
+    """
+    Get repo and other services of current application.
+
+    :return: namespace with repo, flights, admission, pool, pool_chunks
+    and metrics
+    """
+    return current_app.extensions['fibonacci']
+
+
+def _sequence_use_case(use_case_request, services):
+    """
+    Create use case of fibonacci sequence for request.
+
+    :param use_case_request: request object
+    :param services: services of current application
+    :return: use case object
+    """
+    config = current_app.config
+    if use_case_request and use_case_request.modulus is not None:
+        return GetFibonacciSequenceModuloUseCase(
+            stream=True,
+            table_max_modulus=config['FIBONACCI_PISANO_TABLE_MAX_MODULUS'])
+    return GetFibonacciSequenceUseCase(
+        services.repo, chunk_size=config['FIBONACCI_CHUNK_SIZE'],
+        stream=True, flights=services.flights, metrics=services.metrics,
+        pool=services.pool, pool_chunks=services.pool_chunks)
+
+
+def _sequence_response(use_case_request, response, sequence_format, etag,
+                       services):
+    """
+    Create streamed http response of fibonacci sequence.
+
+    :param use_case_request: valid request object
+    :param response: success response object
+    :param sequence_format: format tuple of SEQUENCE_FORMATS
+    :param etag: etag without quotes
+    :param services: services of current application
+    :return: response object
+    """
+    config = current_app.config
+    chunk_size = config['FIBONACCI_CHUNK_SIZE']
+    _, media_type, serialize = sequence_format
+    if services.metrics is not None:
+        services.metrics.count_response(response.type)
+    if serialize is None:
+        http_response = Response(
+            _iter_json_array(response.value, chunk_size, services.metrics),
+            status=STATUS_CODES[response.type], mimetype=media_type)
+    else:
+        http_response = Response(
+            serialize(response.value, use_case_request.start, chunk_size,
+                      services.metrics),
+            status=STATUS_CODES[response.type], mimetype=media_type)
+    http_response.vary.add('Accept')
+    if use_case_request.limit is not None:
+        cursor = _next_cursor(use_case_request, response.value,
+                              config['SECRET'])
+        if cursor is not None:
+            http_response.headers['Link'] = '<{}>; rel="next"'.format(
+                url_for('.fibonacci', cursor=cursor,
+                        limit=use_case_request.limit,
+                        format=request.args.get('format')))
+    # Streamed response is calculated until it is closed.
+    http_response.call_on_close(
+        lambda: services.admission.release(use_case_request.cost))
+    return _set_cache_headers(http_response, etag,
+                              config['FIBONACCI_HTTP_MAX_AGE'])
+
+
+def metrics_view():
+    """
+    Get prometheus metrics.
+
+    :return: response object
+    """
+    return Response(generate_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+
+@blueprint.route('/')
+@blueprint.route('/index')
+def index():
+    """
+    Get frontend page.
+
+    :return: html page
+    """
+    return render_template('index.html')
+
+
+@blueprint.route('/fibonachi/')
+def fibonacci():
+    """
+    Get fibonacci sequence of range.
+
+    :return: response object
+    """
+    services = _services()
+    sequence_format = _select_format(request.args.get('format'),
+                                     request.accept_mimetypes)
+    if sequence_format is None:
+        return _failure_response(
+            ResponseFailure.build_parameters_error(
+                'format: must be one of {}'.format(', '.join(
+                    name for name, _, _ in SEQUENCE_FORMATS))),
+            services.metrics)
+    use_case_request = _create_request_from_request_args(
+        request.args, current_app.config['SECRET'],
+        current_app.config['FIBONACCI_MAX_LIMIT'],
+        current_app.config['FIBONACCI_PISANO_TABLE_MAX_MODULUS'],
+        sequence_format[0] in DECIMAL_FORMATS)
+    etag = None
+    if use_case_request:
+        etag = _sequence_etag(use_case_request, sequence_format[0])
+        if request.if_none_match.contains(etag):
+            not_modified = Response(status=304)
+            not_modified.vary.add('Accept')
+            return _set_cache_headers(
+                not_modified, etag,
+                current_app.config['FIBONACCI_HTTP_MAX_AGE'])
+        rejection = services.admission.admit(use_case_request.cost,
+                                             use_case_request.response_bytes)
+        if rejection is not None:
+            return _failure_response(rejection, services.metrics)
+
+    response = _sequence_use_case(use_case_request, services).execute(
+        use_case_request)
+    if not response:
+        if use_case_request:
+            services.admission.release(use_case_request.cost)
+        return _failure_response(response, services.metrics)
+    return _sequence_response(use_case_request, response, sequence_format,
+                              etag, services)
+
+
+@blueprint.route('/fibonachi/batch', methods=['POST'])
+def fibonacci_batch():
+    """
+    Get fibonacci numbers of several ranges and numbers.
+
+    :return: response object
+    """
+    services = _services()
+    body = request.get_json(force=True, silent=True)
+    use_case_request = GetFibonacciBatchRequest(
+        body.get('queries') if isinstance(body, dict) else None,
+        max_queries=current_app.config['FIBONACCI_BATCH_MAX_QUERIES'])
+    if use_case_request:
+        rejection = services.admission.admit(use_case_request.cost,
+                                             use_case_request.response_bytes)
+        if rejection is not None:
+            return _failure_response(rejection, services.metrics)
+    use_case = GetFibonacciBatchUseCase(
+        services.repo, chunk_size=current_app.config['FIBONACCI_CHUNK_SIZE'],
+        flights=services.flights, metrics=services.metrics,
+        pool=services.pool, pool_chunks=services.pool_chunks)
+    try:
+        response = use_case.execute(use_case_request)
+    finally:
+        if use_case_request:
+            services.admission.release(use_case_request.cost)
+    if not response:
+        return _failure_response(response, services.metrics)
+    if services.metrics is not None:
+        services.metrics.count_response(response.type)
+    return Response(json.dumps(response.value),
+                    status=STATUS_CODES[response.type],
+                    content_type='application/json')
+
+
+@blueprint.route('/fibonachi/<order>')
+def fibonacci_number(order):
+    """
+    Get one fibonacci number.
+
+    :param order: order number of fibonacci number
+    :return: response object
+    """
+    services = _services()
+    use_case_request = GetFibonacciNumberRequest(order)
+    max_age = current_app.config['FIBONACCI_HTTP_MAX_AGE']
+    etag = None
+    if use_case_request:
+        etag = 'fibonacci-{}'.format(use_case_request.order)
+        if request.if_none_match.contains(etag):
+            return _set_cache_headers(Response(status=304), etag, max_age)
+        rejection = services.admission.admit(use_case_request.cost,
+                                             use_case_request.response_bytes)
+        if rejection is not None:
+            return _failure_response(rejection, services.metrics)
+
+    try:
+        response = GetFibonacciNumberUseCase(services.repo).execute(
+            use_case_request)
+    finally:
+        if use_case_request:
+            services.admission.release(use_case_request.cost)
+    if not response:
+        return _failure_response(response, services.metrics)
+    if services.metrics is not None:
+        services.metrics.count_response(response.type)
+    return _set_cache_headers(
+        Response(str(response.value), status=STATUS_CODES[response.type]),
+        etag, max_age)
+
+
+@blueprint.route('/fibonachi/<order>/digits')
+def fibonacci_digits(order):
+    """
+    Get count, leading and trailing digits of one fibonacci number.
+
+    :param order: order number of fibonacci number
+    :return: response object
+    """
+    services = _services()
+    use_case_request = GetFibonacciDigitsRequest(
+        order, request.args.get('count'))
+    if use_case_request:
+        rejection = services.admission.admit(use_case_request.cost,
+                                             use_case_request.response_bytes)
+        if rejection is not None:
+            return _failure_response(rejection, services.metrics)
+
+    try:
+        response = GetFibonacciDigitsUseCase().execute(use_case_request)
+    finally:
+        if use_case_request:
+            services.admission.release(use_case_request.cost)
+    if not response:
+        return _failure_response(response, services.metrics)
+    if services.metrics is not None:
+        services.metrics.count_response(response.type)
+    return _set_cache_headers(
+        Response(json.dumps(response.value),
+                 status=STATUS_CODES[response.type],
+                 content_type='application/json'),
+        'fibonacci-{}-digits-{}'.format(use_case_request.order,
+                                        use_case_request.count),
+        current_app.config['FIBONACCI_HTTP_MAX_AGE'])
+
+
+def create_app(config_name, repo=None):
     """
     Create flask application.
 
     :param config_name: application configuration name.
+    :param repo: fibonacci numbers repo, None - repo by configuration.
     :return: flask application.
     """
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_object(app_config[config_name])
     app.config.from_pyfile('settings.py')
-
-    @app.route('/')
-    @app.route('/index')
-    def index():
-        return render_template('index.html')
-
-    @app.route('/fibonachi/')
-    def fibonacci():
-        use_case_request = _create_request_from_request_args(request.args)
-        repo = FibonacciNumbersRepo()
-        use_case = GetFibonacciSequenceUseCase(repo)
-        response = use_case.execute(use_case_request)
-        return Response(json.dumps(response.value).strip('"'),
-                        status=STATUS_CODES[response.type])
-
+    metrics = Metrics() if app.config['FIBONACCI_METRICS'] else None
+    if repo is None:
+        repo = create_repo(app.config, metrics)
+    if metrics is not None:
+        repo = MetricsFibonacciNumbersRepo(repo, metrics)
+        app.add_url_rule('/metrics', 'metrics_view', metrics_view)
+    pool = None
+    if app.config['FIBONACCI_PROCESSES']:
+        pool = ProcessPoolExecutor(app.config['FIBONACCI_PROCESSES'])
+    app.extensions['fibonacci'] = SimpleNamespace(
+        repo=repo,
+        flights=RangeFlights(metrics)
+        if app.config['FIBONACCI_SINGLE_FLIGHT'] else None,
+        admission=AdmissionControl(
+            max_cost=app.config['FIBONACCI_MAX_REQUEST_COST'],
+            max_response_bytes=app.config['FIBONACCI_MAX_RESPONSE_BYTES'],
+            budget=app.config['FIBONACCI_COST_BUDGET'],
+            cheap_cost=app.config['FIBONACCI_CHEAP_COST']),
+        pool=pool,
+        pool_chunks=max(app.config['FIBONACCI_PROCESSES'], 1),
+        metrics=metrics)
+    app.register_blueprint(blueprint)
     return app
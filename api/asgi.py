@@ -0,0 +1,178 @@
+"""
+Asyncio application module.
+
+ASGI variant of fibonachi url for asyncio servers.
+"""
+import json
+from urllib.parse import parse_qs, urlencode
+
+from api import _create_request_from_request_args, _next_cursor, \
+    STATUS_CODES
+from instance.settings import app_config
+from repositories.async_redis import AsyncFibonacciNumbersRepo
+from shared.admission import AdmissionControl
+from shared.use_case import ResponseFailure
+from use_cases.fibonacci_numbers import AsyncGetFibonacciSequenceUseCase, \
+    GetFibonacciSequenceModuloUseCase
+
+CONTENT_TYPE = b'text/html; charset=utf-8'
+JSON_CONTENT_TYPE = b'application/json'
+
+
+async def _aiter_json_array(values, chunk_size: int):
+    """
+    Serialize async iterable of numbers to json array by chunks.
+
+    :param values: async iterable of numbers
+    :param chunk_size: count of numbers in one chunk
+    :return: async iterator of json array parts
+    """
+    yield '['
+    separator = ''
+    chunk = []
+    async for value in values:
+        chunk.append(str(value))
+        if len(chunk) == chunk_size:
+            yield separator + ', '.join(chunk)
+            separator = ', '
+            chunk = []
+    if chunk:
+        yield separator + ', '.join(chunk)
+    yield ']'
+
+
+async def _aiter(values):
+    for value in values:
+        yield value
+
+
+async def _send_response(send, status: int, body: str):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', CONTENT_TYPE)]})
+    await send({'type': 'http.response.body', 'body': body.encode()})
+
+
+async def _send_failure(send, response):
+    headers = [(b'content-type', CONTENT_TYPE)]
+    if response.type == ResponseFailure.OVERLOAD_ERROR:
+        headers.append((b'retry-after', b'1'))
+    await send({'type': 'http.response.start',
+                'status': STATUS_CODES[response.type], 'headers': headers})
+    await send({'type': 'http.response.body',
+                'body': json.dumps(response.value).encode()})
+
+
+async def _serve_lifespan(receive, send, repo):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await repo.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def _execute_sequence_use_case(use_case_request, repo, config):
+    """
+    Execute use case of fibonacci sequence for request.
+
+    :param use_case_request: request object
+    :param repo: asyncio fibonacci numbers repo
+    :param config: application configuration
+    :return: response object
+    """
+    if use_case_request and use_case_request.modulus is not None:
+        # Numbers modulo m are calculated fast without repo.
+        return GetFibonacciSequenceModuloUseCase(
+            stream=True,
+            table_max_modulus=config.FIBONACCI_PISANO_TABLE_MAX_MODULUS
+        ).execute(use_case_request)
+    use_case = AsyncGetFibonacciSequenceUseCase(
+        repo, chunk_size=config.FIBONACCI_CHUNK_SIZE, stream=True)
+    return await use_case.execute(use_case_request)
+
+
+async def _send_sequence(send, use_case_request, response, config):
+    """
+    Send streamed json array of fibonacci sequence.
+
+    :param send: ASGI send callable
+    :param use_case_request: valid request object
+    :param response: success response object
+    :param config: application configuration
+    :return:
+    """
+    headers = [(b'content-type', JSON_CONTENT_TYPE)]
+    numbers = response.value
+    if use_case_request.limit is not None:
+        cursor = _next_cursor(use_case_request, numbers, config.SECRET)
+        if cursor is not None:
+            headers.append((b'link', '</fibonachi/?{}>; rel="next"'.format(
+                urlencode({'cursor': cursor,
+                           'limit': use_case_request.limit})).encode()))
+    if not hasattr(numbers, '__aiter__'):
+        numbers = _aiter(numbers)
+    await send({'type': 'http.response.start',
+                'status': STATUS_CODES[response.type],
+                'headers': headers})
+    async for part in _aiter_json_array(numbers, config.FIBONACCI_CHUNK_SIZE):
+        await send({'type': 'http.response.body', 'body': part.encode(),
+                    'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def _serve_sequence(scope, send, repo, admission, config):
+    query = parse_qs(scope['query_string'].decode('latin-1'))
+    use_case_request = _create_request_from_request_args(
+        {key: values[0] for key, values in query.items()},
+        config.SECRET, config.FIBONACCI_MAX_LIMIT,
+        config.FIBONACCI_PISANO_TABLE_MAX_MODULUS)
+    if not use_case_request:
+        await _send_failure(send, ResponseFailure.build_from_invalid_request(
+            use_case_request))
+        return
+    rejection = admission.admit(use_case_request.cost,
+                                use_case_request.response_bytes)
+    if rejection is not None:
+        await _send_failure(send, rejection)
+        return
+    try:
+        response = await _execute_sequence_use_case(use_case_request, repo,
+                                                    config)
+        if not response:
+            await _send_failure(send, response)
+            return
+        await _send_sequence(send, use_case_request, response, config)
+    finally:
+        admission.release(use_case_request.cost)
+
+
+def create_asgi_app(config_name, repo=None):
+    """
+    Create ASGI application.
+
+    :param config_name: application configuration name.
+    :param repo: asyncio fibonacci numbers repo, None - redis repo.
+    :return: ASGI application.
+    """
+    config = app_config[config_name]
+    if repo is None:
+        repo = AsyncFibonacciNumbersRepo()
+    admission = AdmissionControl(
+        max_cost=config.FIBONACCI_MAX_REQUEST_COST,
+        max_response_bytes=config.FIBONACCI_MAX_RESPONSE_BYTES,
+        budget=config.FIBONACCI_COST_BUDGET,
+        cheap_cost=config.FIBONACCI_CHEAP_COST)
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await _serve_lifespan(receive, send, repo)
+        elif scope['type'] != 'http':
+            return
+        elif scope['path'] != '/fibonachi/':
+            await _send_response(send, 404, 'Not Found')
+        else:
+            await _serve_sequence(scope, send, repo, admission, config)
+
+    return app
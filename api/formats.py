@@ -0,0 +1,159 @@
+"""
+Wire formats of fibonacci sequence.
+
+Every format is serialized by chunks of numbers. Hex, binary and
+MessagePack formats don't need conversion of numbers to decimal,
+which is quadratic for big numbers.
+"""
+from itertools import count, islice
+import struct
+from time import perf_counter
+
+LENGTH = struct.Struct('<I')
+
+
+def _iter_chunks(values, chunk_size: int, encode_chunk, metrics=None):
+    """
+    Serialize iterable of numbers by chunks.
+
+    :param values: iterable of numbers
+    :param chunk_size: count of numbers in one chunk
+    :param encode_chunk: function, which serializes list of numbers
+    :param metrics: recorder of serialization duration and size,
+    None - without metrics
+    :return: iterator of serialized chunks
+    """
+    values = iter(values)
+    chunk = list(islice(values, chunk_size))
+    while chunk:
+        started = perf_counter()
+        part = encode_chunk(chunk)
+        if metrics is not None:
+            metrics.observe_stage('serialize', perf_counter() - started)
+            metrics.count_serialized(len(part))
+        yield part
+        chunk = list(islice(values, chunk_size))
+
+
+def _to_bytes(number: int):
+    return number.to_bytes((number.bit_length() + 7) // 8, 'big')
+
+
+def iter_ndjson(values, start: int, chunk_size: int, metrics=None):
+    """
+    Serialize numbers to newline delimited json, one number per line.
+
+    :param values: iterable of numbers
+    :param start: order number of first number
+    :param chunk_size: count of numbers in one chunk
+    :param metrics: recorder of serialization, None - without metrics
+    :return: iterator of text parts
+    """
+    return _iter_chunks(
+        values, chunk_size,
+        lambda chunk: ''.join('{}\n'.format(number) for number in chunk),
+        metrics)
+
+
+def iter_csv(values, start: int, chunk_size: int, metrics=None):
+    """
+    Serialize numbers to csv with order and number columns.
+
+    :param values: iterable of numbers
+    :param start: order number of first number
+    :param chunk_size: count of numbers in one chunk
+    :param metrics: recorder of serialization, None - without metrics
+    :return: iterator of text parts
+    """
+    orders = count(start)
+    yield 'order,number\r\n'
+    yield from _iter_chunks(
+        values, chunk_size,
+        lambda chunk: ''.join('{},{}\r\n'.format(order, number)
+                              for number, order in zip(chunk, orders)),
+        metrics)
+
+
+def iter_hex(values, start: int, chunk_size: int, metrics=None):
+    """
+    Serialize numbers to lines of hexadecimal digits.
+
+    :param values: iterable of numbers
+    :param start: order number of first number
+    :param chunk_size: count of numbers in one chunk
+    :param metrics: recorder of serialization, None - without metrics
+    :return: iterator of text parts
+    """
+    return _iter_chunks(
+        values, chunk_size,
+        lambda chunk: ''.join('{:x}\n'.format(number) for number in chunk),
+        metrics)
+
+
+def iter_binary(values, start: int, chunk_size: int, metrics=None):
+    """
+    Serialize numbers to length-prefixed binary.
+
+    Every number is uint32 little-endian length and unsigned little-endian
+    bytes of number, zero has no bytes.
+
+    :param values: iterable of numbers
+    :param start: order number of first number
+    :param chunk_size: count of numbers in one chunk
+    :param metrics: recorder of serialization, None - without metrics
+    :return: iterator of bytes parts
+    """
+    def encode_chunk(chunk):
+        parts = []
+        for number in chunk:
+            payload = number.to_bytes((number.bit_length() + 7) // 8,
+                                      'little')
+            parts.append(LENGTH.pack(len(payload)))
+            parts.append(payload)
+        return b''.join(parts)
+
+    return _iter_chunks(values, chunk_size, encode_chunk, metrics)
+
+
+def pack_msgpack_number(number: int):
+    """
+    Pack not negative integer to MessagePack.
+
+    Numbers up to 64 bits are packed as integers, greater numbers -
+    as bin with big-endian bytes of number.
+
+    :param number: not negative integer
+    :return: bytes
+    """
+    if number < 0x80:
+        return bytes((number,))
+    if number <= 0xff:
+        return b'\xcc' + bytes((number,))
+    if number <= 0xffff:
+        return b'\xcd' + struct.pack('>H', number)
+    if number <= 0xffffffff:
+        return b'\xce' + struct.pack('>I', number)
+    if number <= 0xffffffffffffffff:
+        return b'\xcf' + struct.pack('>Q', number)
+    payload = _to_bytes(number)
+    if len(payload) <= 0xff:
+        return b'\xc4' + bytes((len(payload),)) + payload
+    if len(payload) <= 0xffff:
+        return b'\xc5' + struct.pack('>H', len(payload)) + payload
+    return b'\xc6' + struct.pack('>I', len(payload)) + payload
+
+
+def iter_msgpack(values, start: int, chunk_size: int, metrics=None):
+    """
+    Serialize numbers to stream of MessagePack objects, one per number.
+
+    :param values: iterable of numbers
+    :param start: order number of first number
+    :param chunk_size: count of numbers in one chunk
+    :param metrics: recorder of serialization, None - without metrics
+    :return: iterator of bytes parts
+    """
+    return _iter_chunks(
+        values, chunk_size,
+        lambda chunk: b''.join(map(pack_msgpack_number, chunk)),
+        metrics)
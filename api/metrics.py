@@ -0,0 +1,168 @@
+"""
+Prometheus metrics of application.
+
+If prometheus_multiproc_dir environment variable is set, metrics of all
+gunicorn workers are written to this directory and aggregated
+by /metrics url of any worker.
+"""
+import os
+from time import perf_counter
+
+from prometheus_client import CollectorRegistry, Counter, generate_latest, \
+    Histogram, REGISTRY
+from prometheus_client.multiprocess import MultiProcessCollector
+
+STAGE_SECONDS = Histogram(
+    'fibonacci_stage_seconds', 'Latency of fibonachi url stages.',
+    ['stage'])
+REPO_NUMBERS = Counter(
+    'fibonacci_repo_numbers_total',
+    'Numbers got from repo, hit - existing, miss - None.', ['result'])
+COMPUTED_NUMBERS = Counter(
+    'fibonacci_computed_numbers_total', 'Calculated missing numbers.')
+SERIALIZED_BYTES = Counter(
+    'fibonacci_serialized_bytes_total', 'Bytes of serialized numbers.')
+FLIGHTS = Counter(
+    'fibonacci_flights_total',
+    'Single-flight calculations of ranges, started - calculated, waited - '
+    'waited for overlapping calculation, saved - not needed after waiting.',
+    ['result'])
+CACHE_SEGMENTS = Counter(
+    'fibonacci_cache_segments_total',
+    'Segments got from in-process cache, hit - cached, miss - from repo.',
+    ['result'])
+RESPONSES = Counter(
+    'fibonacci_responses_total', 'Responses of fibonachi url by type.',
+    ['type'])
+
+
+class Metrics:
+    """Recorder of fibonachi url metrics."""
+
+    @staticmethod
+    def observe_stage(stage: str, seconds: float):
+        """
+        Add duration of request stage.
+
+        :param stage: stage name
+        :param seconds: duration in seconds
+        :return:
+        """
+        STAGE_SECONDS.labels(stage).observe(seconds)
+
+    @staticmethod
+    def count_repo_numbers(hits: int, misses: int):
+        """
+        Add count of existing and missing numbers got from repo.
+
+        :param hits: count of existing numbers
+        :param misses: count of missing numbers
+        :return:
+        """
+        REPO_NUMBERS.labels('hit').inc(hits)
+        REPO_NUMBERS.labels('miss').inc(misses)
+
+    @staticmethod
+    def count_computed(count: int):
+        """
+        Add count of calculated numbers.
+
+        :param count: count of numbers
+        :return:
+        """
+        COMPUTED_NUMBERS.inc(count)
+
+    @staticmethod
+    def count_serialized(size: int):
+        """
+        Add size of serialized numbers.
+
+        :param size: size in bytes
+        :return:
+        """
+        SERIALIZED_BYTES.inc(size)
+
+    @staticmethod
+    def count_flight(result: str):
+        """
+        Add single-flight calculation by result.
+
+        :param result: started, waited or saved
+        :return:
+        """
+        FLIGHTS.labels(result).inc()
+
+    @staticmethod
+    def count_cache_segments(hits: int, misses: int):
+        """
+        Add count of cached and missing segments of in-process cache.
+
+        :param hits: count of cached segments
+        :param misses: count of missing segments
+        :return:
+        """
+        CACHE_SEGMENTS.labels('hit').inc(hits)
+        CACHE_SEGMENTS.labels('miss').inc(misses)
+
+    @staticmethod
+    def count_response(type_: str):
+        """
+        Add response by type.
+
+        :param type_: ResponseSuccess or ResponseFailure type
+        :return:
+        """
+        RESPONSES.labels(type_).inc()
+
+
+class MetricsFibonacciNumbersRepo:
+    """Repo, which records latency and hits of other repo."""
+
+    def __init__(self, repo, metrics: Metrics):
+        """
+        Set repo and metrics.
+
+        :param repo: repo with numbers_list and add_numbers methods
+        :param metrics: metrics recorder
+        """
+        self.repo = repo
+        self.metrics = metrics
+
+    def numbers_list(self, start: int, end: int):
+        """
+        Get list of fibonacci sequence from repo.
+
+        :param start: start order number of fibonacci sequence
+        :param end: end order number of fibonacci sequence
+        :return: list with fibonacci sequence
+        """
+        started = perf_counter()
+        numbers = self.repo.numbers_list(start, end)
+        self.metrics.observe_stage('repo_read', perf_counter() - started)
+        misses = numbers.count(None)
+        self.metrics.count_repo_numbers(len(numbers) - misses, misses)
+        return numbers
+
+    def add_numbers(self, **numbers):
+        """
+        Add fibonacci numbers to repo.
+
+        :param numbers: dict of fibonacci numbers
+        :return:
+        """
+        started = perf_counter()
+        self.repo.add_numbers(**numbers)
+        self.metrics.observe_stage('repo_write', perf_counter() - started)
+
+
+def generate_metrics():
+    """
+    Get metrics in prometheus text format.
+
+    :return: bytes
+    """
+    if 'prometheus_multiproc_dir' in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
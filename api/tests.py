@@ -1,9 +1,18 @@
 """Tests for all in api package."""
+import asyncio
+import json
 import unittest
 from unittest.mock import MagicMock, patch
 
-from api import _create_request_from_request_args
+from api import _create_request_from_request_args, _cursor_serializer, \
+    _iter_json_array, create_app
+from api.asgi import create_asgi_app
+from api.formats import iter_binary, iter_csv, iter_msgpack, \
+    pack_msgpack_number
+from api.metrics import MetricsFibonacciNumbersRepo
+from repositories.memory import MemoryFibonacciNumbersRepo
 from run import app
+from shared.use_case import ResponseFailure
 
 numbers_list_mock = MagicMock(return_value=[None, None, None, None])
 add_numbers_mock = MagicMock()
@@ -32,6 +41,337 @@ class FibonacciTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data,
                          b'[2584, 4181, 6765, 10946]')
+        self.assertEqual(response.mimetype, 'application/json')
+
+    def test_cache_headers(self):
+        """
+        Get url with correct parameters.
+
+        Except response with etag and immutable cache control.
+        """
+        response = self.test_client.get('/fibonachi/?from=18&to=21')
+        self.assertEqual(response.headers['ETag'], '"fibonacci-18-21"')
+        self.assertEqual(response.headers['Cache-Control'],
+                         'public, max-age=31536000, immutable')
+
+    def test_if_none_match_with_same_etag(self):
+        """
+        Get url with etag of the same range.
+
+        Except response with 304 code without repo call.
+        """
+        numbers_list_mock.reset_mock()
+        response = self.test_client.get(
+            '/fibonachi/?from=18&to=21',
+            headers={'If-None-Match': '"fibonacci-18-21"'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], '"fibonacci-18-21"')
+        numbers_list_mock.assert_not_called()
+
+    def test_if_none_match_with_other_etag(self):
+        """
+        Get url with etag of other range.
+
+        Except response with 200 code.
+        """
+        response = self.test_client.get(
+            '/fibonachi/?from=18&to=21',
+            headers={'If-None-Match': '"fibonacci-18-22"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_with_mod_param(self):
+        """
+        Get url with mod parameter.
+
+        Except sequence modulo m without repo call and etag with modulus.
+        """
+        numbers_list_mock.reset_mock()
+        response = self.test_client.get('/fibonachi/?from=18&to=21&mod=100')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b'[84, 81, 65, 46]')
+        self.assertEqual(response.headers['ETag'], '"fibonacci-18-21-mod-100"')
+        numbers_list_mock.assert_not_called()
+
+    def test_with_format_param(self):
+        """
+        Get url with ndjson format parameter.
+
+        Except number per line and etag with format.
+        """
+        response = self.test_client.get(
+            '/fibonachi/?from=18&to=21&format=ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b'2584\n4181\n6765\n10946\n')
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(response.headers['ETag'],
+                         '"fibonacci-18-21-ndjson"')
+        self.assertEqual(response.headers['Vary'], 'Accept')
+
+    def test_with_accept_header(self):
+        """
+        Get url with csv in accept header.
+
+        Except csv with order and number columns.
+        """
+        response = self.test_client.get(
+            '/fibonachi/?from=18&to=21',
+            headers={'Accept': 'text/csv, application/json;q=0.5'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data,
+                         b'order,number\r\n18,2584\r\n19,4181\r\n'
+                         b'20,6765\r\n21,10946\r\n')
+        self.assertEqual(response.mimetype, 'text/csv')
+
+    def test_with_unsupported_accept_header(self):
+        """
+        Get url with accept header without supported media types.
+
+        Except json array.
+        """
+        response = self.test_client.get(
+            '/fibonachi/?from=18&to=21', headers={'Accept': 'text/html'})
+        self.assertEqual(response.data, b'[2584, 4181, 6765, 10946]')
+        self.assertEqual(response.headers['ETag'], '"fibonacci-18-21"')
+
+    def test_with_hex_format(self):
+        """
+        Get url with hex format parameter.
+
+        Except hexadecimal number per line.
+        """
+        response = self.test_client.get('/fibonachi/?from=18&to=21&format=hex')
+        self.assertEqual(response.data, b'a18\n1055\n1a6d\n2ac2\n')
+
+    def test_with_unknown_format(self):
+        """
+        Get url with unknown format parameter.
+
+        Except response with 400 code without repo call.
+        """
+        numbers_list_mock.reset_mock()
+        response = self.test_client.get(
+            '/fibonachi/?from=18&to=21&format=xml')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data,
+            b'{"type": "PARAMETERS_ERROR", "message": "format: must be one '
+            b'of json, ndjson, csv, msgpack, hex, binary"}')
+        numbers_list_mock.assert_not_called()
+
+    def test_page_link_with_format(self):
+        """
+        Get page of range with format parameter.
+
+        Except link to next page with the same format.
+        """
+        with patch('repositories.redis.FibonacciNumbersRepo.numbers_list',
+                   lambda self, start, end: [None] * (end - start + 1)):
+            response = self.test_client.get(
+                '/fibonachi/?from=18&to=21&limit=2&format=binary')
+        self.assertEqual(response.data,
+                         b'\x02\x00\x00\x00\x18\x0a'
+                         b'\x02\x00\x00\x00\x55\x10')
+        self.assertIn('format=binary', response.headers['Link'])
+
+    def test_number_url(self):
+        """
+        Get url of one fibonacci number.
+
+        Except response with number and etag of order.
+        """
+        with patch('repositories.redis.FibonacciNumbersRepo.numbers_list',
+                   MagicMock(return_value=[None, None])) as numbers_list:
+            response = self.test_client.get('/fibonachi/21')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b'10946')
+        self.assertEqual(response.headers['ETag'], '"fibonacci-21"')
+        numbers_list.assert_called_once_with(21, 22)
+
+    def test_number_url_with_too_far_order(self):
+        """
+        Get url of one fibonacci number with too far order.
+
+        Except response with 422 code without repo call.
+        """
+        numbers_list_mock.reset_mock()
+        for order in ('1000000000000', '9' * 400):
+            response = self.test_client.get('/fibonachi/' + order)
+            self.assertEqual(response.status_code, 422)
+            self.assertIn(b'LIMIT_ERROR', response.data)
+        numbers_list_mock.assert_not_called()
+
+    def test_number_url_with_incorrect_order(self):
+        """
+        Get url of one fibonacci number with not integer order.
+
+        Except response with 400 code.
+        """
+        response = self.test_client.get('/fibonachi/x')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data,
+                         b'{"type": "PARAMETERS_ERROR", '
+                         b'"message": "order: must be integer"}')
+
+    def test_digits_url(self):
+        """
+        Get url of digits of one fibonacci number.
+
+        Except json with count, leading and trailing digits.
+        """
+        response = self.test_client.get('/fibonachi/1000000000/digits?count=4')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data.decode()), {
+            'order': 1000000000, 'digits': 208987640,
+            'leading': '7952', 'trailing': '6875'})
+
+    def test_digits_url_with_too_far_order(self):
+        """
+        Get url of many digits of fibonacci number with too far order.
+
+        Except response with 422 code, because logarithm precision
+        is digits of order and count.
+        """
+        response = self.test_client.get(
+            '/fibonachi/1{}/digits?count=1000'.format('0' * 3000))
+        self.assertEqual(response.status_code, 422)
+        self.assertIn(b'LIMIT_ERROR', response.data)
+
+    def test_batch_url(self):
+        """
+        Post several queries to batch url.
+
+        Except json list with result per query.
+        """
+        with patch('repositories.redis.FibonacciNumbersRepo.numbers_list',
+                   lambda self, start, end: [None] * (end - start + 1)):
+            response = self.test_client.post(
+                '/fibonachi/batch',
+                data='{"queries": [{"from": 18, "to": 21}, {"n": 20}]}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data.decode()),
+                         [[2584, 4181, 6765, 10946], 6765])
+
+    def test_batch_url_without_queries(self):
+        """
+        Post not json to batch url.
+
+        Except response with 400 code.
+        """
+        response = self.test_client.post('/fibonachi/batch', data='x')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, b'{"type": "PARAMETERS_ERROR", '
+                                        b'"message": "queries: is required"}')
+
+    def test_pages_by_cursor(self):
+        """
+        Get range by pages with limit and follow links to next pages.
+
+        Except pages of range and no link on last page.
+        """
+        pages = []
+        url = '/fibonachi/?from=18&to=22&limit=2'
+        with patch('repositories.redis.FibonacciNumbersRepo.numbers_list',
+                   lambda self, start, end: [None] * (end - start + 1)):
+            while url:
+                response = self.test_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                pages.append(response.data)
+                link = response.headers.get('Link')
+                url = link[1:link.index('>')] if link else None
+        self.assertEqual(pages, [b'[2584, 4181]', b'[6765, 10946]',
+                                 b'[17711]'])
+
+    def test_cursor_with_secret(self):
+        """
+        Get page with secret key.
+
+        Except cursor with last numbers of page.
+        """
+        with patch.dict(app.config, {'SECRET': 'secret'}), \
+                patch('repositories.redis.FibonacciNumbersRepo.numbers_list',
+                      lambda self, start, end: [None] * (end - start + 1)):
+            response = self.test_client.get(
+                '/fibonachi/?from=18&to=22&limit=2')
+        link = response.headers['Link']
+        cursor = link[link.index('cursor=') + 7:link.index('&')]
+        self.assertEqual(_cursor_serializer('secret').loads(cursor), {
+            'start': 20, 'end': 22, 'previous': ['a18', '1055']})
+
+    def test_invalid_cursor(self):
+        """
+        Get url with not signed cursor.
+
+        Except response with 400 code.
+        """
+        response = self.test_client.get('/fibonachi/?cursor=x&limit=2')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, b'{"type": "PARAMETERS_ERROR", '
+                                        b'"message": "cursor: is invalid"}')
+
+    def test_too_expensive_range(self):
+        """
+        Get url with range above max cost.
+
+        Except response with 422 code without repo call.
+        """
+        numbers_list_mock.reset_mock()
+        response = self.test_client.get('/fibonachi/?from=0&to=5000000')
+        self.assertEqual(response.status_code, 422)
+        self.assertIn(b'LIMIT_ERROR', response.data)
+        numbers_list_mock.assert_not_called()
+
+    def test_too_expensive_far_number(self):
+        """
+        Get url with one far number in decimal and binary formats.
+
+        Except response with 422 code, because fast doubling and conversion
+        to decimal are expensive.
+        """
+        for query in ('from=1000000000&to=1000000000',
+                      'from=10000000&to=10000000',
+                      'from=10000000&to=10000000&format=binary'):
+            response = self.test_client.get('/fibonachi/?' + query)
+            self.assertEqual(response.status_code, 422, query)
+
+    def test_overloaded(self):
+        """
+        Get url, when in-flight cost budget is exceeded.
+
+        Except response with 503 code and Retry-After header.
+        """
+        with patch('api.AdmissionControl') as admission_class:
+            admission_class.return_value.admit.return_value = \
+                ResponseFailure.build_overload_error('retry later')
+            client = create_app(
+                'testing', repo=MemoryFibonacciNumbersRepo()).test_client()
+        response = client.get('/fibonachi/?from=0&to=10')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+    def test_cost_released_after_response(self):
+        """
+        Get url and close response.
+
+        Except admitted cost is released.
+        """
+        with patch('api.AdmissionControl') as admission_class:
+            admission = admission_class.return_value
+            admission.admit.return_value = None
+            client = create_app(
+                'testing', repo=MemoryFibonacciNumbersRepo()).test_client()
+        client.get('/fibonachi/?from=0&to=10').close()
+        cost = admission.admit.call_args[0][0]
+        admission.release.assert_called_once_with(cost)
+
+    def test_mod_param_must_be_positive(self):
+        """
+        Get url with zero mod parameter.
+
+        Except response with 400 code.
+        """
+        response = self.test_client.get('/fibonachi/?from=18&to=21&mod=0')
+        self.assertEqual(response.status_code, 400)
 
     def test_without_params(self):
         """
@@ -87,9 +427,99 @@ class FibonacciTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 400)
 
 
+@patch('repositories.redis.FibonacciNumbersRepo.numbers_list',
+       numbers_list_mock)
+@patch('repositories.redis.FibonacciNumbersRepo.add_numbers',
+       add_numbers_mock)
+class MetricsTestCase(unittest.TestCase):
+    """Tests for metrics url."""
+
+    def setUp(self):
+        """Set client for url requests."""
+        self.test_client = app.test_client(self)
+
+    def test_metrics_after_request(self):
+        """
+        Get metrics url after fibonachi url.
+
+        Except response with 200 code and metrics of stages and responses.
+        """
+        self.test_client.get('/fibonachi/?from=18&to=21')
+        self.test_client.get('/fibonachi/?from=x&to=21')
+        response = self.test_client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        for line in (b'fibonacci_stage_seconds_count{stage="repo_read"}',
+                     b'fibonacci_stage_seconds_count{stage="fill_gaps"}',
+                     b'fibonacci_stage_seconds_count{stage="serialize"}',
+                     b'fibonacci_responses_total{type="SUCCESS"}',
+                     b'fibonacci_responses_total{type="PARAMETERS_ERROR"}',
+                     b'fibonacci_computed_numbers_total',
+                     b'fibonacci_flights_total{result="started"}'):
+            self.assertIn(line, response.data)
+
+
+class MetricsFibonacciNumbersRepoTestCase(unittest.TestCase):
+    """Tests for MetricsFibonacciNumbersRepo."""
+
+    def test_numbers_list_records_hits(self):
+        """
+        Run numbers_list with partially filled repo.
+
+        Except read duration and counts of existing and missing numbers.
+        """
+        repo = MagicMock()
+        repo.numbers_list.return_value = [1, None, 2]
+        metrics = MagicMock()
+        metrics_repo = MetricsFibonacciNumbersRepo(repo, metrics)
+
+        self.assertEqual(metrics_repo.numbers_list(2, 4), [1, None, 2])
+        repo.numbers_list.assert_called_once_with(2, 4)
+        self.assertEqual(metrics.observe_stage.call_args[0][0], 'repo_read')
+        metrics.count_repo_numbers.assert_called_once_with(2, 1)
+
+    def test_add_numbers_records_duration(self):
+        """
+        Run add_numbers.
+
+        Except numbers added to repo and write duration.
+        """
+        repo = MagicMock()
+        metrics = MagicMock()
+        MetricsFibonacciNumbersRepo(repo, metrics).add_numbers(**{'3': 2})
+        repo.add_numbers.assert_called_once_with(**{'3': 2})
+        self.assertEqual(metrics.observe_stage.call_args[0][0], 'repo_write')
+
+
 class CreateRequestObjectFromRequestArgsTestCase(unittest.TestCase):
     """Tests for _create_request_from_request_args."""
 
+    def test_with_cursor(self):
+        """
+        Run with cursor signed by secret key.
+
+        Except range and previous numbers from cursor.
+        """
+        cursor = _cursor_serializer('secret').dumps(
+            {'start': 5, 'end': 9, 'previous': ['2', '3']})
+        request = _create_request_from_request_args(
+            {'cursor': cursor, 'limit': '2'}, 'secret')
+        self.assertTrue(request)
+        self.assertEqual((request.start, request.end, request.limit),
+                         (5, 9, 2))
+        self.assertEqual(request.previous, (2, 3))
+
+    def test_with_cursor_without_secret(self):
+        """
+        Run with cursor signed by public key.
+
+        Except previous numbers of cursor are ignored.
+        """
+        cursor = _cursor_serializer().dumps(
+            {'start': 5, 'end': 9, 'previous': ['1', '1']})
+        request = _create_request_from_request_args({'cursor': cursor})
+        self.assertEqual((request.start, request.end), (5, 9))
+        self.assertEqual(request.previous, ())
+
     def test_with_correct_params(self):
         """
         Run with correct args.
@@ -217,3 +647,185 @@ class CreateRequestObjectFromRequestArgsTestCase(unittest.TestCase):
         self.assertFalse(request)
         self.assertEqual(request.errors[0]['parameter'], 'start')
         self.assertEqual(request.errors[0]['message'], 'is required')
+
+
+class IterJsonArrayTestCase(unittest.TestCase):
+    """Tests for _iter_json_array."""
+
+    def test_with_several_chunks(self):
+        """
+        Run with more numbers than chunk size.
+
+        Except json array split to chunks.
+        """
+        parts = list(_iter_json_array(iter([0, 1, 1, 2, 3]), 2))
+        self.assertEqual(parts, ['[', '0, 1', ', 1, 2', ', 3', ']'])
+        self.assertEqual(''.join(parts), '[0, 1, 1, 2, 3]')
+
+    def test_with_empty_values(self):
+        """
+        Run without numbers.
+
+        Except empty json array.
+        """
+        self.assertEqual(''.join(_iter_json_array([], 2)), '[]')
+
+    def test_with_metrics(self):
+        """
+        Run with metrics.
+
+        Except serialized size of every chunk.
+        """
+        metrics = MagicMock()
+        list(_iter_json_array(iter([0, 1, 1, 2, 3]), 2, metrics))
+        self.assertEqual(metrics.count_serialized.call_args_list,
+                         [((4,),), ((6,),), ((3,),)])
+
+
+class FormatsTestCase(unittest.TestCase):
+    """Tests for wire formats of sequence."""
+
+    def test_csv_with_several_chunks(self):
+        """
+        Run csv serializer with more numbers than chunk size.
+
+        Except header and orders from start.
+        """
+        parts = list(iter_csv(iter([2, 3, 5]), 3, 2))
+        self.assertEqual(parts, ['order,number\r\n', '3,2\r\n4,3\r\n',
+                                 '5,5\r\n'])
+
+    def test_binary_with_zero(self):
+        """
+        Run binary serializer with zero and big number.
+
+        Except zero length of zero and little-endian bytes of number.
+        """
+        self.assertEqual(b''.join(iter_binary([0, 2 ** 64], 0, 10)),
+                         b'\x00\x00\x00\x00'
+                         b'\x09\x00\x00\x00' + bytes(8) + b'\x01')
+
+    def test_pack_msgpack_number(self):
+        """
+        Pack numbers of all sizes.
+
+        Except integer types up to 64 bits and bin type for greater.
+        """
+        self.assertEqual(pack_msgpack_number(5), b'\x05')
+        self.assertEqual(pack_msgpack_number(200), b'\xcc\xc8')
+        self.assertEqual(pack_msgpack_number(10946), b'\xcd\x2a\xc2')
+        self.assertEqual(pack_msgpack_number(2 ** 32),
+                         b'\xcf' + (2 ** 32).to_bytes(8, 'big'))
+        self.assertEqual(pack_msgpack_number(2 ** 64),
+                         b'\xc4\x09\x01' + bytes(8))
+        self.assertEqual(pack_msgpack_number(2 ** 2048)[:3], b'\xc5\x01\x01')
+
+    def test_msgpack_with_metrics(self):
+        """
+        Run msgpack serializer with metrics.
+
+        Except serialized size of every chunk.
+        """
+        metrics = MagicMock()
+        parts = list(iter_msgpack(iter([1, 2, 300]), 0, 2, metrics))
+        self.assertEqual(parts, [b'\x01\x02', b'\xcd\x01\x2c'])
+        self.assertEqual(metrics.count_serialized.call_args_list,
+                         [((2,),), ((3,),)])
+
+
+class AsyncRepoMock:
+    """Mock asyncio repo for test."""
+
+    def __init__(self):
+        """Set numbers dict."""
+        self.numbers = {}
+
+    async def numbers_list(self, start: int, end: int):
+        """Return sequence of fibonacci numbers."""
+        return [self.numbers.get(str(i)) for i in range(start, end + 1)]
+
+    async def add_numbers(self, **numbers):
+        """Add new numbers to repo."""
+        self.numbers.update(numbers)
+
+    async def close(self):
+        """Close repo."""
+
+
+class AsgiFibonacciTestCase(unittest.TestCase):
+    """Tests for fibonacci url of ASGI application."""
+
+    def setUp(self):
+        """Set ASGI application with repo mock."""
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.repo = AsyncRepoMock()
+        self.app = create_asgi_app('testing', repo=self.repo)
+
+    def get(self, path, query_string=b''):
+        """
+        Get url of ASGI application.
+
+        :return: status code and body of response
+        """
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request'}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': path,
+                 'query_string': query_string}
+        self.loop.run_until_complete(self.app(scope, receive, send))
+        self.headers = dict(messages[0]['headers'])
+        return (messages[0]['status'],
+                b''.join(message.get('body', b'')
+                         for message in messages[1:]))
+
+    def test_with_all_correct_params(self):
+        """
+        Get url with correct parameters.
+
+        Except response with 200 code and list with fibonacci sequence.
+        """
+        self.assertEqual(self.get('/fibonachi/', b'from=18&to=21'),
+                         (200, b'[2584, 4181, 6765, 10946]'))
+        self.assertEqual(self.headers[b'content-type'], b'application/json')
+        self.assertEqual(self.repo.numbers['21'], 10946)
+
+    def test_too_expensive_range(self):
+        """
+        Get url with range above max cost.
+
+        Except response with 422 code.
+        """
+        status, body = self.get('/fibonachi/', b'from=0&to=5000000')
+        self.assertEqual(status, 422)
+        self.assertIn(b'LIMIT_ERROR', body)
+
+    def test_with_mod_param(self):
+        """
+        Get url with mod parameter.
+
+        Except response with 200 code and sequence modulo m.
+        """
+        self.assertEqual(self.get('/fibonachi/', b'from=18&to=21&mod=100'),
+                         (200, b'[84, 81, 65, 46]'))
+
+    def test_without_params(self):
+        """
+        Get url without parameters.
+
+        Except response with 400 code.
+        """
+        self.assertEqual(self.get('/fibonachi/')[0], 400)
+
+    def test_unknown_url(self):
+        """
+        Get unknown url.
+
+        Except response with 404 code.
+        """
+        self.assertEqual(self.get('/unknown/')[0], 404)
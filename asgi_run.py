@@ -0,0 +1,7 @@
+"""Module for asgi server run."""
+import os
+
+from api.asgi import create_asgi_app
+
+config_name = os.getenv('APP_SETTINGS', 'production')
+app = create_asgi_app(config_name)
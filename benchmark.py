@@ -0,0 +1,168 @@
+"""
+Module for benchmarks of use case, repositories and http layers.
+
+Example: python benchmark.py --output current.json --baseline baseline.json
+"""
+import json
+import platform
+import statistics
+import sys
+import time
+
+from api import create_app
+import click
+from repositories.memory import MemoryFibonacciNumbersRepo
+from repositories.redis import FibonacciNumbersRepo
+from shared.admission import AdmissionControl
+from use_cases.fibonacci_numbers import GetFibonacciSequenceUseCase
+from use_cases.precompute import precompute_segment
+
+
+def _measure(function, setup, repeat: int):
+    """
+    Run function several times.
+
+    :param function: measured function with one argument
+    :param setup: function without arguments, which returns argument
+    of measured function, its time isn't measured
+    :param repeat: count of runs
+    :return: list of durations in seconds
+    """
+    durations = []
+    for _ in range(repeat):
+        argument = setup()
+        started = time.perf_counter()
+        function(argument)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def _filled_repo(start: int, end: int, repo=None):
+    if repo is None:
+        repo = MemoryFibonacciNumbersRepo()
+    precompute_segment(repo, start, end)
+    return repo
+
+
+def _cases(start: int, end: int, redis: bool):
+    """
+    Get benchmark cases for range.
+
+    :param start: start order number of range
+    :param end: end order number of range
+    :param redis: add cases with redis repo
+    :return: iterator of tuples with name, function and setup
+    """
+    warm_repo = _filled_repo(start, end)
+    middle = (start + end) // 2
+
+    yield ('calculate_fibonacci_number',
+           GetFibonacciSequenceUseCase._calculate_fibonacci_number,
+           lambda: end)
+    yield ('sequence_cold',
+           lambda use_case: use_case._get_fibonacci_sequence(start, end),
+           lambda: GetFibonacciSequenceUseCase(MemoryFibonacciNumbersRepo()))
+    yield ('sequence_partially_warm',
+           lambda use_case: use_case._get_fibonacci_sequence(start, end),
+           lambda: GetFibonacciSequenceUseCase(_filled_repo(start, middle)))
+    yield ('sequence_warm',
+           lambda use_case: use_case._get_fibonacci_sequence(start, end),
+           lambda: GetFibonacciSequenceUseCase(warm_repo))
+    yield ('memory_repo_numbers_list',
+           lambda repo: repo.numbers_list(start, end),
+           lambda: warm_repo)
+    if redis:
+        redis_repo = _filled_repo(start, end, FibonacciNumbersRepo())
+        yield ('redis_repo_numbers_list',
+               lambda repo: repo.numbers_list(start, end),
+               lambda: redis_repo)
+
+    app = create_app('testing', repo=warm_repo)
+    # View is measured with any range, so requests aren't rejected by cost.
+    app.extensions['fibonacci'].admission = AdmissionControl()
+    client = app.test_client()
+    url = '/fibonachi/?from={}&to={}'.format(start, end)
+    yield ('http_view',
+           lambda client: client.get(url).data,
+           lambda: client)
+
+
+def _compare(results: list, baseline: dict, threshold: float):
+    """
+    Compare results with baseline by median durations.
+
+    :param results: list of results
+    :param baseline: saved results
+    :param threshold: allowed relative slowdown
+    :return: list of regressed results
+    """
+    baseline_medians = {
+        (result['case'], result['size'], result['offset']): result['median']
+        for result in baseline['results']}
+    regressions = []
+    for result in results:
+        key = (result['case'], result['size'], result['offset'])
+        if key not in baseline_medians:
+            continue
+        ratio = result['median'] / baseline_medians[key]
+        click.echo('{:<28} size={:<7} offset={:<8} {:.2f}x'.format(
+            *key, ratio))
+        if ratio > 1 + threshold:
+            regressions.append(result)
+    return regressions
+
+
+def _parse_numbers(context, parameter, value):
+    try:
+        return [int(number) for number in value.split(',')]
+    except ValueError:
+        raise click.BadParameter('must be comma separated integers')
+
+
+@click.command()
+@click.option('--sizes', default='10,1000,10000', callback=_parse_numbers,
+              help='Comma separated sizes of ranges.')
+@click.option('--offsets', default='0,10000,100000',
+              callback=_parse_numbers,
+              help='Comma separated start order numbers of ranges.')
+@click.option('--repeat', default=5, type=click.IntRange(min=1),
+              help='Count of runs of every case.')
+@click.option('--redis/--no-redis', default=False,
+              help='Measure redis repo by REDIS_URL.')
+@click.option('--output', default='benchmark.json',
+              type=click.Path(dir_okay=False),
+              help='File for results in json.')
+@click.option('--baseline', default=None,
+              type=click.Path(exists=True, dir_okay=False),
+              help='File with saved results for comparison.')
+@click.option('--threshold', default=0.2, type=float,
+              help='Allowed relative slowdown against baseline.')
+def benchmark(sizes, offsets, repeat, redis, output, baseline, threshold):
+    """Measure layers of application for matrix of ranges."""
+    results = []
+    for offset in offsets:
+        for size in sizes:
+            start, end = offset, offset + size - 1
+            for case, function, setup in _cases(start, end, redis):
+                durations = _measure(function, setup, repeat)
+                results.append({
+                    'case': case, 'size': size, 'offset': offset,
+                    'repeat': repeat, 'min': min(durations),
+                    'median': statistics.median(durations)})
+                click.echo('{:<28} size={:<7} offset={:<8} {:.6f}s'.format(
+                    case, size, offset, results[-1]['median']))
+
+    with open(output, 'w') as file:
+        json.dump({'python': platform.python_version(),
+                   'results': results}, file, indent=2)
+
+    if baseline is not None:
+        with open(baseline) as file:
+            regressions = _compare(results, json.load(file), threshold)
+        if regressions:
+            click.echo('{} regressions'.format(len(regressions)))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    benchmark()
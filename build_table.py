@@ -0,0 +1,30 @@
+"""
+Module for building of read-only table file of fibonacci numbers.
+
+Example: python build_table.py 0 100000 --output fibonacci_numbers.table
+"""
+import time
+
+import click
+from repositories.table import build_table
+
+
+@click.command()
+@click.argument('start', type=click.IntRange(min=0))
+@click.argument('end', type=click.IntRange(min=0))
+@click.option('--output', default='fibonacci_numbers.table',
+              type=click.Path(dir_okay=False),
+              help='Path of table file.')
+def build(start, end, output):
+    """Write fibonacci numbers from START to END to table file."""
+    if end < start:
+        raise click.BadParameter('must be greater than or equal to START',
+                                 param_hint='END')
+    started = time.time()
+    size = build_table(output, start, end)
+    click.echo('{} numbers, {} bytes, {:.1f}s'.format(
+        end - start + 1, size, time.time() - started))
+
+
+if __name__ == '__main__':
+    build()
@@ -1,14 +1,68 @@
 """Settings for flask application."""
+from functools import lru_cache
 import os
 
-import redis
-
 
 class Config:
     """Parent configuration class."""
 
     DEBUG = False
     SECRET = os.getenv('SECRET')
+    FIBONACCI_CHUNK_SIZE = int(os.getenv('FIBONACCI_CHUNK_SIZE', 1000))
+    # Admission of requests by estimated cost in digit operations and
+    # response size in bytes, 0 - without limit.
+    FIBONACCI_MAX_REQUEST_COST = int(
+        os.getenv('FIBONACCI_MAX_REQUEST_COST', 10 ** 10))
+    FIBONACCI_MAX_RESPONSE_BYTES = int(
+        os.getenv('FIBONACCI_MAX_RESPONSE_BYTES', 256 * 1024 * 1024))
+    # Max sum of costs of requests in flight of worker and max cost
+    # of requests admitted regardless of it.
+    FIBONACCI_COST_BUDGET = int(
+        os.getenv('FIBONACCI_COST_BUDGET', 4 * 10 ** 10))
+    FIBONACCI_CHEAP_COST = int(os.getenv('FIBONACCI_CHEAP_COST', 10 ** 7))
+    # Max limit of numbers of sequence page.
+    FIBONACCI_MAX_LIMIT = int(os.getenv('FIBONACCI_MAX_LIMIT', 10000))
+    # Max age in seconds of cached fibonacci sequence responses.
+    FIBONACCI_HTTP_MAX_AGE = int(
+        os.getenv('FIBONACCI_HTTP_MAX_AGE', 365 * 24 * 60 * 60))
+    # Prometheus metrics and /metrics url.
+    FIBONACCI_METRICS = os.getenv('FIBONACCI_METRICS', '1') == '1'
+    # Coalesce concurrent calculations of overlapping ranges in worker.
+    FIBONACCI_SINGLE_FLIGHT = os.getenv('FIBONACCI_SINGLE_FLIGHT', '1') == '1'
+    # Backend of numbers: redis, sqlite or memory (per worker).
+    FIBONACCI_REPO = os.getenv('FIBONACCI_REPO', 'redis')
+    FIBONACCI_SQLITE_PATH = os.getenv(
+        'FIBONACCI_SQLITE_PATH', 'fibonacci_numbers.sqlite3')
+    # Read-only table file by build_table.py in front of backend,
+    # empty - without table.
+    FIBONACCI_TABLE_PATH = os.getenv('FIBONACCI_TABLE_PATH', '')
+    # Layout of numbers in redis: keys - key per number,
+    # blocks - hash per block of numbers.
+    FIBONACCI_REDIS_LAYOUT = os.getenv('FIBONACCI_REDIS_LAYOUT', 'keys')
+    FIBONACCI_REDIS_BLOCK_SIZE = int(
+        os.getenv('FIBONACCI_REDIS_BLOCK_SIZE', 1000))
+    # Step between stored checkpoints, 0 - store all numbers.
+    FIBONACCI_CHECKPOINT_STEP = int(
+        os.getenv('FIBONACCI_CHECKPOINT_STEP', 0))
+    # Max count of queued writes of calculated numbers, which are written
+    # to redis by background thread, 0 - write in request thread.
+    FIBONACCI_WRITE_BEHIND_QUEUE_SIZE = int(
+        os.getenv('FIBONACCI_WRITE_BEHIND_QUEUE_SIZE', 0))
+    FIBONACCI_WRITE_BEHIND_BATCH_SIZE = int(
+        os.getenv('FIBONACCI_WRITE_BEHIND_BATCH_SIZE', 10000))
+    # Per-worker cache of numbers, 0 - disabled.
+    FIBONACCI_CACHE_MAX_BYTES = int(
+        os.getenv('FIBONACCI_CACHE_MAX_BYTES', 0))
+    FIBONACCI_CACHE_SEGMENT_SIZE = int(
+        os.getenv('FIBONACCI_CACHE_SEGMENT_SIZE', 256))
+    # Processes for calculation of missing chunks, 0 - calculation
+    # in request thread.
+    FIBONACCI_PROCESSES = int(os.getenv('FIBONACCI_PROCESSES', 0))
+    FIBONACCI_BATCH_MAX_QUERIES = int(
+        os.getenv('FIBONACCI_BATCH_MAX_QUERIES', 100))
+    # Max modulus of sequences modulo m served from Pisano period tables.
+    FIBONACCI_PISANO_TABLE_MAX_MODULUS = int(
+        os.getenv('FIBONACCI_PISANO_TABLE_MAX_MODULUS', 100000))
 
 
 class DevelopmentConfig(Config):
@@ -45,5 +99,23 @@ app_config = {
 }
 
 redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
-redis_client = redis.from_url(redis_url)
 FIBONACCI_NUMBERS_REDIS_KEY = 'fibonacci_numbers'
+# Max count of keys in one redis command.
+REDIS_BATCH_SIZE = int(os.getenv('REDIS_BATCH_SIZE', 1000))
+# Store numbers in binary codec instead of decimal strings.
+REDIS_BINARY_NUMBERS = os.getenv('REDIS_BINARY_NUMBERS', '0') == '1'
+# Min size in bytes of compressed numbers, 0 - without compression.
+REDIS_COMPRESS_THRESHOLD = int(os.getenv('REDIS_COMPRESS_THRESHOLD', 0))
+
+
+@lru_cache(maxsize=None)
+def get_redis_client():
+    """
+    Create redis client on first use.
+
+    So application with other backend doesn't need redis.
+
+    :return: redis client
+    """
+    import redis
+    return redis.from_url(redis_url)
@@ -0,0 +1,38 @@
+"""
+Module for migration of numbers in redis to current codec.
+
+Example: REDIS_BINARY_NUMBERS=1 python migrate_numbers.py 0 1000000
+"""
+import os
+import time
+
+import click
+from instance.settings import app_config
+from repositories import create_redis_repo
+from use_cases.precompute import split_range
+
+
+@click.command()
+@click.argument('start', type=click.IntRange(min=0))
+@click.argument('end', type=click.IntRange(min=0))
+@click.option('--segment-size', default=100000, type=click.IntRange(min=1),
+              help='Count of numbers migrated at once.')
+def migrate(start, end, segment_size):
+    """Save existing numbers from START to END again by current codec."""
+    if end < start:
+        raise click.BadParameter('must be greater than or equal to START',
+                                 param_hint='END')
+    config_class = app_config[os.getenv('APP_SETTINGS', 'production')]
+    repo = create_redis_repo({
+        'FIBONACCI_REDIS_LAYOUT': config_class.FIBONACCI_REDIS_LAYOUT,
+        'FIBONACCI_REDIS_BLOCK_SIZE': config_class.FIBONACCI_REDIS_BLOCK_SIZE})
+    started = time.time()
+    total = 0
+    for segment_start, segment_end in split_range(start, end, segment_size):
+        total += repo.migrate_numbers(segment_start, segment_end)
+        click.echo('{}..{}: {} numbers migrated, {:.1f}s'.format(
+            segment_start, segment_end, total, time.time() - started))
+
+
+if __name__ == '__main__':
+    migrate()
@@ -0,0 +1,97 @@
+"""
+Module for precomputing fibonacci numbers into configured repo.
+
+Example: python precompute.py 0 1000000 --processes 4
+"""
+from multiprocessing import Pool
+import os
+import time
+
+import click
+from instance.settings import app_config
+from repositories import create_repo
+from use_cases.precompute import precompute_segment, read_progress, \
+    save_progress, split_range
+
+_repo = None
+
+
+def _init_worker(config):
+    global _repo
+    _repo = create_repo(config)
+
+
+def _precompute_segment(segment):
+    start, end, batch_size = segment
+    return start, end, precompute_segment(_repo, start, end, batch_size)
+
+
+def _repo_config(config_name):
+    """
+    Get repo config without creating of application.
+
+    Workers are forked from this process, so it must not have process
+    pool, write-behind thread and metrics of application.
+
+    :param config_name: application configuration name
+    :return: dict of repo settings
+    """
+    config_class = app_config[config_name]
+    config = {key: getattr(config_class, key) for key in dir(config_class)
+              if key.startswith('FIBONACCI_')}
+    # Pool workers exit without atexit handlers, so queued numbers would
+    # be lost after segment is marked complete.
+    config['FIBONACCI_WRITE_BEHIND_QUEUE_SIZE'] = 0
+    return config
+
+
+@click.command()
+@click.argument('start', type=click.IntRange(min=0))
+@click.argument('end', type=click.IntRange(min=0))
+@click.option('--processes', default=1, type=click.IntRange(min=1),
+              help='Count of worker processes.')
+@click.option('--segment-size', default=10000, type=click.IntRange(min=1),
+              help='Count of numbers calculated by worker at once.')
+@click.option('--batch-size', default=1000, type=click.IntRange(min=1),
+              help='Count of numbers added to repo at once.')
+@click.option('--progress', default='precompute.progress',
+              type=click.Path(dir_okay=False),
+              help='Path of file with completed segments for resume.')
+def precompute(start, end, processes, segment_size, batch_size, progress):
+    """Calculate fibonacci numbers from START to END and add them to repo."""
+    config = _repo_config(os.getenv('APP_SETTINGS', 'production'))
+    completed = read_progress(progress)
+    all_segments = split_range(start, end, segment_size)
+    segments = [(segment_start, segment_end, batch_size)
+                for segment_start, segment_end in all_segments
+                if (segment_start, segment_end) not in completed]
+    click.echo('{} segments, {} complete segments are skipped'.format(
+        len(segments), len(all_segments) - len(segments)))
+
+    if processes == 1:
+        _init_worker(config)
+        results = map(_precompute_segment, segments)
+    else:
+        pool = Pool(processes, _init_worker, (config,))
+        results = pool.imap_unordered(_precompute_segment, segments)
+
+    started = time.time()
+    total = 0
+    with open(progress, 'a') as progress_file:
+        for done, result in enumerate(results, 1):
+            segment_start, segment_end, count = result
+            save_progress(progress_file, segment_start, segment_end)
+            total += count
+            elapsed = time.time() - started
+            click.echo('{}/{} segments, {}..{}: added {} numbers, '
+                       '{:.0f} numbers/s'.format(
+                           done, len(segments), segment_start, segment_end,
+                           count, total / elapsed if elapsed else 0))
+
+    if processes > 1:
+        pool.close()
+        pool.join()
+
+
+if __name__ == '__main__':
+    precompute()
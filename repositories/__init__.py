@@ -1 +1,65 @@
-"""Empty init."""
+"""Repositories of fibonacci numbers."""
+import atexit
+
+from repositories.cache import CachedFibonacciNumbersRepo
+from repositories.checkpoints import CheckpointFibonacciNumbersRepo
+from repositories.memory import MemoryFibonacciNumbersRepo
+from repositories.redis import BlockFibonacciNumbersRepo, \
+    FibonacciNumbersRepo
+from repositories.sqlite import SqliteFibonacciNumbersRepo
+from repositories.table import TableFibonacciNumbersRepo
+from repositories.write_behind import WriteBehindFibonacciNumbersRepo
+
+
+def create_repo(config, metrics=None):
+    """
+    Create fibonacci numbers repo by application config.
+
+    :param config: application config
+    :param metrics: recorder of cache metrics, None - without metrics
+    :return: repo object
+    """
+    backend = config['FIBONACCI_REPO']
+    if backend == 'redis':
+        repo = create_redis_repo(config)
+    elif backend == 'sqlite':
+        repo = SqliteFibonacciNumbersRepo(config['FIBONACCI_SQLITE_PATH'])
+    elif backend == 'memory':
+        repo = MemoryFibonacciNumbersRepo()
+    else:
+        raise ValueError('unknown repo backend: {}'.format(backend))
+    if config['FIBONACCI_WRITE_BEHIND_QUEUE_SIZE']:
+        repo = WriteBehindFibonacciNumbersRepo(
+            repo,
+            queue_size=config['FIBONACCI_WRITE_BEHIND_QUEUE_SIZE'],
+            batch_size=config['FIBONACCI_WRITE_BEHIND_BATCH_SIZE'])
+        # Queued numbers are written before exit of worker.
+        atexit.register(repo.close)
+    if config['FIBONACCI_TABLE_PATH']:
+        repo = TableFibonacciNumbersRepo(config['FIBONACCI_TABLE_PATH'], repo)
+    if config['FIBONACCI_CHECKPOINT_STEP']:
+        repo = CheckpointFibonacciNumbersRepo(
+            repo, step=config['FIBONACCI_CHECKPOINT_STEP'])
+    if config['FIBONACCI_CACHE_MAX_BYTES']:
+        repo = CachedFibonacciNumbersRepo(
+            repo,
+            max_bytes=config['FIBONACCI_CACHE_MAX_BYTES'],
+            segment_size=config['FIBONACCI_CACHE_SEGMENT_SIZE'],
+            metrics=metrics)
+    return repo
+
+
+def create_redis_repo(config):
+    """
+    Create redis repo by layout of application config.
+
+    :param config: application config
+    :return: redis repo object
+    """
+    layout = config['FIBONACCI_REDIS_LAYOUT']
+    if layout == 'keys':
+        return FibonacciNumbersRepo()
+    if layout == 'blocks':
+        return BlockFibonacciNumbersRepo(
+            block_size=config['FIBONACCI_REDIS_BLOCK_SIZE'])
+    raise ValueError('unknown redis layout: {}'.format(layout))
@@ -0,0 +1,106 @@
+"""Asyncio redis repository for application."""
+from itertools import chain, islice
+
+import aioredis
+from instance.settings import REDIS_BATCH_SIZE, REDIS_BINARY_NUMBERS, \
+    REDIS_COMPRESS_THRESHOLD, redis_url
+from repositories.codecs import decode_number, encode_number
+from shared.fibonacci import check_range
+
+
+class AsyncFibonacciNumbersRepo:
+    """
+    Asyncio redis repo for fibonacci numbers.
+
+    Same keys, values and batches as FibonacciNumbersRepo, but methods
+    are coroutines. Connection pool is created on first command.
+    """
+
+    def __init__(self, url: str = redis_url,
+                 batch_size: int = REDIS_BATCH_SIZE,
+                 binary: bool = REDIS_BINARY_NUMBERS,
+                 compress_threshold: int = REDIS_COMPRESS_THRESHOLD):
+        """
+        Set redis url, batch size and codec options.
+
+        :param url: redis server url
+        :param batch_size: max count of keys in one redis command
+        :param binary: save numbers by binary codec
+        :param compress_threshold: min size in bytes of compressed
+        binary numbers, 0 - without compression
+        """
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive')
+        self.url = url
+        self.batch_size = batch_size
+        self.binary = binary
+        self.compress_threshold = compress_threshold
+        self._client = None
+
+    async def numbers_list(self, start: int, end: int):
+        """
+        Get list of fibonacci sequence from redis.
+
+        :param start: start order number of fibonacci sequence
+        :param end: end order number of fibonacci sequence
+        :return: list with fibonacci sequence
+        """
+        check_range(start, end)
+
+        client = await self._get_client()
+        pipeline = client.pipeline()
+        for batch_start in range(start, end + 1, self.batch_size):
+            batch_end = min(batch_start + self.batch_size, end + 1)
+            pipeline.mget(*range(batch_start, batch_end))
+
+        numbers = []
+        for response in await pipeline.execute():
+            numbers.extend(
+                i if i is None else decode_number(i) for i in response)
+        return numbers
+
+    async def add_numbers(self, **numbers):
+        """
+        Add fibonacci numbers to redis.
+
+        :param numbers: dict of fibonacci numbers
+        :return:
+        """
+        if len(numbers):
+            if not all(isinstance(value, int) for value in numbers.values()):
+                raise TypeError('All values must be integer')
+            client = await self._get_client()
+            pipeline = client.pipeline()
+            items = (
+                (order, self._encode_number(number))
+                for order, number in numbers.items())
+            batch = list(islice(items, self.batch_size))
+            while batch:
+                pipeline.mset(*chain.from_iterable(batch))
+                batch = list(islice(items, self.batch_size))
+            await pipeline.execute()
+
+    async def close(self):
+        """
+        Close connection pool.
+
+        :return:
+        """
+        if self._client is not None:
+            client, self._client = self._client, None
+            client.close()
+            await client.wait_closed()
+
+    async def _get_client(self):
+        if self._client is None:
+            client = await aioredis.create_redis_pool(self.url)
+            if self._client is None:
+                self._client = client
+            else:
+                client.close()
+        return self._client
+
+    def _encode_number(self, number: int):
+        if self.binary:
+            return encode_number(number, self.compress_threshold)
+        return number
@@ -0,0 +1,145 @@
+"""In-process cache for fibonacci numbers repo."""
+from collections import OrderedDict
+import sys
+from threading import Lock
+
+from shared.fibonacci import check_range
+
+
+class CachedFibonacciNumbersRepo:
+    """
+    LRU cache of fibonacci numbers segments in front of other repo.
+
+    Segment - aligned range of segment_size order numbers. Missing numbers
+    of cached segments are filled by add_numbers, so segments of the same
+    worker never become stale. Size of cache is limited in bytes, least
+    recently used segments are evicted first.
+    """
+
+    def __init__(self, repo, max_bytes: int, segment_size: int = 256,
+                 metrics=None):
+        """
+        Set repo and cache limits.
+
+        :param repo: cached repo with numbers_list and add_numbers methods
+        :param max_bytes: max size of cached numbers in bytes
+        :param segment_size: count of numbers in one segment
+        :param metrics: recorder of hits and misses, None - only counters
+        """
+        if max_bytes < 1:
+            raise ValueError('max_bytes must be positive')
+        if segment_size < 1:
+            raise ValueError('segment_size must be positive')
+        self.repo = repo
+        self.max_bytes = max_bytes
+        self.segment_size = segment_size
+        self.metrics = metrics
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._segments = OrderedDict()
+        self._lock = Lock()
+
+    def numbers_list(self, start: int, end: int):
+        """
+        Get list of fibonacci sequence from cache or repo.
+
+        :param start: start order number of fibonacci sequence
+        :param end: end order number of fibonacci sequence
+        :return: list with fibonacci sequence
+        """
+        check_range(start, end)
+
+        first = start // self.segment_size
+        last = end // self.segment_size
+        segments = self._get_segments(first, last)
+        missing_runs = list(self._missing_runs(first, last, segments))
+        for run_first, run_last in missing_runs:
+            numbers = self.repo.numbers_list(
+                run_first * self.segment_size,
+                (run_last + 1) * self.segment_size - 1)
+            for index in range(run_first, run_last + 1):
+                offset = (index - run_first) * self.segment_size
+                segment = numbers[offset:offset + self.segment_size]
+                segments[index] = segment
+                self._put_segment(index, segment)
+
+        numbers = []
+        for index in range(first, last + 1):
+            numbers.extend(segments[index])
+        offset = first * self.segment_size
+        return numbers[start - offset:end - offset + 1]
+
+    def add_numbers(self, **numbers):
+        """
+        Add fibonacci numbers to repo and cached segments.
+
+        :param numbers: dict of fibonacci numbers
+        :return:
+        """
+        self.repo.add_numbers(**numbers)
+        with self._lock:
+            for order, number in numbers.items():
+                index, offset = divmod(int(order), self.segment_size)
+                cached = self._segments.get(index)
+                if cached is None or cached[0][offset] is not None:
+                    continue
+                segment, size = cached
+                segment[offset] = number
+                size += sys.getsizeof(number) - sys.getsizeof(None)
+                self._segments[index] = (segment, size)
+                self.size += size - cached[1]
+            self._evict()
+
+    def clear(self):
+        """
+        Remove all segments from cache.
+
+        :return:
+        """
+        with self._lock:
+            self._segments.clear()
+            self.size = 0
+
+    def _get_segments(self, first: int, last: int):
+        segments = {}
+        with self._lock:
+            for index in range(first, last + 1):
+                cached = self._segments.get(index)
+                if cached is not None:
+                    self._segments.move_to_end(index)
+                    segments[index] = cached[0]
+            hits = len(segments)
+            misses = last - first + 1 - hits
+            self.hits += hits
+            self.misses += misses
+        if self.metrics is not None:
+            self.metrics.count_cache_segments(hits, misses)
+        return segments
+
+    @staticmethod
+    def _missing_runs(first: int, last: int, segments: dict):
+        run_first = None
+        for index in range(first, last + 2):
+            if index <= last and index not in segments:
+                if run_first is None:
+                    run_first = index
+            elif run_first is not None:
+                yield run_first, index - 1
+                run_first = None
+
+    def _put_segment(self, index: int, segment: list):
+        size = sys.getsizeof(segment) + sum(map(sys.getsizeof, segment))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if index in self._segments:
+                return
+            self._segments[index] = (segment, size)
+            self.size += size
+            self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes:
+            _, (_, size) = self._segments.popitem(last=False)
+            self.size -= size
@@ -0,0 +1,63 @@
+"""Sparse storage of fibonacci numbers by checkpoints."""
+from shared.fibonacci import check_range, fibonacci_pair
+
+
+class CheckpointFibonacciNumbersRepo:
+    """
+    Repo, which keeps only checkpoints in other repo.
+
+    Checkpoint - pair of fibonacci numbers with order numbers k and k+1,
+    where k is multiple of step. Other numbers are calculated from
+    the nearest checkpoint below requested range, missing checkpoint is
+    calculated by fast doubling and saved, so every range is calculated
+    by additions from checkpoint after the first read.
+    """
+
+    def __init__(self, repo, step: int = 1000):
+        """
+        Set repo and step between checkpoints.
+
+        :param repo: repo with numbers_list and add_numbers methods
+        :param step: count of order numbers between checkpoints
+        """
+        if step < 2:
+            raise ValueError('step must be greater than 1')
+        self.repo = repo
+        self.step = step
+
+    def numbers_list(self, start: int, end: int):
+        """
+        Get list of fibonacci sequence from the nearest checkpoint.
+
+        :param start: start order number of fibonacci sequence
+        :param end: end order number of fibonacci sequence
+        :return: list with fibonacci sequence
+        """
+        check_range(start, end)
+
+        checkpoint = start - start % self.step
+        current, following = self.repo.numbers_list(
+            checkpoint, checkpoint + 1)
+        if current is None or following is None:
+            current, following = fibonacci_pair(checkpoint)
+            self.repo.add_numbers(**{str(checkpoint): current,
+                                     str(checkpoint + 1): following})
+
+        for _ in range(checkpoint, start):
+            current, following = following, current + following
+        numbers = []
+        for _ in range(start, end + 1):
+            numbers.append(current)
+            current, following = following, current + following
+        return numbers
+
+    def add_numbers(self, **numbers):
+        """
+        Add checkpoints from fibonacci numbers to repo.
+
+        :param numbers: dict of fibonacci numbers
+        :return:
+        """
+        self.repo.add_numbers(**{
+            order: number for order, number in numbers.items()
+            if int(order) % self.step < 2})
@@ -0,0 +1,47 @@
+"""Codecs of fibonacci numbers for storages."""
+import zlib
+
+# First byte of encoded value - codec version. Decimal values start with
+# digit, so they are never confused with versioned values.
+BINARY_VERSION = b'\x01'
+COMPRESSED_BINARY_VERSION = b'\x02'
+DECIMAL_DIGITS = b'0123456789'
+
+
+def encode_number(number: int, compress_threshold: int = 0):
+    """
+    Encode fibonacci number to versioned binary value.
+
+    :param number: fibonacci number
+    :param compress_threshold: min size in bytes of compressed value,
+    0 - without compression
+    :return: bytes
+    """
+    if not isinstance(number, int):
+        raise TypeError('number must be integer')
+    if number < 0:
+        raise ValueError('number must be positive')
+
+    payload = number.to_bytes((number.bit_length() + 7) // 8 or 1, 'little')
+    if compress_threshold and len(payload) >= compress_threshold:
+        compressed = zlib.compress(payload)
+        if len(compressed) < len(payload):
+            return COMPRESSED_BINARY_VERSION + compressed
+    return BINARY_VERSION + payload
+
+
+def decode_number(value: bytes):
+    """
+    Decode fibonacci number from versioned binary or decimal value.
+
+    :param value: encoded value
+    :return: fibonacci number
+    """
+    version = value[:1]
+    if version == BINARY_VERSION:
+        return int.from_bytes(value[1:], 'little')
+    if version == COMPRESSED_BINARY_VERSION:
+        return int.from_bytes(zlib.decompress(value[1:]), 'little')
+    if version and version in DECIMAL_DIGITS:
+        return int(value)
+    raise ValueError('unknown codec of value')
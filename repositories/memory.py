@@ -0,0 +1,44 @@
+"""In-memory repository for application."""
+from threading import Lock
+
+from shared.fibonacci import check_range
+
+
+class MemoryFibonacciNumbersRepo:
+    """
+    In-process repo for fibonacci numbers.
+
+    Numbers are kept in dict by order number, so they live only while
+    process lives and aren't shared between workers.
+    """
+
+    def __init__(self):
+        """Set numbers dict."""
+        self._numbers = {}
+        self._lock = Lock()
+
+    def numbers_list(self, start: int, end: int):
+        """
+        Get list of fibonacci sequence from memory.
+
+        :param start: start order number of fibonacci sequence
+        :param end: end order number of fibonacci sequence
+        :return: list with fibonacci sequence
+        """
+        check_range(start, end)
+
+        get = self._numbers.get
+        return [get(order) for order in range(start, end + 1)]
+
+    def add_numbers(self, **numbers):
+        """
+        Add fibonacci numbers to memory.
+
+        :param numbers: dict of fibonacci numbers
+        :return:
+        """
+        if not all(isinstance(value, int) for value in numbers.values()):
+            raise TypeError('All values must be integer')
+        with self._lock:
+            self._numbers.update(
+                (int(order), number) for order, number in numbers.items())
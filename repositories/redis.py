@@ -1,5 +1,11 @@
 """Redis repository for application."""
-from instance.settings import FIBONACCI_NUMBERS_REDIS_KEY, redis_client
+from itertools import islice
+
+from instance.settings import FIBONACCI_NUMBERS_REDIS_KEY, \
+    get_redis_client, REDIS_BATCH_SIZE, REDIS_BINARY_NUMBERS, \
+    REDIS_COMPRESS_THRESHOLD
+from repositories.codecs import decode_number, encode_number
+from shared.fibonacci import check_range
 
 
 class FibonacciNumbersRepo:
@@ -7,12 +13,33 @@ class FibonacciNumbersRepo:
     Redis repo for fibonacci numbers.
 
     Key - order number of fibonacci number.
-    Value - fibonacci number.
+    Value - fibonacci number, decimal or encoded by binary codec.
+
+    Large ranges are split to batches of batch_size keys, which are sent
+    in one pipeline, so redis can serve other clients between batches.
     """
 
-    __client = redis_client
+    # None - client by REDIS_URL, created on first use.
+    __client = None
     __key = FIBONACCI_NUMBERS_REDIS_KEY
 
+    def __init__(self, batch_size: int = REDIS_BATCH_SIZE,
+                 binary: bool = REDIS_BINARY_NUMBERS,
+                 compress_threshold: int = REDIS_COMPRESS_THRESHOLD):
+        """
+        Set batch size and codec options.
+
+        :param batch_size: max count of keys in one redis command
+        :param binary: save numbers by binary codec
+        :param compress_threshold: min size in bytes of compressed
+        binary numbers, 0 - without compression
+        """
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive')
+        self.batch_size = batch_size
+        self.binary = binary
+        self.compress_threshold = compress_threshold
+
     def numbers_list(self, start: int, end: int):
         """
         Get list of fibonacci sequence from redis.
@@ -21,19 +48,9 @@ class FibonacciNumbersRepo:
         :param end: end order number of fibonacci sequence
         :return: list with fibonacci sequence
         """
-        if not isinstance(start, int):
-            raise TypeError('start must be integer')
-        if not isinstance(end, int):
-            raise TypeError('end must be integer')
-        if start < 0:
-            raise ValueError('start must be positive')
-        if end < 0:
-            raise ValueError('end must be positive')
-        if end < start:
-            raise ValueError('end must be greater than or equal to start')
+        check_range(start, end)
 
-        response = self.__client.mget(range(start, end+1))
-        return [i if i is None else int(i) for i in response]
+        return self._read_numbers(start, end)
 
     def add_numbers(self, **numbers):
         """
@@ -45,4 +62,112 @@ class FibonacciNumbersRepo:
         if len(numbers):
             if not all(isinstance(value, int) for value in numbers.values()):
                 raise TypeError('All values must be integer')
-            self.__client.mset(**numbers)
+            self._write_numbers(numbers)
+
+    def _get_client(self):
+        if self.__client is None:
+            return get_redis_client()
+        return self.__client
+
+    def _read_numbers(self, start: int, end: int):
+        pipeline = self._get_client().pipeline(transaction=False)
+        for batch_start in range(start, end + 1, self.batch_size):
+            batch_end = min(batch_start + self.batch_size, end + 1)
+            pipeline.mget(range(batch_start, batch_end))
+
+        numbers = []
+        for response in pipeline.execute():
+            numbers.extend(
+                i if i is None else decode_number(i) for i in response)
+        return numbers
+
+    def _write_numbers(self, numbers: dict):
+        pipeline = self._get_client().pipeline(transaction=False)
+        items = (
+            (order, self._encode_number(number))
+            for order, number in numbers.items())
+        batch = dict(islice(items, self.batch_size))
+        while batch:
+            pipeline.mset(batch)
+            batch = dict(islice(items, self.batch_size))
+        pipeline.execute()
+
+    def _encode_number(self, number: int):
+        if self.binary:
+            return encode_number(number, self.compress_threshold)
+        return number
+
+    def migrate_numbers(self, start: int, end: int):
+        """
+        Save existing numbers of range again by current codec.
+
+        :param start: start order number of range
+        :param end: end order number of range
+        :return: count of saved numbers
+        """
+        count = 0
+        for batch_start in range(start, end + 1, self.batch_size):
+            batch_end = min(batch_start + self.batch_size - 1, end)
+            numbers = {
+                str(batch_start + index): number for index, number in
+                enumerate(self.numbers_list(batch_start, batch_end))
+                if number is not None}
+            self.add_numbers(**numbers)
+            count += len(numbers)
+        return count
+
+
+class BlockFibonacciNumbersRepo(FibonacciNumbersRepo):
+    """
+    Redis repo for fibonacci numbers grouped to blocks.
+
+    Key - fibonacci_numbers:<order number // block_size>, redis hash.
+    Field - order number % block_size.
+    Value - fibonacci number, decimal or encoded by binary codec.
+
+    Range is read by one HMGET per block, so read of range and keyspace
+    overhead depend on count of blocks instead of count of numbers.
+    """
+
+    __key = FIBONACCI_NUMBERS_REDIS_KEY
+
+    def __init__(self, block_size: int = 1000, **kwargs):
+        """
+        Set block size and FibonacciNumbersRepo options.
+
+        :param block_size: count of numbers in one block
+        :param kwargs: FibonacciNumbersRepo options
+        """
+        if block_size < 1:
+            raise ValueError('block_size must be positive')
+        super().__init__(**kwargs)
+        self.block_size = block_size
+
+    def _block_key(self, block: int):
+        return '{}:{}'.format(self.__key, block)
+
+    def _read_numbers(self, start: int, end: int):
+        pipeline = self._get_client().pipeline(transaction=False)
+        for block in range(start // self.block_size,
+                           end // self.block_size + 1):
+            block_start = block * self.block_size
+            first = max(start, block_start) - block_start
+            last = min(end, block_start + self.block_size - 1) - block_start
+            pipeline.hmget(self._block_key(block), range(first, last + 1))
+
+        numbers = []
+        for response in pipeline.execute():
+            numbers.extend(
+                i if i is None else decode_number(i) for i in response)
+        return numbers
+
+    def _write_numbers(self, numbers: dict):
+        blocks = {}
+        for order, number in numbers.items():
+            block, offset = divmod(int(order), self.block_size)
+            blocks.setdefault(block, {})[offset] = self._encode_number(number)
+
+        pipeline = self._get_client().pipeline(transaction=False)
+        for block, block_numbers in blocks.items():
+            pipeline.hmset(self._block_key(block), block_numbers)
+        pipeline.execute()
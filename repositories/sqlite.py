@@ -0,0 +1,73 @@
+"""SQLite repository for application."""
+import sqlite3
+from threading import local
+
+from repositories.codecs import decode_number, encode_number
+from shared.fibonacci import check_range
+
+
+class SqliteFibonacciNumbersRepo:
+    """
+    SQLite file repo for fibonacci numbers.
+
+    Table numbers with order number as integer primary key and number
+    encoded by binary codec, so range is read by one indexed query.
+    Every thread has its own connection, workers share file in WAL mode.
+    """
+
+    def __init__(self, path: str, compress_threshold: int = 0):
+        """
+        Set database path.
+
+        :param path: path of database file, ':memory:' - separate
+        database of every thread
+        :param compress_threshold: min size in bytes of compressed
+        numbers, 0 - without compression
+        """
+        self.path = path
+        self.compress_threshold = compress_threshold
+        self._local = local()
+
+    def numbers_list(self, start: int, end: int):
+        """
+        Get list of fibonacci sequence from database.
+
+        :param start: start order number of fibonacci sequence
+        :param end: end order number of fibonacci sequence
+        :return: list with fibonacci sequence
+        """
+        check_range(start, end)
+
+        numbers = [None] * (end - start + 1)
+        rows = self._connection().execute(
+            'SELECT number_order, value FROM numbers '
+            'WHERE number_order BETWEEN ? AND ?', (start, end))
+        for order, value in rows:
+            numbers[order - start] = decode_number(value)
+        return numbers
+
+    def add_numbers(self, **numbers):
+        """
+        Add fibonacci numbers to database.
+
+        :param numbers: dict of fibonacci numbers
+        :return:
+        """
+        if not all(isinstance(value, int) for value in numbers.values()):
+            raise TypeError('All values must be integer')
+        with self._connection() as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO numbers VALUES (?, ?)',
+                ((int(order), encode_number(number, self.compress_threshold))
+                 for order, number in numbers.items()))
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS numbers '
+                '(number_order INTEGER PRIMARY KEY, value BLOB NOT NULL)')
+            self._local.connection = connection
+        return connection
@@ -0,0 +1,142 @@
+"""
+Read-only memory-mapped table of precomputed fibonacci numbers.
+
+File format, integers are little-endian:
+header - magic b'FIBT', version (uint32), start order number (uint64),
+count of numbers (uint64);
+index - count + 1 offsets (uint64) of numbers from start of payloads;
+payloads - numbers as unsigned little-endian bytes without prefix.
+"""
+import mmap
+import struct
+
+from shared.fibonacci import check_range, fibonacci_pair
+
+MAGIC = b'FIBT'
+VERSION = 1
+HEADER = struct.Struct('<4sIQQ')
+OFFSET = struct.Struct('<Q')
+
+
+class TableFibonacciNumbersRepo:
+    """
+    Repo of fibonacci numbers from table file in front of other repo.
+
+    File is mapped read-only, so pages are shared by all workers through
+    OS page cache, and numbers are decoded from memoryview of mapping
+    without copying of payloads. Numbers outside of table are got from
+    and added to other repo.
+    """
+
+    def __init__(self, path: str, repo=None):
+        """
+        Map table file and check its header.
+
+        :param path: path of table file
+        :param repo: repo for numbers outside of table, None - missing
+        """
+        self.repo = repo
+        with open(path, 'rb') as file:
+            self._mapping = mmap.mmap(file.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+        magic, version, self.start, count = HEADER.unpack_from(
+            self._mapping)
+        if magic != MAGIC or version != VERSION:
+            self._mapping.close()
+            raise ValueError('unknown table file format')
+        self.end = self.start + count - 1
+        self._view = memoryview(self._mapping)
+        self._payloads = HEADER.size + (count + 1) * OFFSET.size
+
+    def numbers_list(self, start: int, end: int):
+        """
+        Get list of fibonacci sequence from table and other repo.
+
+        :param start: start order number of fibonacci sequence
+        :param end: end order number of fibonacci sequence
+        :return: list with fibonacci sequence
+        """
+        check_range(start, end)
+
+        first = max(start, self.start)
+        last = min(end, self.end)
+        if first > last:
+            return self._other_numbers(start, end)
+        numbers = self._other_numbers(start, first - 1)
+        numbers.extend(
+            self._get_number(order) for order in range(first, last + 1))
+        numbers.extend(self._other_numbers(last + 1, end))
+        return numbers
+
+    def add_numbers(self, **numbers):
+        """
+        Add fibonacci numbers outside of table to other repo.
+
+        :param numbers: dict of fibonacci numbers
+        :return:
+        """
+        if self.repo is None:
+            return
+        numbers = {order: number for order, number in numbers.items()
+                   if not self.start <= int(order) <= self.end}
+        if numbers:
+            self.repo.add_numbers(**numbers)
+
+    def close(self):
+        """
+        Unmap table file.
+
+        :return:
+        """
+        self._view.release()
+        self._mapping.close()
+
+    def _get_number(self, order: int):
+        offset = HEADER.size + (order - self.start) * OFFSET.size
+        begin, = OFFSET.unpack_from(self._view, offset)
+        end, = OFFSET.unpack_from(self._view, offset + OFFSET.size)
+        return int.from_bytes(
+            self._view[self._payloads + begin:self._payloads + end],
+            'little')
+
+    def _other_numbers(self, start: int, end: int):
+        if end < start:
+            return []
+        if self.repo is None:
+            return [None] * (end - start + 1)
+        return self.repo.numbers_list(start, end)
+
+
+def build_table(path: str, start: int, end: int):
+    """
+    Write table file with fibonacci numbers of range.
+
+    Payloads are written while numbers are calculated, so only offsets
+    are kept in memory.
+
+    :param path: path of table file
+    :param start: start order number of range
+    :param end: end order number of range
+    :return: size of file in bytes
+    """
+    if not isinstance(start, int) or not isinstance(end, int):
+        raise TypeError('start and end must be integer')
+    if start < 0 or end < start:
+        raise ValueError('range must be not empty and positive')
+
+    count = end - start + 1
+    payloads = HEADER.size + (count + 1) * OFFSET.size
+    offsets = [0]
+    current, following = fibonacci_pair(start)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, start, count))
+        file.seek(payloads)
+        for _ in range(count):
+            payload = current.to_bytes((current.bit_length() + 7) // 8,
+                                       'little')
+            file.write(payload)
+            offsets.append(offsets[-1] + len(payload))
+            current, following = following, current + following
+        file.seek(HEADER.size)
+        file.write(b''.join(OFFSET.pack(offset) for offset in offsets))
+    return payloads + offsets[-1]
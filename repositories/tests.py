@@ -1,7 +1,23 @@
 """Tests for all in repositories package."""
+import asyncio
+import os
+from tempfile import TemporaryDirectory
+from threading import Event, Thread
 from unittest import TestCase
+from unittest.mock import call, MagicMock, patch
 
-from repositories.redis import FibonacciNumbersRepo
+from repositories import create_repo
+from repositories.async_redis import AsyncFibonacciNumbersRepo
+from repositories.cache import CachedFibonacciNumbersRepo
+from repositories.checkpoints import CheckpointFibonacciNumbersRepo
+from repositories.codecs import decode_number, encode_number
+from repositories.memory import MemoryFibonacciNumbersRepo
+from repositories.redis import BlockFibonacciNumbersRepo, \
+    FibonacciNumbersRepo
+from repositories.sqlite import SqliteFibonacciNumbersRepo
+from repositories.table import build_table, TableFibonacciNumbersRepo
+from repositories.write_behind import WriteBehindFibonacciNumbersRepo
+from shared.fibonacci import fibonacci_pair
 
 
 class FibonacciNumbersRepoTestCase(TestCase):
@@ -85,3 +101,797 @@ class FibonacciNumbersRepoTestCase(TestCase):
             str(e.exception),
             'numbers_list() missing 1 required positional '
             "argument: 'end'")
+
+
+class FibonacciNumbersRepoBatchesTestCase(TestCase):
+    """Tests for FibonacciNumbersRepo batches of redis commands."""
+
+    def setUp(self):
+        """Set repo with redis client mock."""
+        self.client = MagicMock()
+        self.pipeline = self.client.pipeline.return_value
+        patcher = patch.object(
+            FibonacciNumbersRepo, '_FibonacciNumbersRepo__client',
+            self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.repo = FibonacciNumbersRepo(batch_size=2)
+
+    def test_numbers_list_by_batches(self):
+        """
+        Run numbers_list with range greater than batch size.
+
+        Except mget by batches in one pipeline.
+        """
+        self.pipeline.execute.return_value = [[b'2', b'3'], [b'5', None],
+                                              [b'13']]
+        self.assertEqual(self.repo.numbers_list(3, 7), [2, 3, 5, None, 13])
+        self.client.pipeline.assert_called_once_with(transaction=False)
+        self.assertEqual(self.pipeline.mget.call_args_list,
+                         [call(range(3, 5)), call(range(5, 7)),
+                          call(range(7, 8))])
+
+    def test_add_numbers_by_batches(self):
+        """
+        Run add_numbers with numbers more than batch size.
+
+        Except mset by batches in one pipeline.
+        """
+        self.repo.add_numbers(**{'3': 2, '4': 3, '5': 5})
+        self.assertEqual(self.pipeline.mset.call_args_list,
+                         [call({'3': 2, '4': 3}), call({'5': 5})])
+        self.pipeline.execute.assert_called_once_with()
+
+    def test_add_numbers_without_numbers(self):
+        """
+        Run add_numbers without numbers.
+
+        Except no redis commands.
+        """
+        self.repo.add_numbers()
+        self.client.pipeline.assert_not_called()
+
+    def test_incorrect_batch_size(self):
+        """
+        Create repo with batch size less than one.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            FibonacciNumbersRepo(batch_size=0)
+        self.assertEqual(str(e.exception), 'batch_size must be positive')
+
+    def test_numbers_list_with_binary_and_decimal_values(self):
+        """
+        Run numbers_list with numbers saved by different codecs.
+
+        Except decoded numbers.
+        """
+        self.pipeline.execute.return_value = [
+            [b'144', encode_number(233)], [encode_number(377, 1)]]
+        self.assertEqual(self.repo.numbers_list(12, 14), [144, 233, 377])
+
+    def test_add_numbers_by_binary_codec(self):
+        """
+        Run add_numbers with binary repo.
+
+        Except numbers saved by binary codec.
+        """
+        repo = FibonacciNumbersRepo(batch_size=2, binary=True)
+        repo.add_numbers(**{'12': 144})
+        self.pipeline.mset.assert_called_once_with({'12': b'\x01\x90'})
+
+    def test_migrate_numbers(self):
+        """
+        Run migrate_numbers with binary repo.
+
+        Except existing decimal numbers saved again by binary codec.
+        """
+        self.pipeline.execute.side_effect = [
+            [[b'144', None]], None, [[b'377']], None]
+        repo = FibonacciNumbersRepo(batch_size=2, binary=True)
+        self.assertEqual(repo.migrate_numbers(12, 14), 2)
+        self.assertEqual(
+            self.pipeline.mset.call_args_list,
+            [call({'12': b'\x01\x90'}), call({'14': b'\x01\x79\x01'})])
+
+
+class BlockFibonacciNumbersRepoTestCase(TestCase):
+    """Tests for BlockFibonacciNumbersRepo class."""
+
+    def setUp(self):
+        """Set repo with redis client mock."""
+        self.client = MagicMock()
+        self.pipeline = self.client.pipeline.return_value
+        patcher = patch.object(
+            FibonacciNumbersRepo, '_FibonacciNumbersRepo__client',
+            self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.repo = BlockFibonacciNumbersRepo(block_size=4)
+
+    def test_numbers_list_by_blocks(self):
+        """
+        Run numbers_list with range of several blocks.
+
+        Except hmget per block in one pipeline.
+        """
+        self.pipeline.execute.return_value = [[b'2', b'3'], [b'5', None,
+                                                             b'13', b'21'],
+                                              [b'34']]
+        self.assertEqual(self.repo.numbers_list(2, 8),
+                         [2, 3, 5, None, 13, 21, 34])
+        self.assertEqual(
+            self.pipeline.hmget.call_args_list,
+            [call('fibonacci_numbers:0', range(2, 4)),
+             call('fibonacci_numbers:1', range(0, 4)),
+             call('fibonacci_numbers:2', range(0, 1))])
+
+    def test_add_numbers_by_blocks(self):
+        """
+        Run add_numbers with numbers of several blocks.
+
+        Except hmset per block in one pipeline.
+        """
+        self.repo.add_numbers(**{'3': 2, '4': 3, '5': 5})
+        self.assertEqual(
+            self.pipeline.hmset.call_args_list,
+            [call('fibonacci_numbers:0', {3: 2}),
+             call('fibonacci_numbers:1', {0: 3, 1: 5})])
+        self.pipeline.execute.assert_called_once_with()
+
+    def test_incorrect_block_size(self):
+        """
+        Create repo with block size less than one.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            BlockFibonacciNumbersRepo(block_size=0)
+        self.assertEqual(str(e.exception), 'block_size must be positive')
+
+
+class AsyncFibonacciNumbersRepoTestCase(TestCase):
+    """Tests for AsyncFibonacciNumbersRepo class."""
+
+    def setUp(self):
+        """Set repo with redis client mock."""
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.pipeline = MagicMock()
+        self.responses = []
+
+        async def execute():
+            return self.responses
+
+        self.pipeline.execute.side_effect = execute
+        self.repo = AsyncFibonacciNumbersRepo(batch_size=2)
+        self.repo._client = MagicMock()
+        self.repo._client.pipeline.return_value = self.pipeline
+
+    def test_numbers_list_by_batches(self):
+        """
+        Run numbers_list with range greater than batch size.
+
+        Except mget by batches in one pipeline.
+        """
+        self.responses = [[b'2', b'3'], [encode_number(5), None]]
+        self.assertEqual(
+            self.loop.run_until_complete(self.repo.numbers_list(3, 6)),
+            [2, 3, 5, None])
+        self.assertEqual(self.pipeline.mget.call_args_list,
+                         [call(3, 4), call(5, 6)])
+
+    def test_add_numbers_by_batches(self):
+        """
+        Run add_numbers with numbers more than batch size.
+
+        Except mset by batches in one pipeline.
+        """
+        self.loop.run_until_complete(
+            self.repo.add_numbers(**{'3': 2, '4': 3, '5': 5}))
+        self.assertEqual(self.pipeline.mset.call_args_list,
+                         [call('3', 2, '4', 3), call('5', 5)])
+        self.pipeline.execute.assert_called_once_with()
+
+    def test_numbers_list_negative_start(self):
+        """
+        Run numbers_list with negative start.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            self.loop.run_until_complete(self.repo.numbers_list(-1, 1))
+        self.assertEqual(str(e.exception), 'start must be positive')
+
+
+class MemoryFibonacciNumbersRepoTestCase(TestCase):
+    """Tests for MemoryFibonacciNumbersRepo class."""
+
+    def setUp(self):
+        """Set empty repo."""
+        self.repo = MemoryFibonacciNumbersRepo()
+
+    def test_add_numbers_and_numbers_list(self):
+        """
+        Run numbers_list after add_numbers.
+
+        Except added numbers and None for missing numbers.
+        """
+        self.repo.add_numbers(**{'3': 2, '5': 5})
+        self.assertEqual(self.repo.numbers_list(3, 6), [2, None, 5, None])
+
+    def test_add_numbers_with_incorrect_value_type(self):
+        """
+        Run add_numbers with not integer value.
+
+        Except raising TypeError.
+        """
+        with self.assertRaises(TypeError) as e:
+            self.repo.add_numbers(**{'3': 'x'})
+        self.assertEqual(str(e.exception), 'All values must be integer')
+
+    def test_numbers_list_start_greater_to_end(self):
+        """
+        Run numbers_list with start greater then end.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            self.repo.numbers_list(2, 1)
+        self.assertEqual(str(e.exception), 'end must be greater than or '
+                                           'equal to start')
+
+
+class SqliteFibonacciNumbersRepoTestCase(TestCase):
+    """Tests for SqliteFibonacciNumbersRepo class."""
+
+    def setUp(self):
+        """Set repo with database in temporary directory."""
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'numbers.sqlite3')
+        self.repo = SqliteFibonacciNumbersRepo(self.path)
+
+    def test_add_and_get_numbers(self):
+        """
+        Add numbers and get range with missing numbers.
+
+        Except added numbers and None for missing numbers.
+        """
+        self.repo.add_numbers(**{'1': 1, '2': 1, '300': 2 ** 300})
+
+        self.assertEqual(self.repo.numbers_list(0, 2), [None, 1, 1])
+        self.assertEqual(self.repo.numbers_list(300, 301), [2 ** 300, None])
+
+    def test_numbers_shared_by_repos(self):
+        """
+        Add numbers by one repo and get by other repo in other thread.
+
+        Except numbers from the same file.
+        """
+        self.repo.add_numbers(**{'5': 5})
+        result = []
+        thread = Thread(target=lambda: result.extend(
+            SqliteFibonacciNumbersRepo(self.path).numbers_list(4, 5)))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(result, [None, 5])
+
+    def test_numbers_list_incorrect_range(self):
+        """
+        Run numbers_list with end less than start.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            self.repo.numbers_list(2, 1)
+        self.assertEqual(str(e.exception),
+                         'end must be greater than or equal to start')
+
+    def test_add_not_integer(self):
+        """
+        Run add_numbers with not integer value.
+
+        Except raising TypeError.
+        """
+        with self.assertRaises(TypeError) as e:
+            self.repo.add_numbers(**{'1': '1'})
+        self.assertEqual(str(e.exception), 'All values must be integer')
+
+
+class TableFibonacciNumbersRepoTestCase(TestCase):
+    """Tests for TableFibonacciNumbersRepo class."""
+
+    def setUp(self):
+        """Build table file of numbers from 5 to 300."""
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'numbers.table')
+        build_table(self.path, 5, 300)
+        self.memory_repo = MemoryFibonacciNumbersRepo()
+        self.repo = TableFibonacciNumbersRepo(self.path, self.memory_repo)
+        self.addCleanup(self.repo.close)
+
+    def test_numbers_list_from_table(self):
+        """
+        Get range inside of table.
+
+        Except numbers from table.
+        """
+        self.assertEqual(self.repo.numbers_list(5, 10),
+                         [5, 8, 13, 21, 34, 55])
+        self.assertEqual(self.repo.numbers_list(299, 300),
+                         list(fibonacci_pair(299)))
+
+    def test_numbers_list_outside_of_table(self):
+        """
+        Get range crossing bounds of table.
+
+        Except numbers from other repo outside of table.
+        """
+        self.memory_repo.add_numbers(**{'3': 2, '301': 1})
+        numbers = self.repo.numbers_list(2, 302)
+
+        self.assertEqual(numbers[:5], [None, 2, None, 5, 8])
+        self.assertEqual(numbers[-2:], [1, None])
+
+    def test_add_numbers_outside_of_table(self):
+        """
+        Add numbers inside and outside of table.
+
+        Except only numbers outside of table in other repo.
+        """
+        self.repo.add_numbers(**{'4': 3, '5': 5, '301': 1})
+
+        self.assertEqual(self.memory_repo.numbers_list(4, 5), [3, None])
+        self.assertEqual(self.memory_repo.numbers_list(301, 301), [1])
+
+    def test_without_other_repo(self):
+        """
+        Get range crossing bounds of table without other repo.
+
+        Except None outside of table.
+        """
+        repo = TableFibonacciNumbersRepo(self.path)
+        self.addCleanup(repo.close)
+        repo.add_numbers(**{'4': 3})
+
+        self.assertEqual(repo.numbers_list(3, 6), [None, None, 5, 8])
+
+    def test_unknown_format(self):
+        """
+        Open file without table header.
+
+        Except raising ValueError.
+        """
+        path = self.path + '.unknown'
+        with open(path, 'wb') as file:
+            file.write(b'x' * 100)
+        with self.assertRaises(ValueError) as e:
+            TableFibonacciNumbersRepo(path)
+        self.assertEqual(str(e.exception), 'unknown table file format')
+
+
+class CodecsTestCase(TestCase):
+    """Tests for encode_number and decode_number functions."""
+
+    def test_encode_and_decode(self):
+        """
+        Encode and decode numbers.
+
+        Except the same numbers.
+        """
+        for number in (0, 1, 255, 256, 2 ** 64 + 1, 7 ** 5000):
+            self.assertEqual(decode_number(encode_number(number)), number)
+
+    def test_encode_with_compression(self):
+        """
+        Encode compressible number with compression threshold.
+
+        Except compressed value, which decodes to the same number.
+        """
+        number = 2 ** 80000
+        value = encode_number(number, compress_threshold=1024)
+        self.assertEqual(value[:1], b'\x02')
+        self.assertLess(len(value), 1024)
+        self.assertEqual(decode_number(value), number)
+
+    def test_decode_decimal(self):
+        """
+        Decode decimal value of previous format.
+
+        Except number.
+        """
+        self.assertEqual(decode_number(b'10946'), 10946)
+
+    def test_decode_unknown_codec(self):
+        """
+        Decode value with unknown codec version.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            decode_number(b'\x7fabc')
+        self.assertEqual(str(e.exception), 'unknown codec of value')
+
+    def test_encode_negative_number(self):
+        """
+        Encode negative number.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            encode_number(-1)
+        self.assertEqual(str(e.exception), 'number must be positive')
+
+
+class CachedFibonacciNumbersRepoTestCase(TestCase):
+    """Tests for CachedFibonacciNumbersRepo class."""
+
+    def setUp(self):
+        """Set cache in front of repo mock with first 8 numbers."""
+        self.numbers = [0, 1, 1, 2, 3, 5, 8, 13]
+        self.repo = MagicMock()
+        self.repo.numbers_list.side_effect = lambda start, end: [
+            self.numbers[i] if i < len(self.numbers) else None
+            for i in range(start, end + 1)]
+        self.cache = CachedFibonacciNumbersRepo(
+            self.repo, max_bytes=10 ** 6, segment_size=4)
+
+    def test_numbers_list_gets_aligned_segments(self):
+        """
+        Run numbers_list with cold cache.
+
+        Except one repo call for aligned segments and requested numbers.
+        """
+        self.assertEqual(self.cache.numbers_list(2, 5), [1, 2, 3, 5])
+        self.repo.numbers_list.assert_called_once_with(0, 7)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def test_numbers_list_repeated_range_without_repo(self):
+        """
+        Run numbers_list twice with the same range.
+
+        Except second result from cache without repo call.
+        """
+        self.cache.numbers_list(2, 5)
+        self.assertEqual(self.cache.numbers_list(1, 6),
+                         [1, 1, 2, 3, 5, 8])
+        self.assertEqual(self.repo.numbers_list.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+
+    def test_numbers_list_with_metrics(self):
+        """
+        Run numbers_list twice with metrics.
+
+        Except hits and misses of every call recorded.
+        """
+        metrics = MagicMock()
+        self.cache.metrics = metrics
+        self.cache.numbers_list(2, 5)
+        self.cache.numbers_list(1, 9)
+        self.assertEqual(metrics.count_cache_segments.call_args_list,
+                         [call(0, 2), call(2, 1)])
+
+    def test_numbers_list_gets_only_missing_segments(self):
+        """
+        Run numbers_list with partially cached range.
+
+        Except repo call only for not cached segments.
+        """
+        self.cache.numbers_list(4, 7)
+        self.assertEqual(self.cache.numbers_list(0, 9),
+                         [0, 1, 1, 2, 3, 5, 8, 13, None, None])
+        self.repo.numbers_list.assert_called_with(8, 11)
+        self.repo.numbers_list.assert_any_call(0, 3)
+
+    def test_add_numbers_fills_cached_segments(self):
+        """
+        Run add_numbers for missing numbers of cached segment.
+
+        Except numbers added to repo and cached segment.
+        """
+        self.cache.numbers_list(8, 9)
+        self.cache.add_numbers(**{'8': 21, '9': 34})
+        self.repo.add_numbers.assert_called_once_with(**{'8': 21, '9': 34})
+        self.assertEqual(self.cache.numbers_list(8, 9), [21, 34])
+        self.assertEqual(self.repo.numbers_list.call_count, 1)
+
+    def test_least_recently_used_segment_is_evicted(self):
+        """
+        Run numbers_list with cache for two segments.
+
+        Except least recently used segment evicted.
+        """
+        self.cache.numbers_list(0, 7)
+        self.cache.max_bytes = self.cache.size
+        self.cache.numbers_list(0, 0)
+        self.cache.numbers_list(8, 8)
+        self.repo.numbers_list.reset_mock()
+        self.cache.numbers_list(0, 0)
+        self.cache.numbers_list(4, 4)
+        self.repo.numbers_list.assert_called_once_with(4, 7)
+        self.assertLessEqual(self.cache.size, self.cache.max_bytes)
+
+    def test_numbers_list_incorrect_start_type(self):
+        """
+        Run numbers_list with incorrect start type.
+
+        Except raising TypeError.
+        """
+        with self.assertRaises(TypeError) as e:
+            self.cache.numbers_list('x', 1)
+        self.assertEqual(str(e.exception), 'start must be integer')
+
+    def test_numbers_list_start_greater_to_end(self):
+        """
+        Run numbers_list with start greater then end.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            self.cache.numbers_list(2, 1)
+        self.assertEqual(str(e.exception), 'end must be greater than or '
+                                           'equal to start')
+
+
+class CheckpointFibonacciNumbersRepoTestCase(TestCase):
+    """Tests for CheckpointFibonacciNumbersRepo class."""
+
+    def setUp(self):
+        """Set checkpoints repo in front of repo mock."""
+        self.numbers = {}
+        self.repo = MagicMock()
+        self.repo.numbers_list.side_effect = lambda start, end: [
+            self.numbers.get(str(i)) for i in range(start, end + 1)]
+        self.repo.add_numbers.side_effect = self.numbers.update
+        self.checkpoints = CheckpointFibonacciNumbersRepo(self.repo, step=5)
+
+    def test_add_numbers_saves_only_checkpoints(self):
+        """
+        Run add_numbers with sequence of numbers.
+
+        Except only numbers of checkpoints saved to repo.
+        """
+        self.checkpoints.add_numbers(**{
+            '4': 3, '5': 5, '6': 8, '7': 13, '8': 21, '9': 34, '10': 55})
+        self.assertEqual(self.numbers, {'5': 5, '6': 8, '10': 55})
+
+    def test_numbers_list_calculates_from_checkpoint(self):
+        """
+        Run numbers_list with saved checkpoint below start.
+
+        Except one repo call and sequence calculated from checkpoint.
+        """
+        self.numbers.update({'5': 5, '6': 8})
+        self.assertEqual(self.checkpoints.numbers_list(8, 12),
+                         [21, 34, 55, 89, 144])
+        self.repo.numbers_list.assert_called_once_with(5, 6)
+
+    def test_numbers_list_without_checkpoint(self):
+        """
+        Run numbers_list without saved checkpoint below start.
+
+        Except sequence calculated from new checkpoint saved to repo.
+        """
+        self.numbers.update({'10': 55, '11': 89})
+        self.assertEqual(self.checkpoints.numbers_list(7, 10),
+                         [13, 21, 34, 55])
+        self.assertEqual(self.numbers, {'5': 5, '6': 8, '10': 55, '11': 89})
+        self.checkpoints.numbers_list(8, 9)
+        self.repo.add_numbers.assert_called_once_with(**{'5': 5, '6': 8})
+
+    def test_incorrect_step(self):
+        """
+        Create repo with step less than two.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            CheckpointFibonacciNumbersRepo(self.repo, step=1)
+        self.assertEqual(str(e.exception), 'step must be greater than 1')
+
+    def test_numbers_list_negative_start(self):
+        """
+        Run numbers_list with negative start.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            self.checkpoints.numbers_list(-1, 1)
+        self.assertEqual(str(e.exception), 'start must be positive')
+
+
+class WriteBehindFibonacciNumbersRepoTestCase(TestCase):
+    """Tests for WriteBehindFibonacciNumbersRepo class."""
+
+    def setUp(self):
+        """Set write-behind repo in front of memory repo."""
+        self.memory_repo = MemoryFibonacciNumbersRepo()
+        self.repo = WriteBehindFibonacciNumbersRepo(
+            self.memory_repo, queue_size=2, batch_size=3)
+        self.addCleanup(self.repo.close)
+
+    def test_queued_numbers_are_visible(self):
+        """
+        Get numbers, which are queued but not written.
+
+        Except numbers from queue.
+        """
+        written = Event()
+        self.memory_repo.add_numbers = MagicMock(
+            side_effect=lambda **numbers: written.wait())
+        self.repo.add_numbers(**{'1': 1, '2': 1})
+
+        self.assertEqual(self.repo.numbers_list(0, 3), [None, 1, 1, None])
+        written.set()
+
+    def test_written_by_batches(self):
+        """
+        Add numbers several times and flush.
+
+        Except all numbers in repo written by batches up to batch_size.
+        """
+        add_numbers = MagicMock(wraps=self.memory_repo.add_numbers)
+        self.memory_repo.add_numbers = add_numbers
+        for order in range(6):
+            self.repo.add_numbers(**{str(order): order})
+        self.repo.flush()
+
+        self.assertEqual(self.memory_repo.numbers_list(0, 5),
+                         [0, 1, 2, 3, 4, 5])
+        self.assertTrue(all(len(call[1]) <= 3
+                            for call in add_numbers.call_args_list))
+        self.assertEqual(self.repo._pending, {})
+
+    def test_close_writes_queued_numbers(self):
+        """
+        Close repo after adding numbers.
+
+        Except numbers in repo and error on next adding.
+        """
+        self.repo.add_numbers(**{'5': 5})
+        self.repo.close()
+
+        self.assertEqual(self.memory_repo.numbers_list(5, 5), [5])
+        with self.assertRaises(RuntimeError) as e:
+            self.repo.add_numbers(**{'6': 8})
+        self.assertEqual(str(e.exception), 'repo is closed')
+
+    def test_failed_write(self):
+        """
+        Add numbers, which write fails.
+
+        Except counted failure and working writer.
+        """
+        self.memory_repo.add_numbers = MagicMock(
+            side_effect=[ConnectionError, None])
+        with self.assertLogs('repositories.write_behind', 'ERROR'):
+            self.repo.add_numbers(**{'1': 1})
+            self.repo.flush()
+        self.repo.add_numbers(**{'2': 1})
+        self.repo.flush()
+
+        self.assertEqual(self.repo.failed_writes, 1)
+        self.assertEqual(self.memory_repo.add_numbers.call_count, 2)
+
+
+class CreateRepoTestCase(TestCase):
+    """Tests for create_repo."""
+
+    config = {
+        'FIBONACCI_REPO': 'redis',
+        'FIBONACCI_SQLITE_PATH': ':memory:',
+        'FIBONACCI_TABLE_PATH': '',
+        'FIBONACCI_REDIS_LAYOUT': 'keys',
+        'FIBONACCI_REDIS_BLOCK_SIZE': 100,
+        'FIBONACCI_CHECKPOINT_STEP': 0,
+        'FIBONACCI_CACHE_MAX_BYTES': 0,
+        'FIBONACCI_CACHE_SEGMENT_SIZE': 16,
+        'FIBONACCI_WRITE_BEHIND_QUEUE_SIZE': 0,
+        'FIBONACCI_WRITE_BEHIND_BATCH_SIZE': 100,
+    }
+
+    def test_without_cache(self):
+        """
+        Run with disabled cache.
+
+        Except redis repo.
+        """
+        self.assertIsInstance(create_repo(self.config), FibonacciNumbersRepo)
+
+    def test_with_cache(self):
+        """
+        Run with cache size.
+
+        Except cache in front of redis repo.
+        """
+        repo = create_repo(dict(self.config, FIBONACCI_CACHE_MAX_BYTES=1024))
+        self.assertIsInstance(repo, CachedFibonacciNumbersRepo)
+        self.assertIsInstance(repo.repo, FibonacciNumbersRepo)
+        self.assertEqual((repo.max_bytes, repo.segment_size), (1024, 16))
+
+    def test_with_checkpoints(self):
+        """
+        Run with checkpoint step.
+
+        Except checkpoints repo in front of redis repo.
+        """
+        repo = create_repo(dict(self.config, FIBONACCI_CHECKPOINT_STEP=100))
+        self.assertIsInstance(repo, CheckpointFibonacciNumbersRepo)
+        self.assertIsInstance(repo.repo, FibonacciNumbersRepo)
+        self.assertEqual(repo.step, 100)
+
+    def test_with_write_behind(self):
+        """
+        Run with write-behind queue size.
+
+        Except write-behind repo in front of redis repo.
+        """
+        with patch('repositories.atexit.register') as register:
+            repo = create_repo(
+                dict(self.config, FIBONACCI_WRITE_BEHIND_QUEUE_SIZE=10))
+        self.addCleanup(repo.close)
+        self.assertIsInstance(repo, WriteBehindFibonacciNumbersRepo)
+        self.assertIsInstance(repo.repo, FibonacciNumbersRepo)
+        self.assertEqual(repo.batch_size, 100)
+        register.assert_called_once_with(repo.close)
+
+    def test_with_other_backends(self):
+        """
+        Run with sqlite and memory backends.
+
+        Except repos of backends.
+        """
+        self.assertIsInstance(
+            create_repo(dict(self.config, FIBONACCI_REPO='sqlite')),
+            SqliteFibonacciNumbersRepo)
+        self.assertIsInstance(
+            create_repo(dict(self.config, FIBONACCI_REPO='memory')),
+            MemoryFibonacciNumbersRepo)
+
+    def test_with_table(self):
+        """
+        Run with table path.
+
+        Except table repo in front of redis repo.
+        """
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'numbers.table')
+            build_table(path, 0, 10)
+            repo = create_repo(dict(self.config, FIBONACCI_TABLE_PATH=path))
+            repo.close()
+        self.assertIsInstance(repo, TableFibonacciNumbersRepo)
+        self.assertIsInstance(repo.repo, FibonacciNumbersRepo)
+
+    def test_with_unknown_backend(self):
+        """
+        Run with unknown backend.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            create_repo(dict(self.config, FIBONACCI_REPO='x'))
+        self.assertEqual(str(e.exception), 'unknown repo backend: x')
+
+    def test_with_blocks_layout(self):
+        """
+        Run with blocks layout.
+
+        Except blocks redis repo.
+        """
+        repo = create_repo(dict(self.config, FIBONACCI_REDIS_LAYOUT='blocks'))
+        self.assertIsInstance(repo, BlockFibonacciNumbersRepo)
+        self.assertEqual(repo.block_size, 100)
+
+    def test_with_unknown_layout(self):
+        """
+        Run with unknown layout.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            create_repo(dict(self.config, FIBONACCI_REDIS_LAYOUT='x'))
+        self.assertEqual(str(e.exception), 'unknown redis layout: x')
@@ -0,0 +1,121 @@
+"""Write-behind of fibonacci numbers to other repo."""
+import logging
+from queue import Queue
+from threading import Lock, Thread
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindFibonacciNumbersRepo:
+    """
+    Repo, which saves numbers to other repo in background thread.
+
+    add_numbers only puts numbers to bounded queue, so it blocks only
+    if queue is full. Writer thread merges queued numbers into batches
+    up to batch_size numbers. Queued numbers are visible to numbers_list
+    until they are written.
+    """
+
+    def __init__(self, repo, queue_size: int = 100, batch_size: int = 10000):
+        """
+        Set repo and start writer thread.
+
+        :param repo: repo with numbers_list and add_numbers methods
+        :param queue_size: max count of queued add_numbers calls
+        :param batch_size: max count of numbers in one write
+        """
+        if queue_size < 1:
+            raise ValueError('queue_size must be positive')
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive')
+        self.repo = repo
+        self.batch_size = batch_size
+        self.failed_writes = 0
+        self._pending = {}
+        self._lock = Lock()
+        self._queue = Queue(queue_size)
+        self._closed = False
+        self._writer = Thread(target=self._write_queued, daemon=True)
+        self._writer.start()
+
+    def numbers_list(self, start: int, end: int):
+        """
+        Get list of fibonacci sequence from repo and queue.
+
+        :param start: start order number of fibonacci sequence
+        :param end: end order number of fibonacci sequence
+        :return: list with fibonacci sequence
+        """
+        numbers = self.repo.numbers_list(start, end)
+        with self._lock:
+            if self._pending:
+                numbers = [self._pending.get(str(start + index))
+                           if number is None else number
+                           for index, number in enumerate(numbers)]
+        return numbers
+
+    def add_numbers(self, **numbers):
+        """
+        Put fibonacci numbers to queue for write.
+
+        :param numbers: dict of fibonacci numbers
+        :return:
+        """
+        if self._closed:
+            raise RuntimeError('repo is closed')
+        if not numbers:
+            return
+        with self._lock:
+            self._pending.update(numbers)
+        self._queue.put(numbers)
+
+    def flush(self):
+        """
+        Wait until all queued numbers are written.
+
+        :return:
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Write queued numbers and stop writer thread.
+
+        :return:
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_queued(self):
+        stopped = False
+        while not stopped:
+            batch = {}
+            count = 1
+            numbers = self._queue.get()
+            while True:
+                if numbers is None:
+                    stopped = True
+                else:
+                    batch.update(numbers)
+                if stopped or len(batch) >= self.batch_size or \
+                        self._queue.empty():
+                    break
+                numbers = self._queue.get()
+                count += 1
+            if batch:
+                self._write_batch(batch)
+            for _ in range(count):
+                self._queue.task_done()
+
+    def _write_batch(self, batch: dict):
+        try:
+            self.repo.add_numbers(**batch)
+        except Exception:
+            self.failed_writes += 1
+            logger.exception('write of %s numbers failed', len(batch))
+        with self._lock:
+            for key in batch:
+                self._pending.pop(key, None)
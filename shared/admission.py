@@ -0,0 +1,200 @@
+"""Cost-based admission control of expensive requests."""
+from threading import Lock
+
+from shared.fibonacci import DIGITS_EXACT_MAX_ORDER, is_pisano_table_cached
+from shared.use_case import ResponseFailure
+
+# Decimal logarithm of golden ratio multiplied by 10 ** 18, so digits
+# of any order are estimated by integers without float overflow.
+LOG10_PHI_NUMERATOR = 208987640249978733
+LOG10_PHI_DENOMINATOR = 10 ** 18
+# Greater counts of digits are beyond any limit, but float power
+# of them overflows.
+MAX_ESTIMATED_DIGITS = 10 ** 100
+# Costs are in additions of one digit. Fast doubling needs O(log n)
+# Karatsuba multiplications, about digits ** 1.6 additions, conversion
+# of number to decimal is quadratic, both weights are measured on CPython.
+JUMP_WEIGHT = 2
+DECIMAL_DIVISOR = 8
+# Logarithm of Binet's formula in Decimal is about precision ** 3
+# additions, fast doubling modulo m - bits of order multiplications
+# of numbers of digits of m, both weights are measured on CPython.
+LOGARITHM_WEIGHT = 2
+MODULO_WEIGHT = 10
+
+
+def estimate_digits(order: int):
+    """
+    Estimate count of decimal digits of fibonacci number.
+
+    :param order: order number of fibonacci number
+    :return: count of digits
+    """
+    return order * LOG10_PHI_NUMERATOR // LOG10_PHI_DENOMINATOR + 1
+
+
+def estimate_jump_cost(order: int):
+    """
+    Estimate cost of calculation of fibonacci pair by fast doubling.
+
+    :param order: order number of first fibonacci number
+    :return: cost in digit additions
+    """
+    digits = min(estimate_digits(order), MAX_ESTIMATED_DIGITS)
+    return int(JUMP_WEIGHT * digits ** 1.6)
+
+
+def estimate_decimal_cost(order: int):
+    """
+    Estimate cost of conversion of fibonacci number to decimal.
+
+    :param order: order number of fibonacci number
+    :return: cost in digit additions
+    """
+    return estimate_digits(order) ** 2 // DECIMAL_DIVISOR
+
+
+def estimate_number_cost(order: int):
+    """
+    Estimate cost of one fibonacci number.
+
+    Calculation needs fast doubling to order, and response contains
+    the number in decimal.
+
+    :param order: order number of fibonacci number
+    :return: tuple with cpu cost in digit additions and response size
+    in bytes
+    """
+    return (estimate_jump_cost(order) + estimate_decimal_cost(order),
+            estimate_digits(order))
+
+
+def estimate_digits_cost(order: int, count: int):
+    """
+    Estimate cost of count, leading and trailing digits of fibonacci number.
+
+    Small orders need exact numbers, greater orders need logarithms
+    with precision of order digits and count digits, and fast doubling
+    modulo 10^count to order.
+
+    :param order: order number of fibonacci number
+    :param count: count of leading and trailing digits
+    :return: tuple with cpu cost in digit additions and response size
+    in bytes
+    """
+    response_bytes = 2 * count + len(str(order)) * 2 + 64
+    if order <= DIGITS_EXACT_MAX_ORDER:
+        return 3 * estimate_number_cost(order)[0], response_bytes
+    precision = len(str(order)) + count + 10
+    cost = LOGARITHM_WEIGHT * precision ** 3 + \
+        int(MODULO_WEIGHT * order.bit_length() * count ** 1.6)
+    return cost, response_bytes
+
+
+def estimate_sequence_cost(start: int, end: int, modulus: int = None,
+                           table_max_modulus: int = 100000,
+                           decimal: bool = True, seeded: bool = False):
+    """
+    Estimate cost of fibonacci sequence.
+
+    Calculation needs fast doubling to start, count additions of numbers
+    up to digits(end) and, for decimal formats, count conversions
+    to decimal, response contains count numbers of average size with
+    separators. Sequence modulo m needs also calculation of Pisano period
+    table of up to 6 * m numbers, if it isn't cached, or fast doubling
+    modulo m to start, if m is above table_max_modulus.
+
+    :param start: start order number of sequence
+    :param end: end order number of sequence
+    :param modulus: modulus of sequence, None - exact numbers
+    :param table_max_modulus: max modulus served from Pisano period table
+    :param decimal: numbers are serialized as decimal
+    :param seeded: two numbers before start are known, so fast doubling
+    isn't needed
+    :return: tuple with cpu cost in digit additions and response size
+    in bytes
+    """
+    count = end - start + 1
+    if modulus is not None:
+        digits = len(str(modulus))
+        cost = count * digits
+        if modulus > table_max_modulus:
+            cost += int(MODULO_WEIGHT * start.bit_length() * digits ** 1.6)
+        elif not is_pisano_table_cached(modulus):
+            cost += 6 * modulus * digits
+        return cost, count * (digits + 2)
+    cost = count * estimate_digits(end)
+    if not seeded:
+        cost += estimate_jump_cost(start)
+    if decimal:
+        cost += count * estimate_decimal_cost(end)
+    average_digits = (estimate_digits(start) + estimate_digits(end)) // 2
+    return cost, count * (average_digits + 2)
+
+
+class AdmissionControl:
+    """
+    In-process admission of requests by estimated cost.
+
+    Requests above max cost or max response size are rejected. Cost of
+    admitted requests is in-flight until release, requests exceeding
+    in-flight budget are shed, but cheap requests are always admitted,
+    so they aren't starved by expensive ones.
+    """
+
+    def __init__(self, max_cost: int = 0, max_response_bytes: int = 0,
+                 budget: int = 0, cheap_cost: int = 0):
+        """
+        Set limits, 0 - without limit.
+
+        :param max_cost: max cost of one request
+        :param max_response_bytes: max response size of one request
+        :param budget: max sum of costs of requests in flight
+        :param cheap_cost: max cost of requests admitted regardless of budget
+        """
+        self.max_cost = max_cost
+        self.max_response_bytes = max_response_bytes
+        self.budget = budget
+        self.cheap_cost = cheap_cost
+        self.in_flight = 0
+        self._lock = Lock()
+
+    def admit(self, cost: int, response_bytes: int):
+        """
+        Admit request or reject it.
+
+        :param cost: estimated cpu cost of request
+        :param response_bytes: estimated response size of request
+        :return: None if admitted, otherwise failed response object
+        """
+        if self.max_cost and cost > self.max_cost:
+            return ResponseFailure.build_limit_error(
+                'cost {} exceeds limit {}'.format(cost, self.max_cost))
+        if self.max_response_bytes and \
+                response_bytes > self.max_response_bytes:
+            return ResponseFailure.build_limit_error(
+                'response size {} exceeds limit {}'.format(
+                    response_bytes, self.max_response_bytes))
+        if not self._is_budgeted(cost):
+            return None
+        with self._lock:
+            # The only request in flight is admitted even above budget.
+            if self.in_flight and self.in_flight + cost > self.budget:
+                return ResponseFailure.build_overload_error(
+                    'in-flight cost budget is exceeded, retry later')
+            self.in_flight += cost
+        return None
+
+    def release(self, cost: int):
+        """
+        Release cost of admitted request after response.
+
+        :param cost: estimated cpu cost of request
+        :return:
+        """
+        if self._is_budgeted(cost):
+            with self._lock:
+                self.in_flight -= cost
+
+    def _is_budgeted(self, cost: int):
+        return bool(self.budget) and cost > self.cheap_cost
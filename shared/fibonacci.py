@@ -0,0 +1,238 @@
+"""Exact integer arithmetic for fibonacci numbers."""
+from array import array
+from collections import OrderedDict
+from decimal import Decimal, localcontext
+from threading import Lock
+
+# Numbers with greater orders are described by logarithm of Binet's
+# formula, error of which is less than 10 ** -4000.
+DIGITS_EXACT_MAX_ORDER = 10000
+DIGITS_MAX_COUNT = 1000
+# Count of cached Pisano period tables, every table is up to 6 * m
+# unsigned 32-bit numbers.
+PISANO_TABLES_MAX_COUNT = 16
+
+_pisano_tables = OrderedDict()
+_pisano_tables_lock = Lock()
+
+
+def check_range(start: int, end: int):
+    """
+    Check range of order numbers of fibonacci sequence.
+
+    :param start: start order number of fibonacci sequence
+    :param end: end order number of fibonacci sequence
+    :return:
+    """
+    if not isinstance(start, int):
+        raise TypeError('start must be integer')
+    if not isinstance(end, int):
+        raise TypeError('end must be integer')
+    if start < 0:
+        raise ValueError('start must be positive')
+    if end < 0:
+        raise ValueError('end must be positive')
+    if end < start:
+        raise ValueError('end must be greater than or equal to start')
+
+
+def fibonacci_pair(order: int):
+    """
+    Calculate pair of neighbour fibonacci numbers by order number.
+
+    Use fast doubling:
+    F(2k) = F(k) * (2 * F(k+1) - F(k)),
+    F(2k+1) = F(k) ** 2 + F(k+1) ** 2,
+    so it needs O(log n) big integer multiplications.
+
+    :param order: order number of first fibonacci number
+    :return: tuple with F(order) and F(order+1)
+    """
+    if not isinstance(order, int):
+        raise TypeError('order must be integer')
+    if order < 0:
+        raise ValueError('order must be positive')
+
+    current, following = 0, 1
+    for bit in bin(order)[2:]:
+        doubled = current * (2 * following - current)
+        doubled_following = current * current + following * following
+        if bit == '1':
+            current, following = (doubled_following,
+                                  doubled + doubled_following)
+        else:
+            current, following = doubled, doubled_following
+    return current, following
+
+
+def fibonacci_segment(start: int, end: int):
+    """
+    Calculate fibonacci sequence seeded by pair of its first numbers.
+
+    Segments don't depend on each other, so they can be calculated
+    in separate processes.
+
+    :param start: start order number of segment
+    :param end: end order number of segment
+    :return: list of fibonacci numbers
+    """
+    current, following = fibonacci_pair(start)
+    numbers = []
+    for _ in range(start, end + 1):
+        numbers.append(current)
+        current, following = following, current + following
+    return numbers
+
+
+def fibonacci_pair_modulo(order: int, modulus: int):
+    """
+    Calculate pair of neighbour fibonacci numbers modulo m by order number.
+
+    Use fast doubling with reduction on every step, so it needs O(log n)
+    operations with integers less than modulus ** 2.
+
+    :param order: order number of first fibonacci number
+    :param modulus: modulus
+    :return: tuple with F(order) mod m and F(order+1) mod m
+    """
+    if not isinstance(order, int):
+        raise TypeError('order must be integer')
+    if order < 0:
+        raise ValueError('order must be positive')
+    if not isinstance(modulus, int):
+        raise TypeError('modulus must be integer')
+    if modulus < 1:
+        raise ValueError('modulus must be positive')
+
+    current, following = 0, 1 % modulus
+    for bit in bin(order)[2:]:
+        doubled = current * (2 * following - current) % modulus
+        doubled_following = (current ** 2 + following ** 2) % modulus
+        if bit == '1':
+            current, following = (doubled_following,
+                                  (doubled + doubled_following) % modulus)
+        else:
+            current, following = doubled, doubled_following
+    return current, following
+
+
+def pisano_table(modulus: int):
+    """
+    Get fibonacci numbers modulo m for one Pisano period.
+
+    Fibonacci numbers modulo m are periodic, so F(n) mod m is
+    table[n % len(table)]. Tables are cached for last used moduli.
+
+    :param modulus: modulus less than 2 ** 32
+    :return: array of unsigned fibonacci numbers modulo m
+    """
+    if not isinstance(modulus, int):
+        raise TypeError('modulus must be integer')
+    if modulus < 1:
+        raise ValueError('modulus must be positive')
+
+    with _pisano_tables_lock:
+        table = _pisano_tables.get(modulus)
+        if table is not None:
+            _pisano_tables.move_to_end(modulus)
+            return table
+    table = _calculate_pisano_table(modulus)
+    with _pisano_tables_lock:
+        table = _pisano_tables.setdefault(modulus, table)
+        while len(_pisano_tables) > PISANO_TABLES_MAX_COUNT:
+            _pisano_tables.popitem(last=False)
+    return table
+
+
+def is_pisano_table_cached(modulus: int):
+    """
+    Check if Pisano period table of modulus is cached.
+
+    :param modulus: modulus
+    :return: bool
+    """
+    with _pisano_tables_lock:
+        return modulus in _pisano_tables
+
+
+def _calculate_pisano_table(modulus: int):
+    table = array('I')
+    current, following = 0, 1 % modulus
+    while True:
+        table.append(current)
+        current, following = following, (current + following) % modulus
+        if current == 0 and following == 1 % modulus:
+            return table
+
+
+def _fibonacci_log10(order: int, count: int):
+    """
+    Calculate decimal logarithm of fibonacci number by Binet's formula.
+
+    log10(F(n)) = n * log10(phi) - log10(sqrt(5)), precision is enough
+    for integer part and count digits of mantissa.
+
+    :param order: order number greater than DIGITS_EXACT_MAX_ORDER
+    :param count: count of needed digits of mantissa
+    :return: Decimal logarithm
+    """
+    with localcontext() as context:
+        context.prec = len(str(order)) + count + 10
+        sqrt5 = Decimal(5).sqrt()
+        return order * ((1 + sqrt5) / 2).log10() - sqrt5.log10()
+
+
+def _check_digits_arguments(order: int, count: int = 1):
+    if not isinstance(order, int):
+        raise TypeError('order must be integer')
+    if order < 0:
+        raise ValueError('order must be positive')
+    if not isinstance(count, int):
+        raise TypeError('count must be integer')
+    if not 0 < count <= DIGITS_MAX_COUNT:
+        raise ValueError('count must be between 1 and {}'.format(
+            DIGITS_MAX_COUNT))
+
+
+def fibonacci_digits_count(order: int):
+    """
+    Count decimal digits of fibonacci number without calculating it.
+
+    :param order: order number of fibonacci number
+    :return: count of digits
+    """
+    _check_digits_arguments(order)
+    if order <= DIGITS_EXACT_MAX_ORDER:
+        return len(str(fibonacci_pair(order)[0]))
+    return int(_fibonacci_log10(order, 1)) + 1
+
+
+def fibonacci_leading_digits(order: int, count: int):
+    """
+    Get leading decimal digits of fibonacci number without calculating it.
+
+    :param order: order number of fibonacci number
+    :param count: count of digits, all digits if number is shorter
+    :return: string of digits
+    """
+    _check_digits_arguments(order, count)
+    if order <= DIGITS_EXACT_MAX_ORDER:
+        return str(fibonacci_pair(order)[0])[:count]
+    logarithm = _fibonacci_log10(order, count)
+    with localcontext() as context:
+        context.prec = len(str(order)) + count + 10
+        mantissa = logarithm - int(logarithm)
+        return str(int(Decimal(10) ** (mantissa + count - 1)))
+
+
+def fibonacci_trailing_digits(order: int, count: int):
+    """
+    Get trailing decimal digits of fibonacci number by fast doubling mod 10^k.
+
+    :param order: order number of fibonacci number
+    :param count: count of digits, all digits if number is shorter
+    :return: string of digits with leading zeros
+    """
+    _check_digits_arguments(order, count)
+    count = min(count, fibonacci_digits_count(order))
+    return str(fibonacci_pair_modulo(order, 10 ** count)[0]).zfill(count)
@@ -0,0 +1,71 @@
+"""Coalescing of concurrent calculations of overlapping ranges."""
+from threading import Event, Lock
+
+
+class RangeFlights:
+    """
+    In-process registry of ranges, which are calculating now.
+
+    Calculation of range starts only if no overlapping range is
+    calculating, otherwise caller must wait for overlapping calculations
+    and check its range again. So concurrent requests of the same numbers
+    share one calculation.
+    """
+
+    def __init__(self, metrics=None):
+        """
+        Set flights and counters.
+
+        :param metrics: recorder of calculations, None - only counters
+        """
+        self.metrics = metrics
+        self.computations = 0
+        self.waits = 0
+        self.saved_computations = 0
+        self._flights = {}
+        self._lock = Lock()
+
+    def start(self, start: int, end: int):
+        """
+        Start calculation of range, if there are no overlapping calculations.
+
+        :param start: start order number of range
+        :param end: end order number of range
+        :return: None if calculation started, otherwise list of events of
+        overlapping calculations
+        """
+        with self._lock:
+            overlapping = [
+                event for (flight_start, flight_end), event
+                in self._flights.items()
+                if flight_start <= end and start <= flight_end]
+            if overlapping:
+                self.waits += 1
+            else:
+                self._flights[(start, end)] = Event()
+                self.computations += 1
+        if self.metrics is not None:
+            self.metrics.count_flight('waited' if overlapping else 'started')
+        return overlapping or None
+
+    def finish(self, start: int, end: int):
+        """
+        Finish calculation of range and wake up waiting callers.
+
+        :param start: start order number of range
+        :param end: end order number of range
+        :return:
+        """
+        with self._lock:
+            self._flights.pop((start, end)).set()
+
+    def save_computation(self):
+        """
+        Count calculation, which wasn't needed after waiting.
+
+        :return:
+        """
+        with self._lock:
+            self.saved_computations += 1
+        if self.metrics is not None:
+            self.metrics.count_flight('saved')
@@ -1,7 +1,16 @@
 """Tests for all in shared package."""
+import asyncio
 from unittest import mock, TestCase
 
-from shared.use_case import Request, ResponseFailure, ResponseSuccess, UseCase
+from shared.admission import AdmissionControl, estimate_digits, \
+    estimate_digits_cost, estimate_number_cost, estimate_sequence_cost
+from shared.fibonacci import check_range, fibonacci_digits_count, \
+    fibonacci_leading_digits, fibonacci_pair, fibonacci_pair_modulo, \
+    fibonacci_segment, fibonacci_trailing_digits, is_pisano_table_cached, \
+    pisano_table, PISANO_TABLES_MAX_COUNT
+from shared.flights import RangeFlights
+from shared.use_case import AsyncUseCase, Request, ResponseFailure, \
+    ResponseSuccess, UseCase
 
 
 class RequestObjectTestCase(TestCase):
@@ -25,6 +34,32 @@ class RequestObjectTestCase(TestCase):
         request = Request()
         self.assertTrue(bool(request))
 
+    def test_parse_integer(self):
+        """
+        Parse correct and incorrect integer parameters.
+
+        Except integers and error of every incorrect parameter.
+        """
+        request = Request()
+        self.assertEqual(request.parse_integer('a', '5'), 5)
+        self.assertIsNone(request.parse_integer('b', None, required=False))
+        self.assertIsNone(request.parse_integer('c', None))
+        self.assertEqual(request.parse_integer('d', 'x'), 'x')
+        self.assertEqual(request.parse_integer('e', -1), -1)
+        self.assertEqual(request.parse_integer('f', 0, minimum=1,
+                                               maximum=10), 0)
+        self.assertEqual(request.parse_integer('g', '999', max_digits=3), 999)
+        self.assertEqual(request.parse_integer('h', '1000', max_digits=3),
+                         '1000')
+        self.assertEqual(request.parse_integer('i', 1000, max_digits=3), 1000)
+        self.assertEqual(request.errors, [
+            {'parameter': 'c', 'message': 'is required'},
+            {'parameter': 'd', 'message': 'must be integer'},
+            {'parameter': 'e', 'message': 'must be positive'},
+            {'parameter': 'f', 'message': 'must be between 1 and 10'},
+            {'parameter': 'h', 'message': 'must be not longer than 3 digits'},
+            {'parameter': 'i', 'message': 'must be not longer than 3 digits'}])
+
 
 class UseCaseTestCase(TestCase):
     """Tests for UseCase class."""
@@ -230,3 +265,440 @@ class ResponseObjectTestCase(TestCase):
         self.assertFalse(bool(response))
         self.assertEqual(response.type, ResponseFailure.SYSTEM_ERROR)
         self.assertEqual(response.message, 'test message')
+
+
+class AsyncUseCaseTestCase(TestCase):
+    """Tests for AsyncUseCase class."""
+
+    def setUp(self):
+        """Run before all tests."""
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def test_cannot_process_valid_requests(self):
+        """
+        Execute usecase with valid request object.
+
+        Except returning failed response object with SYSTEM_ERROR type and
+        exception message (because process_request() not implemented).
+        """
+        response = self.loop.run_until_complete(
+            AsyncUseCase().execute(Request()))
+
+        self.assertFalse(response)
+        self.assertEqual(response.type, ResponseFailure.SYSTEM_ERROR)
+        self.assertEqual(
+            response.message,
+            'NotImplementedError: process_request() not implemented by '
+            'AsyncUseCase class')
+
+    def test_can_process_invalid_requests_and_returns_response_failure(self):
+        """
+        Execute usecase with invalid request object.
+
+        Except returning failed response object with PARAMETERS_ERROR type.
+        """
+        invalid_request = Request()
+        invalid_request.add_error('some_param', 'some_message')
+
+        response = self.loop.run_until_complete(
+            AsyncUseCase().execute(invalid_request))
+
+        self.assertFalse(response)
+        self.assertEqual(response.type, ResponseFailure.PARAMETERS_ERROR)
+        self.assertEqual(response.message, 'some_param: some_message')
+
+
+class FibonacciPairTestCase(TestCase):
+    """Tests for fibonacci_pair function."""
+
+    def test_first_pairs(self):
+        """
+        Run fibonacci_pair() with small orders.
+
+        Except pairs of neighbour fibonacci numbers.
+        """
+        self.assertEqual(fibonacci_pair(0), (0, 1))
+        self.assertEqual(fibonacci_pair(1), (1, 1))
+        self.assertEqual(fibonacci_pair(2), (1, 2))
+        self.assertEqual(fibonacci_pair(21), (10946, 17711))
+
+    def test_exact_for_orders_where_float_is_wrong(self):
+        """
+        Run fibonacci_pair() with orders greater than float precision.
+
+        Except exact fibonacci numbers.
+        """
+        self.assertEqual(fibonacci_pair(100)[0],
+                         354224848179261915075)
+        self.assertEqual(fibonacci_pair(1500)[0] % 10 ** 10, 3354898000)
+
+    def test_equal_to_naive_sequence(self):
+        """
+        Compare fibonacci_pair() with naive sequence of additions.
+
+        Except equal numbers for all checked orders up to 200000.
+        """
+        checked_orders = set(range(0, 200001, 9973)) | {
+            1023, 1024, 65535, 65536, 131071, 199999, 200000}
+        current, following = 0, 1
+        for order in range(200001):
+            if order in checked_orders:
+                self.assertEqual(fibonacci_pair(order),
+                                 (current, following),
+                                 'order {}'.format(order))
+            current, following = following, current + following
+
+    def test_incorrect_order_type(self):
+        """
+        Run fibonacci_pair() with incorrect order type.
+
+        Except raising TypeError.
+        """
+        with self.assertRaises(TypeError) as e:
+            fibonacci_pair('x')
+        self.assertEqual(str(e.exception), 'order must be integer')
+
+    def test_negative_order(self):
+        """
+        Run fibonacci_pair() with negative order.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            fibonacci_pair(-1)
+        self.assertEqual(str(e.exception), 'order must be positive')
+
+
+class RangeFlightsTestCase(TestCase):
+    """Tests for RangeFlights class."""
+
+    def setUp(self):
+        """Set flights with one started range."""
+        self.flights = RangeFlights()
+        self.assertIsNone(self.flights.start(10, 20))
+
+    def test_start_overlapping_range(self):
+        """
+        Start range, which overlaps calculating range.
+
+        Except event of calculating range, which is set after finish.
+        """
+        overlapping = self.flights.start(20, 30)
+        self.assertEqual(len(overlapping), 1)
+        self.assertFalse(overlapping[0].is_set())
+        self.flights.finish(10, 20)
+        self.assertTrue(overlapping[0].is_set())
+        self.assertEqual((self.flights.computations, self.flights.waits),
+                         (1, 1))
+
+    def test_start_not_overlapping_range(self):
+        """
+        Start range, which doesn't overlap calculating range.
+
+        Except started calculation.
+        """
+        self.assertIsNone(self.flights.start(21, 30))
+        self.assertEqual(self.flights.computations, 2)
+
+    def test_start_after_finish(self):
+        """
+        Start the same range after finish.
+
+        Except started calculation.
+        """
+        self.flights.finish(10, 20)
+        self.assertIsNone(self.flights.start(10, 20))
+
+    def test_with_metrics(self):
+        """
+        Start, wait and save calculations with metrics.
+
+        Except every result recorded.
+        """
+        metrics = mock.MagicMock()
+        flights = RangeFlights(metrics)
+        flights.start(10, 20)
+        flights.start(15, 25)
+        flights.save_computation()
+        self.assertEqual(metrics.count_flight.call_args_list, [
+            mock.call('started'), mock.call('waited'), mock.call('saved')])
+
+
+class CheckRangeTestCase(TestCase):
+    """Tests for check_range function."""
+
+    def test_correct_range(self):
+        """
+        Run check_range() with correct ranges.
+
+        Except no exception.
+        """
+        check_range(0, 0)
+        check_range(5, 10)
+
+    def test_incorrect_range(self):
+        """
+        Run check_range() with incorrect types and values.
+
+        Except errors with messages of repos.
+        """
+        for start, end, error, message in (
+                ('x', 1, TypeError, 'start must be integer'),
+                (1, None, TypeError, 'end must be integer'),
+                (-1, 1, ValueError, 'start must be positive'),
+                (1, -1, ValueError, 'end must be positive'),
+                (5, 4, ValueError,
+                 'end must be greater than or equal to start')):
+            with self.assertRaises(error) as e:
+                check_range(start, end)
+            self.assertEqual(str(e.exception), message)
+
+
+class FibonacciSegmentTestCase(TestCase):
+    """Tests for fibonacci_segment function."""
+
+    def test_segment(self):
+        """
+        Run fibonacci_segment() for far segment.
+
+        Except exact numbers of segment.
+        """
+        self.assertEqual(fibonacci_segment(1000, 1010),
+                         [fibonacci_pair(order)[0]
+                          for order in range(1000, 1011)])
+        self.assertEqual(fibonacci_segment(0, 0), [0])
+
+
+class FibonacciPairModuloTestCase(TestCase):
+    """Tests for fibonacci_pair_modulo function."""
+
+    def test_equal_to_exact_numbers_modulo(self):
+        """
+        Compare fibonacci_pair_modulo() with exact numbers modulo m.
+
+        Except equal pairs for several orders and moduli.
+        """
+        for modulus in (1, 2, 10, 1000, 10 ** 9 + 7, 2 ** 64):
+            for order in (0, 1, 2, 21, 100, 1023, 10000):
+                current, following = fibonacci_pair(order)
+                self.assertEqual(
+                    fibonacci_pair_modulo(order, modulus),
+                    (current % modulus, following % modulus),
+                    'order {} modulus {}'.format(order, modulus))
+
+    def test_huge_order(self):
+        """
+        Run fibonacci_pair_modulo() with order greater than 10 ** 18.
+
+        Except last digits of fibonacci number.
+        """
+        self.assertEqual(fibonacci_pair_modulo(10 ** 18, 10),
+                         fibonacci_pair_modulo(10 ** 18 % 60, 10))
+
+    def test_incorrect_modulus(self):
+        """
+        Run fibonacci_pair_modulo() with incorrect modulus.
+
+        Except raising TypeError and ValueError.
+        """
+        with self.assertRaises(TypeError) as e:
+            fibonacci_pair_modulo(1, 'x')
+        self.assertEqual(str(e.exception), 'modulus must be integer')
+        with self.assertRaises(ValueError) as e:
+            fibonacci_pair_modulo(1, 0)
+        self.assertEqual(str(e.exception), 'modulus must be positive')
+
+
+class PisanoTableTestCase(TestCase):
+    """Tests for pisano_table function."""
+
+    def test_known_periods(self):
+        """
+        Run pisano_table() with small moduli.
+
+        Except tables with length of Pisano periods.
+        """
+        self.assertEqual(list(pisano_table(1)), [0])
+        self.assertEqual(list(pisano_table(2)), [0, 1, 1])
+        self.assertEqual(len(pisano_table(10)), 60)
+        self.assertEqual(len(pisano_table(1000)), 1500)
+
+    def test_table_is_cached(self):
+        """
+        Run pisano_table() twice with the same modulus.
+
+        Except the same table object.
+        """
+        self.assertIs(pisano_table(97), pisano_table(97))
+        self.assertTrue(is_pisano_table_cached(97))
+
+    def test_least_recently_used_table_is_evicted(self):
+        """
+        Run pisano_table() with more moduli than cached tables.
+
+        Except table of the first modulus is evicted.
+        """
+        for modulus in range(200, 201 + PISANO_TABLES_MAX_COUNT):
+            pisano_table(modulus)
+        self.assertFalse(is_pisano_table_cached(200))
+        self.assertTrue(is_pisano_table_cached(201))
+
+    def test_incorrect_modulus(self):
+        """
+        Run pisano_table() with not positive modulus.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            pisano_table(-1)
+        self.assertEqual(str(e.exception), 'modulus must be positive')
+
+
+class FibonacciDigitsTestCase(TestCase):
+    """Tests for digits functions of fibonacci numbers."""
+
+    def test_equal_to_exact_number(self):
+        """
+        Compare digits with exact numbers below and above exact max order.
+
+        Except equal count, leading and trailing digits.
+        """
+        for order in (0, 1, 21, 100, 10000, 10001, 12345, 19999):
+            number = str(fibonacci_pair(order)[0])
+            self.assertEqual(fibonacci_digits_count(order), len(number))
+            for count in (1, 4, 30):
+                self.assertEqual(fibonacci_leading_digits(order, count),
+                                 number[:count], 'order {}'.format(order))
+                self.assertEqual(fibonacci_trailing_digits(order, count),
+                                 number[-count:], 'order {}'.format(order))
+
+    def test_huge_order(self):
+        """
+        Get digits of F(10^9).
+
+        Except known count and leading and trailing digits.
+        """
+        self.assertEqual(fibonacci_digits_count(10 ** 9), 208987640)
+        self.assertEqual(fibonacci_leading_digits(10 ** 9, 10), '7952317874')
+        self.assertEqual(fibonacci_trailing_digits(10 ** 9, 10), '1560546875')
+
+    def test_trailing_digits_with_leading_zeros(self):
+        """
+        Get trailing digits of F(750), which ends with 000.
+
+        Except string with leading zeros.
+        """
+        self.assertEqual(fibonacci_trailing_digits(750, 3), '000')
+
+    def test_incorrect_count(self):
+        """
+        Get leading digits with zero count.
+
+        Except raising ValueError.
+        """
+        with self.assertRaises(ValueError) as e:
+            fibonacci_leading_digits(10, 0)
+        self.assertEqual(str(e.exception), 'count must be between 1 and 1000')
+
+
+class AdmissionTestCase(TestCase):
+    """Tests for cost estimation and AdmissionControl class."""
+
+    def test_estimate_digits(self):
+        """
+        Estimate digits of fibonacci numbers.
+
+        Except count of digits of exact numbers.
+        """
+        for order in (0, 1, 7, 100, 1000, 12345):
+            self.assertEqual(estimate_digits(order),
+                             len(str(fibonacci_pair(order)[0])),
+                             'order {}'.format(order))
+
+    def test_estimate_number_cost(self):
+        """
+        Estimate cost of near and far fibonacci numbers.
+
+        Except cost of fast doubling and conversion to decimal without
+        overflow for any order.
+        """
+        self.assertEqual(estimate_number_cost(100000), (
+            int(2 * 20899 ** 1.6) + 20899 ** 2 // 8, 20899))
+        self.assertGreater(estimate_number_cost(10 ** 400)[0], 10 ** 160)
+
+    def test_estimate_digits_cost(self):
+        """
+        Estimate cost of digits of near and far fibonacci numbers.
+
+        Except cost of exact numbers for small orders and cost
+        of logarithms growing with cube of precision for far orders.
+        """
+        self.assertEqual(estimate_digits_cost(100, 10)[0],
+                         3 * estimate_number_cost(100)[0])
+        self.assertEqual(estimate_digits_cost(10 ** 9, 4)[0],
+                         2 * 24 ** 3 + int(10 * 30 * 4 ** 1.6))
+        self.assertGreater(estimate_digits_cost(10 ** 3000, 1000)[0],
+                           10 ** 11)
+
+    def test_estimate_sequence_cost(self):
+        """
+        Estimate cost of exact and modular sequences.
+
+        Except cost of fast doubling, additions and conversions to decimal
+        by digits of last number, cost of not cached Pisano period table
+        and of modular fast doubling to start above table moduli.
+        """
+        self.assertEqual(estimate_sequence_cost(0, 99999), (
+            2 + 100000 * 20899 + 100000 * (20899 ** 2 // 8),
+            100000 * (10450 + 2)))
+        self.assertEqual(
+            estimate_sequence_cost(100000, 100009, decimal=False),
+            (int(2 * 20899 ** 1.6) + 10 * 20901, 10 * (20900 + 2)))
+        self.assertEqual(
+            estimate_sequence_cost(100000, 100009, decimal=False,
+                                   seeded=True),
+            (10 * 20901, 10 * (20900 + 2)))
+        self.assertEqual(estimate_sequence_cost(10, 19, 1009),
+                         (40 + 6 * 1009 * 4, 60))
+        self.assertEqual(estimate_sequence_cost(10, 19, 1009, 1000),
+                         (40 + int(10 * 4 * 4 ** 1.6), 60))
+        self.assertGreater(
+            estimate_sequence_cost(10 ** 999, 10 ** 999, 10 ** 999 + 7)[0],
+            10 ** 9)
+        pisano_table(1009)
+        self.assertEqual(estimate_sequence_cost(10, 19, 1009), (40, 60))
+
+    def test_limits(self):
+        """
+        Admit requests above max cost and max response size.
+
+        Except failed responses with LIMIT_ERROR type.
+        """
+        admission = AdmissionControl(max_cost=100, max_response_bytes=10)
+
+        self.assertIsNone(admission.admit(100, 10))
+        response = admission.admit(101, 1)
+        self.assertEqual(response.type, ResponseFailure.LIMIT_ERROR)
+        self.assertEqual(response.message, 'cost 101 exceeds limit 100')
+        response = admission.admit(1, 11)
+        self.assertEqual(response.message,
+                         'response size 11 exceeds limit 10')
+
+    def test_budget(self):
+        """
+        Admit requests above in-flight budget.
+
+        Except first request and cheap requests are admitted, others
+        are shed until release.
+        """
+        admission = AdmissionControl(budget=100, cheap_cost=5)
+
+        self.assertIsNone(admission.admit(150, 0))
+        self.assertEqual(admission.admit(10, 0).type,
+                         ResponseFailure.OVERLOAD_ERROR)
+        self.assertIsNone(admission.admit(5, 0))
+        admission.release(5)
+        admission.release(150)
+        self.assertEqual(admission.in_flight, 0)
+        self.assertIsNone(admission.admit(10, 0))
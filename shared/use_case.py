@@ -30,6 +30,35 @@ class UseCase:
             'process_request() not implemented by UseCase class')
 
 
+class AsyncUseCase(UseCase):
+    """
+    Abstract class for business logic of application with asyncio.
+
+    Same as UseCase, but execute and process_request are coroutines.
+    """
+
+    async def execute(self, request):
+        """
+        Run usecase.
+
+        :param request:
+        :return: ResponseFailure or ResponseSuccess object
+        """
+        if not request:
+            return ResponseFailure.build_from_invalid_request(
+                request)
+        try:
+            return await self.process_request(request)
+        except Exception as exc:
+            return ResponseFailure.build_system_error(
+                '{}: {}'.format(exc.__class__.__name__, '{}'.format(exc)))
+
+    async def process_request(self, request):
+        """Abstract method, must return ResponseSuccess object."""
+        raise NotImplementedError(
+            'process_request() not implemented by AsyncUseCase class')
+
+
 class Request:
     """Request for usecase."""
 
@@ -47,6 +76,50 @@ class Request:
         """
         self.errors.append({'parameter': parameter, 'message': message})
 
+    def parse_integer(self, parameter, value, minimum=0, maximum=None,
+                      required=True, strict=False, max_digits=None):
+        """
+        Convert parameter to integer and add error if it is incorrect.
+
+        :param parameter: parameter name for error.
+        :param value: parameter value.
+        :param minimum: min value of parameter.
+        :param maximum: max value of parameter, None - without limit.
+        :param required: add error if value is None.
+        :param strict: floats and booleans aren't truncated to integer.
+        :param max_digits: max count of decimal digits, checked before
+        conversion of strings, which is quadratic, None - without limit.
+        :return: integer, value itself if it isn't integer.
+        """
+        if value is None:
+            if required:
+                self.add_error(parameter, 'is required')
+            return None
+        if strict and isinstance(value, (bool, float)):
+            self.add_error(parameter, 'must be integer')
+            return value
+        if max_digits is not None and self._is_too_long(value, max_digits):
+            self.add_error(parameter, 'must be not longer than {} digits'
+                           .format(max_digits))
+            return value
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            self.add_error(parameter, 'must be integer')
+            return value
+        if maximum is not None and not minimum <= value <= maximum:
+            self.add_error(parameter, 'must be between {} and {}'.format(
+                minimum, maximum))
+        elif value < minimum:
+            self.add_error(parameter, 'must be positive')
+        return value
+
+    @staticmethod
+    def _is_too_long(value, max_digits: int):
+        if isinstance(value, str):
+            return len(value.strip()) > max_digits
+        return isinstance(value, int) and abs(value) >= 10 ** max_digits
+
     def has_errors(self):
         """
         Check errors list.
@@ -81,6 +154,8 @@ class ResponseFailure:
     RESOURCE_ERROR = 'RESOURCE_ERROR'
     PARAMETERS_ERROR = 'PARAMETERS_ERROR'
     SYSTEM_ERROR = 'SYSTEM_ERROR'
+    LIMIT_ERROR = 'LIMIT_ERROR'
+    OVERLOAD_ERROR = 'OVERLOAD_ERROR'
 
     def __init__(self, type_, message):
         """
@@ -140,6 +215,26 @@ class ResponseFailure:
         """
         return cls(cls.PARAMETERS_ERROR, message)
 
+    @classmethod
+    def build_limit_error(cls, message=None):
+        """
+        Create failed response object with LIMIT_ERROR type.
+
+        :param message:
+        :return:
+        """
+        return cls(cls.LIMIT_ERROR, message)
+
+    @classmethod
+    def build_overload_error(cls, message=None):
+        """
+        Create failed response object with OVERLOAD_ERROR type.
+
+        :param message:
+        :return:
+        """
+        return cls(cls.OVERLOAD_ERROR, message)
+
     @classmethod
     def build_from_invalid_request(cls, invalid_request):
         """
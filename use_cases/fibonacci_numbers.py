@@ -1,15 +1,51 @@
 """Module for fibonacci sequence usecase class."""
-from math import sqrt
+import asyncio
+from itertools import chain
+from time import perf_counter
 
-from shared.use_case import Request, ResponseSuccess, UseCase
+from shared.admission import estimate_digits_cost, estimate_number_cost, \
+    estimate_sequence_cost
+from shared.fibonacci import check_range, DIGITS_MAX_COUNT, \
+    fibonacci_digits_count, fibonacci_leading_digits, fibonacci_pair, \
+    fibonacci_pair_modulo, fibonacci_segment, fibonacci_trailing_digits, \
+    pisano_table
+from shared.use_case import AsyncUseCase, Request, ResponseSuccess, UseCase
+
+# Sequences with longer orders or moduli are beyond any cost limit, and
+# parsing of longer integers is quadratic.
+ORDER_MAX_DIGITS = 1000
 
 
 class GetFibonacciSequenceUseCase(UseCase):
     """Usecase class."""
 
-    def __init__(self, repo):
-        """Set repo."""
+    def __init__(self, repo, chunk_size=1000, stream=False, flights=None,
+                 metrics=None, pool=None, pool_chunks=4):
+        """
+        Set repo and sequence options.
+
+        :param repo: fibonacci numbers repo
+        :param chunk_size: count of numbers got from repo at once
+        :param stream: return iterator of numbers instead of list
+        :param flights: RangeFlights object for coalescing of concurrent
+        calculations, None - without coalescing
+        :param metrics: recorder of calculation duration and count of
+        calculated numbers, None - without metrics
+        :param pool: process pool executor for calculation of missing
+        chunks, None - calculation in current thread
+        :param pool_chunks: count of chunks calculated in pool at once
+        """
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+        if pool_chunks < 1:
+            raise ValueError('pool_chunks must be positive')
         self.repo = repo
+        self.chunk_size = chunk_size
+        self.stream = stream
+        self.flights = flights
+        self.metrics = metrics
+        self.pool = pool
+        self.pool_chunks = pool_chunks
 
     def process_request(self, request):
         """
@@ -21,6 +57,15 @@ class GetFibonacciSequenceUseCase(UseCase):
         """
         start = request.start
         end = request.end
+        if request.limit is not None:
+            # Page is bounded by limit, so it isn't streamed.
+            return ResponseSuccess(list(self._iter_fibonacci_sequence(
+                start, request.page_end, request.previous)))
+        if self.stream:
+            numbers = self._iter_fibonacci_sequence(start, end)
+            # Get first chunk here, so repo errors become failed response.
+            first_number = next(numbers)
+            return ResponseSuccess(chain((first_number,), numbers))
         numbers = self._get_fibonacci_sequence(start, end)
         return ResponseSuccess(numbers)
 
@@ -29,89 +74,655 @@ class GetFibonacciSequenceUseCase(UseCase):
         """
         Calculate fibonacci number by order number.
 
-        Use Binet's formula.
+        Use exact fast doubling, so result is correct for any order.
 
         :param order: order number of fibonacci number
         :return: fibonacci number
         """
-        if not isinstance(order, int):
-            raise TypeError('order must be integer')
-        if order < 0:
-            raise ValueError('order must be positive')
+        return fibonacci_pair(order)[0]
 
-        # Binet's formula
-        sqrt_five = sqrt(5)
-        left = (1 + sqrt_five) / 2
-        right = (1 - sqrt_five) / 2
+    @staticmethod
+    def _calculate_fibonacci_pair(order: int):
+        """
+        Calculate pair of neighbour fibonacci numbers by order number.
 
-        return round((pow(left, order) - pow(right, order)) / sqrt_five)
+        :param order: order number of first fibonacci number
+        :return: tuple with fibonacci numbers of order and order+1
+        """
+        return fibonacci_pair(order)
 
     def _get_fibonacci_sequence(self, start: int, end: int):
         """
         Get fibonacci sequence from repo or calculate.
 
-        If number of requested sequence doesn't exist in repo, it calculate
-        by previous numbers in sequence. If first two numbers of requested
-        sequence don't exist, they calculate by _calculate_fibonacci_number.
-
         :param start: start order number of fibonacci sequence
         :param end: end order number of fibonacci sequence
         :return: list with fibonacci sequence
         """
-        if not isinstance(start, int):
-            raise TypeError('start must be integer')
-        if not isinstance(end, int):
-            raise TypeError('end must be integer')
-        if start < 0:
-            raise ValueError('start must be positive')
-        if end < 0:
-            raise ValueError('end must be positive')
-        if end < start:
-            raise ValueError('end must be greater than or equal to start')
-
-        numbers = self.repo.numbers_list(start, end)
+        return list(self._iter_fibonacci_sequence(start, end))
+
+    def _iter_fibonacci_sequence(self, start: int, end: int, previous=()):
+        """
+        Get iterator of fibonacci sequence from repo or calculate.
+
+        Numbers are got from repo by chunks, so only one chunk is kept
+        in memory.
+
+        :param start: start order number of fibonacci sequence
+        :param end: end order number of fibonacci sequence
+        :param previous: up to two known numbers before start
+        :return: iterator of fibonacci sequence
+        """
+        check_range(start, end)
+        return self._generate_fibonacci_sequence(start, end, tuple(previous))
+
+    def _generate_fibonacci_sequence(self, start: int, end: int,
+                                     previous=()):
+        window_size = self.chunk_size
+        if self.pool is not None:
+            window_size *= self.pool_chunks
+        for window_start in range(start, end + 1, window_size):
+            window_end = min(window_start + window_size - 1, end)
+            chunks = self._read_window(window_start, window_end)
+            try:
+                for chunk in chunks:
+                    chunk_start, chunk_end, numbers, segment, overlapping = \
+                        chunk
+                    if segment is not None:
+                        numbers = self._save_segment(chunk)
+                    elif self.flights is None or None not in numbers:
+                        self._fill_and_save_gaps(chunk_start, numbers,
+                                                 previous)
+                    else:
+                        numbers = self._fill_gaps_once(
+                            chunk_start, chunk_end, numbers, previous,
+                            overlapping)
+                    yield from numbers
+                    previous = (previous + tuple(numbers[-2:]))[-2:]
+            finally:
+                # Chunks aren't saved after error or close of iterator,
+                # but their flights must not block other requests.
+                self._finish_segments(chunks)
+
+    def _read_window(self, start: int, end: int):
+        """
+        Get chunks of window from repo and start calculation of missing.
+
+        Chunks without any number in repo are calculated in pool,
+        each seeded by its first pair, so they are calculated in parallel.
+        With flights, chunk is submitted to pool only if no overlapping
+        range is calculating, otherwise events of overlapping
+        calculations are kept for waiting.
+
+        :param start: start order number of window
+        :param end: end order number of window
+        :return: list of lists with start and end order numbers of chunk,
+        numbers from repo, future of calculated chunk or None and events
+        of overlapping calculations or None
+        """
+        chunks = []
+        for chunk_start in range(start, end + 1, self.chunk_size):
+            chunk_end = min(chunk_start + self.chunk_size - 1, end)
+            numbers = self.repo.numbers_list(chunk_start, chunk_end)
+            chunks.append([chunk_start, chunk_end, numbers, None, None])
+        if self.pool is not None:
+            try:
+                for chunk in chunks:
+                    if chunk[2].count(None) == len(chunk[2]):
+                        self._submit_segment(chunk)
+            except BaseException:
+                self._finish_segments(chunks)
+                raise
+        return chunks
+
+    def _submit_segment(self, chunk: list):
+        """
+        Submit calculation of chunk to pool, if nobody calculates it now.
+
+        :param chunk: chunk from _read_window, its future or events of
+        overlapping calculations are set
+        :return:
+        """
+        start, end = chunk[:2]
+        if self.flights is not None:
+            chunk[4] = self.flights.start(start, end)
+            if chunk[4] is not None:
+                return
+        try:
+            chunk[3] = self.pool.submit(fibonacci_segment, start, end)
+        except BaseException:
+            if self.flights is not None:
+                self.flights.finish(start, end)
+            raise
+
+    def _save_segment(self, chunk: list):
+        """
+        Save chunk calculated in pool and finish its flight.
+
+        :param chunk: chunk from _read_window with future
+        :return: list of chunk numbers
+        """
+        start, end, _, segment = chunk[:4]
+        try:
+            started = perf_counter()
+            numbers = segment.result()
+            if self.metrics is not None:
+                self.metrics.observe_stage('fill_gaps',
+                                           perf_counter() - started)
+                self.metrics.count_computed(len(numbers))
+            self.repo.add_numbers(**{str(start + index): number
+                                     for index, number in enumerate(numbers)})
+        finally:
+            chunk[3] = None
+            if self.flights is not None:
+                self.flights.finish(start, end)
+        return numbers
+
+    def _finish_segments(self, chunks: list):
+        """
+        Finish flights of chunks, which are submitted, but not saved.
+
+        :param chunks: chunks from _read_window
+        :return:
+        """
+        for chunk in chunks:
+            if chunk[3] is not None:
+                chunk[3].cancel()
+                chunk[3] = None
+                if self.flights is not None:
+                    self.flights.finish(*chunk[:2])
+
+    def _fill_gaps_once(self, start: int, end: int, numbers: list,
+                        previous=(), overlapping=None):
+        """
+        Calculate missing numbers of chunk, if nobody calculates them now.
+
+        Wait for concurrent calculations of overlapping ranges and get
+        chunk from repo again, so shared numbers are calculated once.
+
+        :param start: start order number of chunk
+        :param end: end order number of chunk
+        :param numbers: list of numbers from repo, None for missing number
+        :param previous: up to two numbers before chunk
+        :param overlapping: events of overlapping calculations, which are
+        already found, None - check flights
+        :return: list of chunk numbers
+        """
+        while True:
+            if overlapping is None:
+                overlapping = self.flights.start(start, end)
+            if overlapping is None:
+                break
+            for event in overlapping:
+                event.wait()
+            numbers = self.repo.numbers_list(start, end)
+            if None not in numbers:
+                self.flights.save_computation()
+                return numbers
+            overlapping = None
+
+        try:
+            self._fill_and_save_gaps(start, numbers, previous)
+        finally:
+            self.flights.finish(start, end)
+        return numbers
+
+    def _fill_and_save_gaps(self, start: int, numbers: list, previous=()):
+        started = perf_counter()
+        numbers_for_save = self._fill_gaps(start, numbers, previous)
+        if self.metrics is not None:
+            self.metrics.observe_stage('fill_gaps', perf_counter() - started)
+            self.metrics.count_computed(len(numbers_for_save))
+        self.repo.add_numbers(**numbers_for_save)
+
+    def _fill_gaps(self, start: int, numbers: list, previous=()):
+        """
+        Calculate missing numbers of chunk by runs.
+
+        Every run of missing numbers is calculated by additions from two
+        numbers before it, by subtractions from two numbers after it or,
+        if there are no such numbers, from pair calculated
+        by _calculate_fibonacci_pair. So work depends only on count
+        of missing numbers.
+
+        :param start: start order number of chunk
+        :param numbers: list of numbers from repo, None for missing number
+        :param previous: up to two numbers before chunk
+        :return: dict of calculated numbers for save
+        """
         numbers_for_save = {}
+        for first, last in self._missing_runs(numbers):
+            before = tuple(numbers[max(first - 2, 0):first])
+            before = (previous + before)[-2:]
+            after = numbers[last + 1:last + 3]
+            if len(before) == 2:
+                current = before[0] + before[1]
+                self._fill_run_forward(numbers, first, last,
+                                       (current, before[1] + current))
+            elif len(after) == 2 and None not in after:
+                self._fill_run_backward(numbers, first, last, after)
+            else:
+                self._fill_run_forward(
+                    numbers, first, last,
+                    self._calculate_fibonacci_pair(start + first))
+            numbers_for_save.update(
+                (str(start + index), numbers[index])
+                for index in range(first, last + 1))
+
+        return numbers_for_save
+
+    @staticmethod
+    def _missing_runs(numbers: list):
+        """
+        Find runs of missing numbers.
+
+        :param numbers: list of numbers, None for missing number
+        :return: iterator of tuples with first and last indices of run
+        """
+        first = None
+        for index, number in enumerate(numbers):
+            if number is None:
+                if first is None:
+                    first = index
+            elif first is not None:
+                yield first, index - 1
+                first = None
+        if first is not None:
+            yield first, len(numbers) - 1
+
+    @staticmethod
+    def _fill_run_forward(numbers: list, first: int, last: int, pair):
+        current, following = pair
+        for index in range(first, last + 1):
+            numbers[index] = current
+            current, following = following, current + following
+
+    @staticmethod
+    def _fill_run_backward(numbers: list, first: int, last: int, pair):
+        current, following = pair
+        for index in range(last, first - 1, -1):
+            current, following = following - current, current
+            numbers[index] = current
+
+
+class AsyncGetFibonacciSequenceUseCase(AsyncUseCase,
+                                       GetFibonacciSequenceUseCase):
+    """
+    Usecase class for asyncio repo.
+
+    Repo methods are coroutines. Missing numbers are calculated
+    in executor, so event loop isn't blocked by big integers arithmetic.
+    """
+
+    def __init__(self, repo, chunk_size=1000, stream=False, executor=None):
+        """
+        Set repo, sequence options and executor.
+
+        :param repo: asyncio fibonacci numbers repo
+        :param chunk_size: count of numbers got from repo at once
+        :param stream: return async iterator of numbers instead of list
+        :param executor: executor for calculation, None - default executor
+        """
+        super().__init__(repo, chunk_size=chunk_size, stream=stream)
+        self.executor = executor
+
+    async def process_request(self, request):
+        """
+        Need for usecase implementation.
 
-        none_indices = (
-            index for index, number in enumerate(numbers) if number is None)
-        for index in none_indices:
-            if index < 2:
-                numbers[index] = self._calculate_fibonacci_number(start+index)
+        :param request: request object witn start and end orders numbers
+        of requested fibonacci sequence.
+        :return: response success object
+        """
+        start = request.start
+        end = request.end
+        if request.limit is not None:
+            return ResponseSuccess([
+                number async for number in self._iter_fibonacci_sequence(
+                    start, request.page_end, request.previous)])
+        if self.stream:
+            numbers = self._iter_fibonacci_sequence(start, end)
+            # Get first chunk here, so repo errors become failed response.
+            first_number = await numbers.__anext__()
+            return ResponseSuccess(self._prepend(first_number, numbers))
+        numbers = await self._get_fibonacci_sequence(start, end)
+        return ResponseSuccess(numbers)
+
+    async def _get_fibonacci_sequence(self, start: int, end: int):
+        """
+        Get fibonacci sequence from repo or calculate.
+
+        :param start: start order number of fibonacci sequence
+        :param end: end order number of fibonacci sequence
+        :return: list with fibonacci sequence
+        """
+        return [number async for number in
+                self._iter_fibonacci_sequence(start, end)]
+
+    async def _generate_fibonacci_sequence(self, start: int, end: int,
+                                           previous=()):
+        loop = asyncio.get_event_loop()
+        for chunk_start in range(start, end + 1, self.chunk_size):
+            chunk_end = min(chunk_start + self.chunk_size - 1, end)
+            numbers = await self.repo.numbers_list(chunk_start, chunk_end)
+            numbers_for_save = await loop.run_in_executor(
+                self.executor, self._fill_gaps, chunk_start, numbers,
+                previous)
+            await self.repo.add_numbers(**numbers_for_save)
+            for number in numbers:
+                yield number
+            previous = (previous + tuple(numbers[-2:]))[-2:]
+
+    @staticmethod
+    async def _prepend(first_number, numbers):
+        yield first_number
+        async for number in numbers:
+            yield number
+
+
+class GetFibonacciBatchUseCase(GetFibonacciSequenceUseCase):
+    """
+    Usecase class for several ranges and numbers.
+
+    Overlapping and adjacent ranges are merged, so every number is got
+    from repo and calculated once, then results are sliced per query.
+    Repo interface reads one range per call, so every merged range is
+    read and saved by its own calls for each chunk, not by one pipeline
+    for the union.
+    """
+
+    def process_request(self, request):
+        """
+        Need for usecase implementation.
+
+        :param request: request object with list of ranges.
+        :return: response success object with list of results, list of
+        numbers for range query and number for point query
+        """
+        merged = self._merge_ranges(request.ranges)
+        sequences = [(start, self._get_fibonacci_sequence(start, end))
+                     for start, end in merged]
+        results = []
+        for start, end, point in request.ranges:
+            for sequence_start, sequence in sequences:
+                if sequence_start <= start < sequence_start + len(sequence):
+                    break
+            offset = start - sequence_start
+            numbers = sequence[offset:offset + end - start + 1]
+            results.append(numbers[0] if point else numbers)
+        return ResponseSuccess(results)
+
+    @staticmethod
+    def _merge_ranges(ranges):
+        """
+        Merge overlapping and adjacent ranges.
+
+        :param ranges: iterable of tuples with start and end order numbers
+        :return: sorted list of tuples with start and end order numbers
+        """
+        merged = []
+        for start, end, *_ in sorted(ranges):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
             else:
-                numbers[index] = numbers[index-1] + numbers[index-2]
-            numbers_for_save[str(start+index)] = numbers[index]
+                merged.append((start, end))
+        return merged
 
-        self.repo.add_numbers(**numbers_for_save)
 
-        return numbers
+class GetFibonacciNumberUseCase(UseCase):
+    """
+    Usecase class for one fibonacci number.
+
+    Number is got from repo or calculated by fast doubling, then pair of
+    F(n) and F(n+1) is saved as anchor, so lookup needs O(log n)
+    multiplications and doesn't depend on stored ranges.
+    """
+
+    def __init__(self, repo):
+        """
+        Set repo.
+
+        :param repo: fibonacci numbers repo
+        """
+        self.repo = repo
+
+    def process_request(self, request):
+        """
+        Need for usecase implementation.
+
+        :param request: request object with order number of requested
+        fibonacci number.
+        :return: response success object
+        """
+        return ResponseSuccess(self._get_fibonacci_number(request.order))
+
+    def _get_fibonacci_number(self, order: int):
+        """
+        Get fibonacci number from repo or calculate.
+
+        :param order: order number of fibonacci number
+        :return: fibonacci number
+        """
+        check_range(order, order)
+        number, following = self.repo.numbers_list(order, order + 1)
+        if number is not None:
+            return number
+        number, following = fibonacci_pair(order)
+        self.repo.add_numbers(**{str(order): number,
+                                 str(order + 1): following})
+        return number
+
+
+class GetFibonacciDigitsUseCase(UseCase):
+    """
+    Usecase class for digits of one fibonacci number.
+
+    Count and leading digits are calculated by logarithm of Binet's
+    formula, trailing digits - by fast doubling modulo 10^k, so number
+    itself isn't calculated.
+    """
+
+    def process_request(self, request):
+        """
+        Need for usecase implementation.
+
+        :param request: request object with order number of fibonacci
+        number and count of leading and trailing digits.
+        :return: response success object with dict of digits
+        """
+        order = request.order
+        count = request.count
+        return ResponseSuccess({
+            'order': order,
+            'digits': fibonacci_digits_count(order),
+            'leading': fibonacci_leading_digits(order, count),
+            'trailing': fibonacci_trailing_digits(order, count)})
+
+
+class GetFibonacciSequenceModuloUseCase(UseCase):
+    """
+    Usecase class for fibonacci sequence modulo m.
+
+    Numbers modulo m are small, so they are calculated without repo:
+    small moduli are served from cached Pisano period tables, other moduli
+    are calculated from F(start) mod m by modular fast doubling.
+    """
+
+    def __init__(self, stream=False, table_max_modulus=100000):
+        """
+        Set sequence options.
+
+        :param stream: return iterator of numbers instead of list
+        :param table_max_modulus: max modulus served from Pisano period
+        table, table length is up to 6 * modulus
+        """
+        self.stream = stream
+        self.table_max_modulus = table_max_modulus
+
+    def process_request(self, request):
+        """
+        Need for usecase implementation.
+
+        :param request: request object with start and end orders numbers
+        and modulus of requested fibonacci sequence.
+        :return: response success object
+        """
+        numbers = self._iter_fibonacci_sequence_modulo(
+            request.start, request.page_end, request.modulus)
+        if self.stream and request.limit is None:
+            return ResponseSuccess(numbers)
+        return ResponseSuccess(list(numbers))
+
+    def _iter_fibonacci_sequence_modulo(self, start: int, end: int,
+                                        modulus: int):
+        """
+        Get iterator of fibonacci sequence modulo m.
+
+        :param start: start order number of fibonacci sequence
+        :param end: end order number of fibonacci sequence
+        :param modulus: modulus
+        :return: iterator of fibonacci numbers modulo m
+        """
+        check_range(start, end)
+        if modulus <= self.table_max_modulus:
+            table = pisano_table(modulus)
+            period = len(table)
+            return (table[order % period]
+                    for order in range(start, end + 1))
+        return self._generate_fibonacci_sequence_modulo(start, end, modulus)
+
+    @staticmethod
+    def _generate_fibonacci_sequence_modulo(start: int, end: int,
+                                            modulus: int):
+        current, following = fibonacci_pair_modulo(start, modulus)
+        for _ in range(start, end + 1):
+            yield current
+            current, following = following, (current + following) % modulus
 
 
 class GetFibonacciSequenceRequest(Request):
     """Request object foe fibonacci sequence."""
 
-    def __init__(self, start=None, end=None):
-        """Check and set params and errors."""
+    def __init__(self, start=None, end=None, modulus=None, limit=None,
+                 previous=(), max_limit=10000, table_max_modulus=100000,
+                 decimal=True, strict=False):
+        """
+        Check and set params and errors.
+
+        Limit - max count of numbers of page from start, previous - known
+        numbers before start from cursor of previous page, table_max_modulus
+        - max modulus served from Pisano period table, decimal - numbers
+        are serialized as decimal, it is counted in cost, strict - floats
+        and booleans of start and end aren't truncated to integer.
+        """
         super().__init__()
-        if start is None:
-            self.add_error('start', 'is required')
-        else:
-            try:
-                start = int(start)
-                if start < 0:
-                    self.add_error('start', 'must be positive')
-            except ValueError:
-                self.add_error('start', 'must be integer')
-        if end is None:
-            self.add_error('end', 'is required')
-        else:
-            try:
-                end = int(end)
-                if end < 0:
-                    self.add_error('end', 'must be positive')
-            except ValueError:
-                self.add_error('end', 'must be integer')
-        if not self.has_errors() and end < start:
+        self.start = self.parse_integer('start', start, strict=strict,
+                                        max_digits=ORDER_MAX_DIGITS)
+        self.end = self.parse_integer('end', end, strict=strict,
+                                      max_digits=ORDER_MAX_DIGITS)
+        if not self.has_errors() and self.end < self.start:
             self.add_error('end', 'must be greater than or equal to start')
+        self.modulus = self.parse_integer('modulus', modulus, minimum=1,
+                                          required=False,
+                                          max_digits=ORDER_MAX_DIGITS)
+        self.limit = self.parse_integer('limit', limit, minimum=1,
+                                        maximum=max_limit, required=False)
+        self.previous = tuple(previous)
+        self.cost = self.response_bytes = 0
+        if not self.has_errors():
+            self.cost, self.response_bytes = estimate_sequence_cost(
+                self.start, self.page_end, self.modulus, table_max_modulus,
+                decimal=decimal, seeded=len(self.previous) == 2)
 
-        self.start = start
-        self.end = end
+    @property
+    def page_end(self):
+        """
+        Get end order number of page.
+
+        :return: end of range bounded by limit
+        """
+        if self.limit is None:
+            return self.end
+        return min(self.end, self.start + self.limit - 1)
+
+
+class GetFibonacciNumberRequest(Request):
+    """Request object for one fibonacci number."""
+
+    def __init__(self, order=None):
+        """Check and set params and errors."""
+        super().__init__()
+        self.order = self.parse_integer('order', order)
+        self.cost = self.response_bytes = 0
+        if not self.has_errors():
+            self.cost, self.response_bytes = estimate_number_cost(self.order)
+
+
+class GetFibonacciDigitsRequest(GetFibonacciNumberRequest):
+    """Request object for digits of one fibonacci number."""
+
+    def __init__(self, order=None, count=None):
+        """Check and set params and errors."""
+        super().__init__(order)
+        self.count = self.parse_integer(
+            'count', 10 if count is None else count, minimum=1,
+            maximum=DIGITS_MAX_COUNT)
+        self.cost = self.response_bytes = 0
+        if not self.has_errors():
+            self.cost, self.response_bytes = estimate_digits_cost(
+                self.order, self.count)
+
+
+class GetFibonacciBatchRequest(Request):
+    """Request object for several ranges and numbers."""
+
+    def __init__(self, queries=None, max_queries=100):
+        """
+        Check and set params and errors.
+
+        Query is dict with from and to keys for range or n key for number.
+        """
+        super().__init__()
+        self.ranges = []
+        self.cost = self.response_bytes = 0
+        if queries is None:
+            self.add_error('queries', 'is required')
+            return
+        if not isinstance(queries, list) or not queries:
+            self.add_error('queries', 'must be not empty list')
+            return
+        if len(queries) > max_queries:
+            self.add_error('queries', 'must be not longer than {}'.format(
+                max_queries))
+            return
+
+        for index, query in enumerate(queries):
+            if not isinstance(query, dict):
+                self.add_error('queries[{}]'.format(index), 'must be object')
+            else:
+                self._add_query(index, query)
+
+    def _add_query(self, index: int, query: dict):
+        """
+        Check query and add its range.
+
+        :param index: index of query for errors
+        :param query: dict with from and to keys or n key
+        :return:
+        """
+        point = 'n' in query
+        if point:
+            request = GetFibonacciSequenceRequest(query['n'], query['n'],
+                                                  strict=True)
+            names = {'start': 'n', 'end': 'n'}
+        else:
+            request = GetFibonacciSequenceRequest(
+                query.get('from'), query.get('to'), strict=True)
+            names = {'start': 'from', 'end': 'to'}
+        # Start and end of point query have the same errors.
+        for error in request.errors[:1] if point else request.errors:
+            self.add_error('queries[{}].{}'.format(
+                index, names[error['parameter']]), error['message'])
+        self.ranges.append((request.start, request.end, point))
+        self.cost += request.cost
+        self.response_bytes += request.response_bytes
@@ -0,0 +1,77 @@
+"""Module for precomputing of fibonacci numbers into repo."""
+from shared.fibonacci import fibonacci_pair
+
+
+def split_range(start: int, end: int, segment_size: int):
+    """
+    Split range of order numbers to segments.
+
+    :param start: start order number of range
+    :param end: end order number of range
+    :param segment_size: max count of numbers in segment
+    :return: list of tuples with start and end of segments
+    """
+    if segment_size < 1:
+        raise ValueError('segment_size must be positive')
+    if end < start:
+        raise ValueError('end must be greater than or equal to start')
+    return [(segment_start, min(segment_start + segment_size - 1, end))
+            for segment_start in range(start, end + 1, segment_size)]
+
+
+def read_progress(path: str):
+    """
+    Read completed segments from progress file.
+
+    Existing numbers don't mean complete segment: last number may be
+    added by request and checkpoint repo returns any number, so segments
+    are marked complete only in progress file.
+
+    :param path: path of progress file
+    :return: set of tuples with start and end of completed segments,
+    empty if file doesn't exist
+    """
+    try:
+        with open(path) as progress:
+            return {tuple(int(order) for order in line.split())
+                    for line in progress}
+    except FileNotFoundError:
+        return set()
+
+
+def save_progress(progress, start: int, end: int):
+    """
+    Mark segment as complete in progress file.
+
+    :param progress: progress file opened for append
+    :param start: start order number of segment
+    :param end: end order number of segment
+    :return:
+    """
+    progress.write('{} {}\n'.format(start, end))
+    progress.flush()
+
+
+def precompute_segment(repo, start: int, end: int, batch_size: int = 1000):
+    """
+    Calculate segment of fibonacci numbers and add them to repo.
+
+    Segment is seeded by exact pair of its first numbers, so segments
+    don't depend on each other.
+
+    :param repo: fibonacci numbers repo
+    :param start: start order number of segment
+    :param end: end order number of segment
+    :param batch_size: count of numbers added to repo at once
+    :return: count of added numbers
+    """
+    current, following = fibonacci_pair(start)
+    batch = {}
+    for order in range(start, end + 1):
+        batch[str(order)] = current
+        if len(batch) == batch_size:
+            repo.add_numbers(**batch)
+            batch = {}
+        current, following = following, current + following
+    repo.add_numbers(**batch)
+    return end - start + 1
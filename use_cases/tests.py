@@ -1,9 +1,24 @@
 """Tests for all in usecases package."""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import os
+from tempfile import TemporaryDirectory
+from threading import Thread
 from unittest import TestCase
 from unittest.mock import MagicMock
 
-from use_cases.fibonacci_numbers import GetFibonacciSequenceRequest, \
+from repositories.checkpoints import CheckpointFibonacciNumbersRepo
+from repositories.memory import MemoryFibonacciNumbersRepo
+from shared.fibonacci import fibonacci_pair
+from shared.flights import RangeFlights
+from use_cases.fibonacci_numbers import AsyncGetFibonacciSequenceUseCase, \
+    GetFibonacciBatchRequest, GetFibonacciBatchUseCase, \
+    GetFibonacciDigitsRequest, GetFibonacciDigitsUseCase, \
+    GetFibonacciNumberRequest, GetFibonacciNumberUseCase, \
+    GetFibonacciSequenceModuloUseCase, GetFibonacciSequenceRequest, \
     GetFibonacciSequenceUseCase
+from use_cases.precompute import precompute_segment, read_progress, \
+    save_progress, split_range
 
 
 
@@ -35,6 +50,30 @@ class RepoMock:
         self._numbers.update(numbers)
 
 
+class AsyncRepoMock(RepoMock):
+    """Mock asyncio repo for test."""
+
+    async def numbers_list(self, start: int, end: int):
+        """
+        Return sequence of fibonacci numbers.
+
+        :param start: start order of numbers sequence
+        :param end: end order of numbers sequence
+        :return: list of fibonacci numbers
+        """
+        return super().numbers_list(start, end)
+
+    async def add_numbers(self, **numbers):
+        """
+        Add new numbers to repo.
+
+        :param numbers: key - order of fibonacci number,
+        value - fibonacci number
+        :return:
+        """
+        super().add_numbers(**numbers)
+
+
 class GetFibonacciSequenceUseCaseTestCase(TestCase):
     """Tests for GetFibonacciSequenceUseCase class."""
 
@@ -86,6 +125,16 @@ class GetFibonacciSequenceUseCaseTestCase(TestCase):
         self.assertEqual(
             10946, self.use_case_class._calculate_fibonacci_number(21))
 
+    def test_calculate_fibonacci_number_with_far_fibonacci_number(self):
+        """
+        Run calculate_fibonacci_number() with order beyond float precision.
+
+        Expect exact fibonacci number.
+        """
+        self.assertEqual(
+            354224848179261915075,
+            self.use_case_class._calculate_fibonacci_number(100))
+
     def test_calculate_fibonacci_number_with_negative_order(self):
         """
         Run calculate_fibonacci_number() with incorrect order type.
@@ -139,6 +188,16 @@ class GetFibonacciSequenceUseCaseTestCase(TestCase):
             [2584, 4181, 6765, 10946],
             self.use_case._get_fibonacci_sequence(18, 21))
 
+    def test_get_fibonacci_sequence_with_far_sequence(self):
+        """
+        Run get_fibonacci_sequence() with cold start beyond float precision.
+
+        Expect list with exact fibonacci numbers sequence.
+        """
+        self.assertEqual(
+            [23416728348467685, 37889062373143906, 61305790721611591],
+            self.use_case._get_fibonacci_sequence(80, 82))
+
     def test_get_fibonacci_sequence_with_incorrect_start_type(self):
         """
         Run get_fibonacci_sequence() with incorrect type of start.
@@ -252,6 +311,103 @@ class GetFibonacciSequenceUseCaseTestCase(TestCase):
         self.assertEqual(
             len(self.use_case._calculate_fibonacci_number.mock_calls), 0)
 
+    def test_get_fibonacci_sequence_by_chunks(self):
+        """
+        Run _get_fibonacci_sequence with chunk size less than sequence.
+
+        Except same sequence and all numbers saved into repo.
+        """
+        self.use_case.chunk_size = 3
+        self.use_case.repo._numbers.update({'20': 6765})
+        self.assertEqual(
+            [2584, 4181, 6765, 10946, 17711, 28657, 46368],
+            self.use_case._get_fibonacci_sequence(18, 24))
+        self.assertEqual(self.use_case.repo._numbers['24'], 46368)
+
+    def test_get_fibonacci_sequence_with_metrics(self):
+        """
+        Run _get_fibonacci_sequence with metrics.
+
+        Except recorded calculation duration and count of numbers.
+        """
+        self.use_case.metrics = MagicMock()
+        self.use_case.repo._numbers.update({'20': 6765})
+        self.use_case._get_fibonacci_sequence(18, 21)
+        self.assertEqual(
+            self.use_case.metrics.observe_stage.call_args[0][0], 'fill_gaps')
+        self.use_case.metrics.count_computed.assert_called_once_with(3)
+
+    def test_fill_gaps_by_runs(self):
+        """
+        Run _fill_gaps() with runs of missing numbers at start, inside and end.
+
+        Expect exact numbers, saved only missing numbers and one
+        calculated pair for run without neighbours.
+        """
+        expected = [fibonacci_pair(order)[0] for order in range(50, 62)]
+        numbers = list(expected)
+        for index in (0, 1, 2, 5, 6, 10, 11):
+            numbers[index] = None
+        self.use_case._calculate_fibonacci_pair = MagicMock(
+            wraps=fibonacci_pair)
+
+        numbers_for_save = self.use_case._fill_gaps(50, numbers)
+
+        self.assertEqual(numbers, expected)
+        self.assertEqual(sorted(numbers_for_save, key=int),
+                         ['50', '51', '52', '55', '56', '60', '61'])
+        self.use_case._calculate_fibonacci_pair.assert_not_called()
+
+    def test_fill_gaps_without_neighbours(self):
+        """
+        Run _fill_gaps() with run without two numbers before and after.
+
+        Expect run calculated from pair of its first order.
+        """
+        numbers = [None, None, None, 2]
+        self.use_case._calculate_fibonacci_pair = MagicMock(
+            wraps=fibonacci_pair)
+
+        self.use_case._fill_gaps(0, numbers)
+
+        self.assertEqual(numbers, [0, 1, 1, 2])
+        self.use_case._calculate_fibonacci_pair.assert_called_once_with(0)
+
+    def test_missing_runs(self):
+        """
+        Run _missing_runs() with several runs.
+
+        Expect first and last indices of every run.
+        """
+        self.assertEqual(
+            list(self.use_case_class._missing_runs(
+                [None, 1, None, None, 3, None])),
+            [(0, 0), (2, 3), (5, 5)])
+        self.assertEqual(list(self.use_case_class._missing_runs([1, 2])), [])
+
+    def test_execute_page_with_previous(self):
+        """
+        Execute request with limit and previous numbers of cursor.
+
+        Expect page of limit numbers calculated from previous numbers.
+        """
+        self.use_case._calculate_fibonacci_pair = MagicMock()
+        response = self.use_case.execute(GetFibonacciSequenceRequest(
+            20, 30, limit=3, previous=(2584, 4181)))
+
+        self.assertEqual(response.value, [6765, 10946, 17711])
+        self.use_case._calculate_fibonacci_pair.assert_not_called()
+
+    def test_use_case_with_incorrect_chunk_size(self):
+        """
+        Create usecase with chunk size less than one.
+
+        Expect raising ValueError exception.
+        """
+        with self.assertRaises(ValueError) as e:
+            self.use_case_class(RepoMock(), chunk_size=0)
+        self.assertEqual(str(e.exception), 'chunk_size must be positive')
+
     def test_execute_request_handles_bad_request(self):
         """
         Execute usecase with incorrect request object.
@@ -282,6 +438,265 @@ class GetFibonacciSequenceUseCaseTestCase(TestCase):
                              [2584, 4181, 6765, 10946])
 
 
+class CheckpointsFibonacciSequenceUseCaseTestCase(TestCase):
+    """Tests for GetFibonacciSequenceUseCase with checkpoints repo."""
+
+    def test_same_sequence_with_checkpoints(self):
+        """
+        Run _get_fibonacci_sequence twice with checkpoints repo.
+
+        Expect the same sequence from clear and filled repo and only
+        checkpoints saved into repo.
+        """
+        repo = RepoMock()
+        use_case = GetFibonacciSequenceUseCase(
+            CheckpointFibonacciNumbersRepo(repo, step=10), chunk_size=7)
+        expected = [2584, 4181, 6765, 10946, 17711, 28657, 46368, 75025,
+                    121393, 196418, 317811, 514229, 832040]
+
+        self.assertEqual(use_case._get_fibonacci_sequence(18, 30), expected)
+        self.assertEqual(
+            {order for order, number in repo._numbers.items()
+             if number is not None},
+            {'10', '11', '20', '21'})
+        self.assertEqual(use_case._get_fibonacci_sequence(18, 30), expected)
+
+
+class PoolFibonacciSequenceUseCaseTestCase(TestCase):
+    """Tests for GetFibonacciSequenceUseCase with process pool."""
+
+    def setUp(self):
+        """Set process pool."""
+        self.pool = ProcessPoolExecutor(2)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_same_sequence_with_pool(self):
+        """
+        Get cold sequence by chunks calculated in pool.
+
+        Expect exact sequence saved to repo.
+        """
+        repo = MemoryFibonacciNumbersRepo()
+        use_case = GetFibonacciSequenceUseCase(
+            repo, chunk_size=10, pool=self.pool, pool_chunks=3)
+        expected = [fibonacci_pair(order)[0] for order in range(5, 96)]
+
+        self.assertEqual(use_case._get_fibonacci_sequence(5, 95), expected)
+        self.assertEqual(repo.numbers_list(5, 95), expected)
+
+    def test_partially_filled_chunks_without_pool(self):
+        """
+        Get sequence with chunks partially existing in repo.
+
+        Expect only chunks without numbers are calculated in pool.
+        """
+        repo = MemoryFibonacciNumbersRepo()
+        repo.add_numbers(**{str(order): fibonacci_pair(order)[0]
+                            for order in range(0, 15)})
+        pool = MagicMock(wraps=self.pool)
+        use_case = GetFibonacciSequenceUseCase(
+            repo, chunk_size=10, pool=pool, pool_chunks=4)
+
+        self.assertEqual(use_case._get_fibonacci_sequence(0, 39),
+                         [fibonacci_pair(order)[0] for order in range(40)])
+        self.assertEqual([call[0][1:] for call in pool.submit.call_args_list],
+                         [(20, 29), (30, 39)])
+
+    def test_wait_for_overlapping_pool_calculation(self):
+        """
+        Get cold sequence while overlapping chunk is calculating.
+
+        Expect chunk isn't submitted to pool again, numbers are got
+        from repo after waiting.
+        """
+        repo = MemoryFibonacciNumbersRepo()
+        flights = RangeFlights()
+        pool = MagicMock(wraps=self.pool)
+        use_case = GetFibonacciSequenceUseCase(
+            repo, chunk_size=10, flights=flights, pool=pool, pool_chunks=2)
+        expected = [fibonacci_pair(order)[0] for order in range(20)]
+        self.assertIsNone(flights.start(0, 9))
+        result = []
+        thread = Thread(target=lambda: result.extend(
+            use_case._get_fibonacci_sequence(0, 19)))
+        thread.start()
+        thread.join(0.1)
+        self.assertTrue(thread.is_alive())
+
+        repo.add_numbers(**{str(order): expected[order]
+                            for order in range(10)})
+        flights.finish(0, 9)
+        thread.join(5)
+
+        self.assertEqual(result, expected)
+        self.assertEqual([call[0][1:] for call in pool.submit.call_args_list],
+                         [(10, 19)])
+        self.assertEqual(flights.saved_computations, 1)
+        self.assertIsNone(flights.start(0, 19))
+
+    def test_closed_iterator_finishes_flights(self):
+        """
+        Close iterator of cold sequence after first number.
+
+        Expect flights of chunks submitted to pool are finished.
+        """
+        flights = RangeFlights()
+        use_case = GetFibonacciSequenceUseCase(
+            MemoryFibonacciNumbersRepo(), chunk_size=10, flights=flights,
+            pool=self.pool, pool_chunks=3)
+        numbers = use_case._iter_fibonacci_sequence(0, 29)
+
+        self.assertEqual(next(numbers), 0)
+        numbers.close()
+        self.assertIsNone(flights.start(0, 29))
+
+
+class SingleFlightFibonacciSequenceUseCaseTestCase(TestCase):
+    """Tests for GetFibonacciSequenceUseCase with flights."""
+
+    def setUp(self):
+        """Run before all tests."""
+        self.repo = RepoMock()
+        self.flights = RangeFlights()
+        self.use_case = GetFibonacciSequenceUseCase(
+            self.repo, flights=self.flights)
+
+    def test_calculation_without_concurrent_requests(self):
+        """
+        Run _get_fibonacci_sequence without concurrent calculations.
+
+        Expect calculated sequence and finished flight.
+        """
+        self.assertEqual([2584, 4181, 6765, 10946],
+                         self.use_case._get_fibonacci_sequence(18, 21))
+        self.assertEqual(self.flights.computations, 1)
+        self.assertIsNone(self.flights.start(18, 21))
+
+    def test_wait_for_overlapping_calculation(self):
+        """
+        Run _get_fibonacci_sequence while overlapping range is calculating.
+
+        Expect waiting for calculation and numbers from repo without
+        calculation.
+        """
+        self.assertIsNone(self.flights.start(15, 25))
+        self.use_case._fill_gaps = MagicMock()
+        result = []
+        thread = Thread(target=lambda: result.extend(
+            self.use_case._get_fibonacci_sequence(18, 21)))
+        thread.start()
+        thread.join(0.1)
+        self.assertTrue(thread.is_alive())
+
+        self.repo.add_numbers(
+            **{'18': 2584, '19': 4181, '20': 6765, '21': 10946})
+        self.flights.finish(15, 25)
+        thread.join(5)
+
+        self.assertEqual(result, [2584, 4181, 6765, 10946])
+        self.use_case._fill_gaps.assert_not_called()
+        self.assertEqual(self.flights.saved_computations, 1)
+
+
+class StreamFibonacciSequenceUseCaseTestCase(TestCase):
+    """Tests for GetFibonacciSequenceUseCase in stream mode."""
+
+    def setUp(self):
+        """Run before all tests."""
+        self.repo = RepoMock()
+        self.use_case = GetFibonacciSequenceUseCase(
+            self.repo, chunk_size=2, stream=True)
+
+    def test_execute_returns_iterator(self):
+        """
+        Execute usecase with correct request object.
+
+        Expect response object with iterator of fibonacci sequence,
+        which gets numbers from repo only while iterating.
+        """
+        response = self.use_case.execute(GetFibonacciSequenceRequest(18, 22))
+
+        self.assertTrue(bool(response))
+        self.assertNotIsInstance(response.value, list)
+        self.assertIsNone(self.repo._numbers['21'])
+        self.assertListEqual(list(response.value),
+                             [2584, 4181, 6765, 10946, 17711])
+        self.assertEqual(self.repo._numbers['22'], 17711)
+
+    def test_execute_with_repo_error(self):
+        """
+        Execute usecase with broken repo.
+
+        Expect failed response instead of broken iterator.
+        """
+        self.repo.numbers_list = MagicMock(side_effect=ConnectionError('x'))
+        response = self.use_case.execute(GetFibonacciSequenceRequest(18, 22))
+
+        self.assertFalse(bool(response))
+        self.assertEqual(response.value['type'], 'SYSTEM_ERROR')
+
+
+class AsyncGetFibonacciSequenceUseCaseTestCase(TestCase):
+    """Tests for AsyncGetFibonacciSequenceUseCase class."""
+
+    def setUp(self):
+        """Run before all tests."""
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.repo = AsyncRepoMock()
+
+    def execute(self, use_case, request):
+        """Execute usecase in event loop."""
+        return self.loop.run_until_complete(use_case.execute(request))
+
+    def test_execute_with_correct_request(self):
+        """
+        Execute usecase with correct request object.
+
+        Expect response object with correct fibonacci sequence and
+        calculated numbers saved into repo.
+        """
+        use_case = AsyncGetFibonacciSequenceUseCase(self.repo, chunk_size=3)
+        response = self.execute(use_case, GetFibonacciSequenceRequest(18, 22))
+
+        self.assertTrue(bool(response))
+        self.assertListEqual(response.value,
+                             [2584, 4181, 6765, 10946, 17711])
+        self.assertEqual(self.repo._numbers['22'], 17711)
+
+    def test_execute_in_stream_mode(self):
+        """
+        Execute usecase in stream mode.
+
+        Expect response object with async iterator of fibonacci sequence.
+        """
+        use_case = AsyncGetFibonacciSequenceUseCase(
+            self.repo, chunk_size=2, stream=True)
+        response = self.execute(use_case, GetFibonacciSequenceRequest(80, 82))
+
+        async def collect():
+            return [number async for number in response.value]
+
+        self.assertListEqual(
+            self.loop.run_until_complete(collect()),
+            [23416728348467685, 37889062373143906, 61305790721611591])
+
+    def test_execute_request_handles_bad_request(self):
+        """
+        Execute usecase with incorrect request object.
+
+        Expect response failure response object with error message.
+        """
+        use_case = AsyncGetFibonacciSequenceUseCase(self.repo)
+        response = self.execute(use_case, GetFibonacciSequenceRequest())
+
+        self.assertFalse(bool(response))
+        self.assertEqual(
+            response.value,
+            {'message': 'start: is required\nend: is required',
+             'type': 'PARAMETERS_ERROR'})
+
+
 class GetFibonacciSequenceRequestObjectTestCase(TestCase):
     """Tests for GetFibonacciSequenceRequest class."""
 
@@ -394,3 +809,303 @@ class GetFibonacciSequenceRequestObjectTestCase(TestCase):
         self.assertFalse(request)
         self.assertEqual(request.errors[0]['parameter'], 'end')
         self.assertEqual(request.errors[0]['message'], 'is required')
+
+    def test_creation_with_modulus(self):
+        """
+        Create request object with modulus.
+
+        Expect valid request object with integer modulus.
+        """
+        request = self.request('1', '2', '10')
+
+        self.assertTrue(request)
+        self.assertEqual(request.modulus, 10)
+
+    def test_creation_with_incorrect_limit(self):
+        """
+        Create request object with incorrect and too big limit.
+
+        Expect invalid request object with error on limit parameter.
+        """
+        for limit, message in (('x', 'must be integer'),
+                               ('11', 'must be between 1 and 10')):
+            request = self.request(1, 2, limit=limit, max_limit=10)
+
+            self.assertFalse(request)
+            self.assertEqual(request.errors[0]['parameter'], 'limit')
+            self.assertEqual(request.errors[0]['message'], message)
+
+    def test_creation_with_incorrect_modulus(self):
+        """
+        Create request object with incorrect and not positive modulus.
+
+        Expect invalid request object with error on modulus parameter.
+        """
+        for modulus, message in (
+                ('x', 'must be integer'), ('0', 'must be positive'),
+                ('9' * 1001, 'must be not longer than 1000 digits')):
+            request = self.request(1, 2, modulus)
+
+            self.assertFalse(request)
+            self.assertEqual(request.errors[0]['parameter'], 'modulus')
+            self.assertEqual(request.errors[0]['message'], message)
+
+
+class GetFibonacciBatchUseCaseTestCase(TestCase):
+    """Tests for GetFibonacciBatchUseCase class."""
+
+    def test_merged_ranges_got_once(self):
+        """
+        Execute request with overlapping, adjacent and separate queries.
+
+        Expect results per query and one repo call per merged range.
+        """
+        repo = MagicMock(wraps=MemoryFibonacciNumbersRepo())
+        use_case = GetFibonacciBatchUseCase(repo)
+        response = use_case.execute(GetFibonacciBatchRequest([
+            {'from': 5, 'to': 8}, {'n': 50}, {'from': 9, 'to': 10},
+            {'from': '3', 'to': '6'}, {'n': 7}]))
+
+        self.assertTrue(response)
+        self.assertEqual(response.value, [[5, 8, 13, 21], 12586269025,
+                                          [34, 55], [2, 3, 5, 8], 13])
+        self.assertEqual(
+            [call[0] for call in repo.numbers_list.call_args_list],
+            [(3, 10), (50, 50)])
+
+    def test_merge_ranges(self):
+        """
+        Merge unsorted ranges.
+
+        Expect sorted ranges without overlaps and adjacent ranges.
+        """
+        self.assertEqual(GetFibonacciBatchUseCase._merge_ranges(
+            [(10, 12), (0, 2), (3, 4), (11, 20), (30, 30)]),
+            [(0, 4), (10, 20), (30, 30)])
+
+    def test_creation_with_incorrect_queries(self):
+        """
+        Create request object with incorrect queries.
+
+        Expect invalid request object with errors of queries.
+        """
+        self.assertEqual(GetFibonacciBatchRequest().errors, [
+            {'parameter': 'queries', 'message': 'is required'}])
+        self.assertEqual(GetFibonacciBatchRequest([]).errors, [
+            {'parameter': 'queries', 'message': 'must be not empty list'}])
+        self.assertEqual(
+            GetFibonacciBatchRequest([{}] * 3, max_queries=2).errors,
+            [{'parameter': 'queries',
+              'message': 'must be not longer than 2'}])
+        self.assertEqual(
+            GetFibonacciBatchRequest([1, {'n': 'x'}, {'from': [1]}]).errors,
+            [{'parameter': 'queries[0]', 'message': 'must be object'},
+             {'parameter': 'queries[1].n', 'message': 'must be integer'},
+             {'parameter': 'queries[2].from', 'message': 'must be integer'},
+             {'parameter': 'queries[2].to', 'message': 'is required'}])
+        self.assertEqual(
+            GetFibonacciBatchRequest([{'from': 1.9, 'to': 5.5}, {'n': True},
+                                      {'from': '1.0', 'to': 2}]).errors,
+            [{'parameter': 'queries[0].from', 'message': 'must be integer'},
+             {'parameter': 'queries[0].to', 'message': 'must be integer'},
+             {'parameter': 'queries[1].n', 'message': 'must be integer'},
+             {'parameter': 'queries[2].from', 'message': 'must be integer'}])
+
+
+class GetFibonacciNumberUseCaseTestCase(TestCase):
+    """Tests for GetFibonacciNumberUseCase class."""
+
+    def test_calculate_and_save_anchor(self):
+        """
+        Execute request with order missing in repo.
+
+        Expect exact number and saved pair of F(n) and F(n+1).
+        """
+        repo = MemoryFibonacciNumbersRepo()
+        response = GetFibonacciNumberUseCase(repo).execute(
+            GetFibonacciNumberRequest(1000))
+
+        self.assertTrue(response)
+        self.assertEqual(response.value, fibonacci_pair(1000)[0])
+        self.assertEqual(repo.numbers_list(999, 1002),
+                         [None, *fibonacci_pair(1000), None])
+
+    def test_number_from_repo(self):
+        """
+        Execute request with order existing in repo.
+
+        Expect number from repo without saving.
+        """
+        repo = MagicMock()
+        repo.numbers_list.return_value = [5, None]
+        response = GetFibonacciNumberUseCase(repo).execute(
+            GetFibonacciNumberRequest(5))
+
+        self.assertEqual(response.value, 5)
+        repo.numbers_list.assert_called_once_with(5, 6)
+        repo.add_numbers.assert_not_called()
+
+    def test_execute_request_handles_bad_request(self):
+        """
+        Execute request without order.
+
+        Expect failed response with PARAMETERS_ERROR type.
+        """
+        response = GetFibonacciNumberUseCase(MagicMock()).execute(
+            GetFibonacciNumberRequest())
+
+        self.assertFalse(response)
+        self.assertEqual(response.value, {'type': 'PARAMETERS_ERROR',
+                                          'message': 'order: is required'})
+
+    def test_creation_with_incorrect_order(self):
+        """
+        Create request object with incorrect and negative order.
+
+        Expect invalid request object with error on order parameter.
+        """
+        for order, message in (('x', 'must be integer'),
+                               ('-1', 'must be positive')):
+            request = GetFibonacciNumberRequest(order)
+
+            self.assertFalse(request)
+            self.assertEqual(request.errors[0]['parameter'], 'order')
+            self.assertEqual(request.errors[0]['message'], message)
+
+
+class GetFibonacciDigitsUseCaseTestCase(TestCase):
+    """Tests for GetFibonacciDigitsUseCase class."""
+
+    def test_execute_with_correct_request(self):
+        """
+        Execute request with order and count.
+
+        Expect dict with count, leading and trailing digits.
+        """
+        response = GetFibonacciDigitsUseCase().execute(
+            GetFibonacciDigitsRequest('100', '4'))
+
+        self.assertTrue(response)
+        self.assertEqual(response.value, {'order': 100, 'digits': 21,
+                                          'leading': '3542',
+                                          'trailing': '5075'})
+
+    def test_creation_with_incorrect_count(self):
+        """
+        Create request object with incorrect and too big count.
+
+        Expect invalid request object with error on count parameter.
+        """
+        for count, message in (('x', 'must be integer'),
+                               ('1001', 'must be between 1 and 1000')):
+            request = GetFibonacciDigitsRequest(1, count)
+
+            self.assertFalse(request)
+            self.assertEqual(request.errors[0]['parameter'], 'count')
+            self.assertEqual(request.errors[0]['message'], message)
+
+
+class GetFibonacciSequenceModuloUseCaseTestCase(TestCase):
+    """Tests for GetFibonacciSequenceModuloUseCase class."""
+
+    def test_sequence_from_table(self):
+        """
+        Execute request with small modulus.
+
+        Expect exact fibonacci numbers modulo m.
+        """
+        use_case = GetFibonacciSequenceModuloUseCase()
+        response = use_case.execute(
+            GetFibonacciSequenceRequest(95, 130, 1000))
+
+        self.assertTrue(response)
+        self.assertEqual(response.value,
+                         [fibonacci_pair(order)[0] % 1000
+                          for order in range(95, 131)])
+
+    def test_sequence_without_table(self):
+        """
+        Execute request with modulus greater than table_max_modulus.
+
+        Expect the same numbers as from table.
+        """
+        request = GetFibonacciSequenceRequest(1000, 1100, 997)
+        from_table = GetFibonacciSequenceModuloUseCase().execute(request)
+        use_case = GetFibonacciSequenceModuloUseCase(table_max_modulus=10)
+
+        self.assertEqual(use_case.execute(request).value, from_table.value)
+
+    def test_huge_orders(self):
+        """
+        Execute request with orders greater than 10 ** 18.
+
+        Expect periodic last digits.
+        """
+        use_case = GetFibonacciSequenceModuloUseCase(stream=True)
+        start = 10 ** 18
+        response = use_case.execute(
+            GetFibonacciSequenceRequest(start, start + 59, 10))
+
+        self.assertEqual(list(response.value)[-start % 60:][:5],
+                         [0, 1, 1, 2, 3])
+
+
+class PrecomputeTestCase(TestCase):
+    """Tests for precompute functions."""
+
+    def test_split_range(self):
+        """
+        Run split_range with range greater than segment size.
+
+        Expect segments of range.
+        """
+        self.assertEqual(split_range(3, 10, 3), [(3, 5), (6, 8), (9, 10)])
+
+    def test_split_range_with_incorrect_segment_size(self):
+        """
+        Run split_range with segment size less than one.
+
+        Expect raising ValueError exception.
+        """
+        with self.assertRaises(ValueError) as e:
+            split_range(3, 10, 0)
+        self.assertEqual(str(e.exception), 'segment_size must be positive')
+
+    def test_precompute_segment(self):
+        """
+        Run precompute_segment with clear repo.
+
+        Expect numbers of segment added into repo by batches.
+        """
+        repo = RepoMock()
+        repo.add_numbers = MagicMock(side_effect=repo.add_numbers)
+        self.assertEqual(precompute_segment(repo, 80, 84, batch_size=2), 5)
+        self.assertEqual(repo.add_numbers.call_count, 3)
+        self.assertEqual(repo._numbers['80'], 23416728348467685)
+        self.assertEqual(repo._numbers['84'], 160500643816367088)
+
+    def test_precompute_segment_with_last_number(self):
+        """
+        Run precompute_segment with existing last number of segment.
+
+        Expect all numbers of segment added, because last number can be
+        added by request.
+        """
+        repo = RepoMock()
+        repo._numbers['84'] = 160500643816367088
+        self.assertEqual(precompute_segment(repo, 80, 84), 5)
+        self.assertEqual(repo._numbers['80'], 23416728348467685)
+
+    def test_progress(self):
+        """
+        Save completed segments to progress file and read them.
+
+        Expect saved segments and no segments without file.
+        """
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'precompute.progress')
+            self.assertEqual(read_progress(path), set())
+            with open(path, 'a') as progress:
+                save_progress(progress, 0, 9)
+                save_progress(progress, 20, 29)
+            self.assertEqual(read_progress(path), {(0, 9), (20, 29)})